@@ -1,18 +1,24 @@
 """Dependency injection helpers for API routes."""
 
-from collections.abc import Generator
+from collections.abc import AsyncIterator, Generator
 from dataclasses import dataclass
 from typing import Any
 
 from fastapi import Depends, Header, HTTPException, Request, status
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 
 import httpx
 
 from app.core.config import settings
+from app.core.admission import get_upload_quota
 from app.core.auth import AuthError, decode_jwt
+from app.core.cache import TRACK_LIST_TAG, get_response_cache, track_tag
 from app.core.jwt import JWKSClient
+from app.core.metrics import AUTH_LATENCY, observe
+from app.core.tracing import HTTPX_EVENT_HOOKS, span
 from app.db.session import SessionLocal
+from app.models.track import Track
 from app.models.user_profile import UserProfile
 
 
@@ -48,7 +54,8 @@ async def get_current_user(
     if authorization and authorization.startswith("Bearer "):
         token = authorization.removeprefix("Bearer ").strip()
         try:
-            claims = await decode_jwt(token, jwks_client)
+            with observe(AUTH_LATENCY, step="jwt"), span("auth.jwt"):
+                claims = await decode_jwt(token, jwks_client)
         except AuthError as exc:
             raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail=exc.code) from exc
 
@@ -63,9 +70,11 @@ async def get_current_user(
             raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="INVALID_SUB") from None
 
         # Optional remote user verification against auth server.
-        user_info = await _verify_remote_user(token, user_id)
+        with observe(AUTH_LATENCY, step="userinfo"), span("auth.userinfo"):
+            user_info = await _verify_remote_user(token, user_id)
         user_id = user_info["id"]
-        _ensure_local_user_profile(db, user_info)
+        with span("auth.profile_upsert"):
+            _ensure_local_user_profile(db, user_info)
 
         return CurrentUser(user_id=user_id, claims=claims)
 
@@ -79,13 +88,38 @@ async def get_current_user(
     raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="UNAUTHORIZED")
 
 
+async def upload_slot(current_user: CurrentUser = Depends(get_current_user)) -> AsyncIterator[CurrentUser]:
+    """Hold one of the user's concurrent upload slots for the duration of the request."""
+
+    quota = get_upload_quota()
+    user_id = current_user.user_id
+    # The Redis round trips are blocking calls; keep them off the event loop.
+    if quota.redis is not None:
+        backend = await run_in_threadpool(quota.acquire, user_id)
+    else:
+        backend = quota.acquire(user_id)
+    if backend is None:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="TOO_MANY_CONCURRENT_UPLOADS",
+            headers={"Retry-After": "5"},
+        )
+    try:
+        yield current_user
+    finally:
+        if backend == quota.REDIS:
+            await run_in_threadpool(quota.release, user_id, backend)
+        else:
+            quota.release(user_id, backend)
+
+
 async def _verify_remote_user(token: str, user_id: int) -> dict[str, Any]:
     """Validate user against auth server; return user info."""
 
     if not settings.auth_userinfo_url:
         return {"id": user_id}
 
-    async with httpx.AsyncClient(timeout=settings.auth_timeout_seconds) as client:
+    async with httpx.AsyncClient(timeout=settings.auth_timeout_seconds, event_hooks=HTTPX_EVENT_HOOKS) as client:
         resp = await client.get(
             str(settings.auth_userinfo_url),
             headers={"Authorization": f"Bearer {token}", "Accept": "application/json"},
@@ -112,6 +146,7 @@ def _ensure_local_user_profile(db: Session, user_info: dict) -> None:
     is_active = 1 if user_info.get("is_active") is None else int(bool(user_info.get("is_active")))
 
     user = db.get(UserProfile, user_id)
+    renamed = False
     if not user:
         user = UserProfile(
             id=user_id,
@@ -123,10 +158,21 @@ def _ensure_local_user_profile(db: Session, user_info: dict) -> None:
         )
         db.add(user)
     else:
+        renamed = user.display_name != display_name
         user.display_name = display_name
         user.avatar_url = avatar_url
         user.bio = bio
         user.is_active = is_active
 
     db.commit()
+    if renamed:
+        _invalidate_owner_tracks(db, user_id)
     return None
+
+
+def _invalidate_owner_tracks(db: Session, user_id: int) -> None:
+    """Cached track bodies embed ``owner_display_name``; drop them on every worker."""
+
+    track_ids = [row.id for row in db.query(Track.id).filter(Track.owner_user_id == user_id)]
+    if track_ids:
+        get_response_cache().invalidate_tags(*(track_tag(t) for t in track_ids), TRACK_LIST_TAG)
@@ -0,0 +1,83 @@
+"""Response helpers shared by API routes."""
+
+from collections.abc import Callable, Iterable
+
+import re
+
+from fastapi import HTTPException, Request, Response, status
+from fastapi.responses import StreamingResponse
+
+from app.core.cache import ResponseCache, etag_matches, get_response_cache
+from app.core.disk_cache import DiskCache, get_disk_cache
+
+_RANGE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+def cached_json_response(
+    request: Request,
+    key: str,
+    loader: Callable[[], bytes],
+    tags: Iterable[str] = (),
+    cache: ResponseCache | None = None,
+) -> Response:
+    """Serve a JSON body from the response cache with ETag / If-None-Match support."""
+
+    entry = (cache or get_response_cache()).get_or_load(key, loader, tags)
+    headers = {"ETag": entry.etag, "Cache-Control": "no-cache"}
+
+    if etag_matches(request.headers.get("if-none-match"), entry.etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    return Response(content=entry.body, media_type="application/json", headers=headers)
+
+
+def parse_byte_range(header: str | None, size: int) -> tuple[int, int] | None:
+    """Single ``Range: bytes=`` spec -> inclusive (start, end); ``None`` means the whole object.
+
+    Multi-range and malformed headers are ignored (RFC 9110 allows serving the full
+    representation); unsatisfiable ranges raise 416.
+    """
+
+    match = _RANGE.match(header.strip()) if header else None
+    if match is None or not (match[1] or match[2]):
+        return None
+    if match[1]:
+        start = int(match[1])
+        end = min(int(match[2]), size - 1) if match[2] else size - 1
+    else:  # suffix range: the last N bytes
+        start, end = max(0, size - int(match[2])), size - 1
+    if start >= size or start > end:
+        raise HTTPException(
+            status_code=status.HTTP_416_RANGE_NOT_SATISFIABLE,
+            detail="RANGE_NOT_SATISFIABLE",
+            headers={"Content-Range": f"bytes */{size}"},
+        )
+    return start, end
+
+
+def cached_object_response(
+    request: Request,
+    storage_key: str,
+    media_type: str,
+    not_found: str,
+    cache: DiskCache | None = None,
+) -> Response:
+    """Stream a storage object (or the requested byte range) through the local disk cache."""
+
+    cache = cache or get_disk_cache()
+    try:
+        size = cache.object_size(storage_key)
+    except FileNotFoundError:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=not_found)
+
+    headers = {"Accept-Ranges": "bytes"}
+    byte_range = parse_byte_range(request.headers.get("range"), size)
+    if byte_range is None:
+        start, end, status_code = 0, size - 1, status.HTTP_200_OK
+    else:
+        (start, end), status_code = byte_range, status.HTTP_206_PARTIAL_CONTENT
+        headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+    headers["Content-Length"] = str(end - start + 1)
+    return StreamingResponse(
+        cache.iter_range(storage_key, start, end), status_code=status_code, media_type=media_type, headers=headers
+    )
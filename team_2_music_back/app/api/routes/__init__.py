@@ -2,11 +2,15 @@
 
 from fastapi import APIRouter
 
-from . import health, tracks, interactions
+from . import admin, creators, feed, health, playlists, tracks, interactions
 
 router = APIRouter()
 router.include_router(health.router, tags=["system"])
 router.include_router(tracks.router)
 router.include_router(interactions.router)
+router.include_router(creators.router)
+router.include_router(feed.router)
+router.include_router(playlists.router)
+router.include_router(admin.router)
 
 __all__ = ["router"]
@@ -0,0 +1,43 @@
+"""Operator endpoints (request profiles)."""
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, status
+from fastapi.responses import FileResponse
+
+from app.core.config import settings
+from app.core.profiling import ProfileStore, verify_token
+from app.schemas import ErrorResponse, ProfileRead
+
+router = APIRouter(prefix="/admin", tags=["admin"])
+
+
+def require_profile_token(x_profile: str | None = Header(default=None)) -> None:
+    """Admin calls carry the same signed ``X-Profile`` token used to request a profile."""
+
+    if not settings.profiling_secret:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="PROFILING_DISABLED")
+    if not verify_token(x_profile, settings.profiling_secret):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="FORBIDDEN")
+
+
+@router.get(
+    "/profiles",
+    response_model=list[ProfileRead],
+    summary="List recent request profiles (newest first)",
+    responses={403: {"model": ErrorResponse}, 404: {"model": ErrorResponse}},
+    dependencies=[Depends(require_profile_token)],
+)
+def list_profiles(limit: int = Query(default=50, ge=1, le=500)) -> list[ProfileRead]:
+    return [ProfileRead.model_validate(info, from_attributes=True) for info in ProfileStore().list(limit)]
+
+
+@router.get(
+    "/profiles/{name}",
+    summary="Download a profile as collapsed stacks (speedscope / flamegraph.pl)",
+    responses={403: {"model": ErrorResponse}, 404: {"model": ErrorResponse}},
+    dependencies=[Depends(require_profile_token)],
+)
+def download_profile(name: str) -> FileResponse:
+    path = ProfileStore().path_for(name)
+    if path is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="PROFILE_NOT_FOUND")
+    return FileResponse(path, media_type="text/plain", filename=name)
@@ -0,0 +1,71 @@
+"""Creator profile routes."""
+
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.api.deps import CurrentUser, get_current_user, get_db
+from app.models.track import Track
+from app.models.user_profile import UserProfile
+from app.models.vote import Like
+from app.schemas import CreatorStatsResponse, ErrorResponse, FollowResponse
+from app.services.feed import FeedService
+from app.services.listeners import ListenerStatsService
+
+router = APIRouter(prefix="/creators", tags=["creators"])
+
+
+@router.get(
+    "/{user_id}/stats",
+    response_model=CreatorStatsResponse,
+    summary="Creator stats (tracks, likes, approximate unique listeners)",
+    responses={404: {"model": ErrorResponse}, 500: {"model": ErrorResponse}},
+)
+def creator_stats(user_id: int, db: Session = Depends(get_db)) -> CreatorStatsResponse:
+    user = db.get(UserProfile, user_id)
+    if not user:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="USER_NOT_FOUND")
+
+    track_count = db.query(func.count(Track.id)).filter(Track.owner_user_id == user_id).scalar() or 0
+    likes_count = (
+        db.query(func.count(Like.id)).join(Track, Track.id == Like.track_id).filter(Track.owner_user_id == user_id).scalar()
+        or 0
+    )
+
+    return CreatorStatsResponse(
+        user_id=user_id,
+        display_name=user.display_name,
+        track_count=track_count,
+        likes_count=likes_count,
+        unique_listeners=ListenerStatsService(db).count_owner(user_id),
+    )
+
+
+@router.post(
+    "/{user_id}/follow",
+    response_model=FollowResponse,
+    summary="Follow a creator",
+    responses={400: {"model": ErrorResponse}, 401: {"model": ErrorResponse}, 404: {"model": ErrorResponse}},
+)
+def follow_creator(
+    user_id: int,
+    db: Session = Depends(get_db),
+    current_user: CurrentUser = Depends(get_current_user),
+) -> FollowResponse:
+    following = FeedService(db).follow(follower_id=current_user.user_id, following_id=user_id)
+    return FollowResponse(user_id=user_id, following=following)
+
+
+@router.delete(
+    "/{user_id}/follow",
+    response_model=FollowResponse,
+    summary="Unfollow a creator",
+    responses={401: {"model": ErrorResponse}},
+)
+def unfollow_creator(
+    user_id: int,
+    db: Session = Depends(get_db),
+    current_user: CurrentUser = Depends(get_current_user),
+) -> FollowResponse:
+    following = FeedService(db).unfollow(follower_id=current_user.user_id, following_id=user_id)
+    return FollowResponse(user_id=user_id, following=following)
@@ -0,0 +1,26 @@
+"""Home feed routes."""
+
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+
+from app.api.deps import CurrentUser, get_current_user, get_db
+from app.schemas import ErrorResponse, FeedPage, TrackRead
+from app.services.feed import FeedService
+
+router = APIRouter(prefix="/feed", tags=["feed"])
+
+
+@router.get(
+    "",
+    response_model=FeedPage,
+    summary="Home feed: newest tracks from followed creators",
+    responses={400: {"model": ErrorResponse}, 401: {"model": ErrorResponse}},
+)
+def home_feed(
+    cursor: str | None = Query(default=None, description="next_cursor from the previous page"),
+    limit: int = Query(default=20, ge=1, le=100),
+    db: Session = Depends(get_db),
+    current_user: CurrentUser = Depends(get_current_user),
+) -> FeedPage:
+    items, next_cursor = FeedService(db).timeline(current_user.user_id, cursor=cursor, limit=limit)
+    return FeedPage(items=[TrackRead.model_validate(t) for t in items], next_cursor=next_cursor)
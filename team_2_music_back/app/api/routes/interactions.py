@@ -4,7 +4,7 @@ from fastapi import APIRouter, Depends, status
 from sqlalchemy.orm import Session
 
 from app.api.deps import CurrentUser, get_current_user, get_db
-from app.schemas import CommentCreate, CommentRead, ErrorResponse, LikeActionResponse
+from app.schemas import CommentCreate, CommentRead, ErrorResponse, LikeActionResponse, PlayActionResponse
 from app.services.interactions import InteractionService
 
 router = APIRouter(prefix="/interactions", tags=["interactions"])
@@ -53,6 +53,21 @@ def like_count(track_id: int, db: Session = Depends(get_db)) -> int:
     return _svc(db).count_likes(track_id)
 
 
+@router.post(
+    "/tracks/{track_id}/plays",
+    response_model=PlayActionResponse,
+    status_code=status.HTTP_201_CREATED,
+    responses={400: {"model": ErrorResponse}, 401: {"model": ErrorResponse}, 404: {"model": ErrorResponse}},
+)
+def record_play(
+    track_id: int,
+    db: Session = Depends(get_db),
+    current_user: CurrentUser = Depends(get_current_user),
+) -> PlayActionResponse:
+    play = _svc(db).record_play(track_id=track_id, user_id=current_user.user_id)
+    return PlayActionResponse(track_id=track_id, played_at=play.played_at)
+
+
 @router.post(
     "/tracks/{track_id}/comments",
     response_model=CommentRead,
@@ -0,0 +1,150 @@
+"""Playlist routes."""
+
+from fastapi import APIRouter, Depends, Query, status
+from sqlalchemy.orm import Session
+
+from app.api.deps import CurrentUser, get_current_user, get_db
+from app.models.playlist import Playlist, PlaylistTrack
+from app.schemas import (
+    ErrorResponse,
+    PlaylistCreate,
+    PlaylistRead,
+    PlaylistTrackAdd,
+    PlaylistTrackMove,
+    PlaylistTrackRead,
+    PlaylistTracksPage,
+)
+from app.services.playlists import PlaylistService
+
+router = APIRouter(prefix="/playlists", tags=["playlists"])
+
+
+def _svc(db: Session) -> PlaylistService:
+    return PlaylistService(db=db)
+
+
+@router.post(
+    "",
+    response_model=PlaylistRead,
+    status_code=status.HTTP_201_CREATED,
+    summary="Create playlist",
+    responses={400: {"model": ErrorResponse}, 401: {"model": ErrorResponse}},
+)
+def create_playlist(
+    payload: PlaylistCreate,
+    db: Session = Depends(get_db),
+    current_user: CurrentUser = Depends(get_current_user),
+) -> Playlist:
+    return _svc(db).create_playlist(
+        owner_user_id=current_user.user_id,
+        title=payload.title,
+        description=payload.description,
+        is_public=payload.is_public,
+    )
+
+
+@router.get(
+    "",
+    response_model=list[PlaylistRead],
+    summary="List my playlists",
+    responses={401: {"model": ErrorResponse}},
+)
+def list_playlists(
+    db: Session = Depends(get_db),
+    current_user: CurrentUser = Depends(get_current_user),
+) -> list[Playlist]:
+    return _svc(db).list_playlists(owner_user_id=current_user.user_id)
+
+
+@router.get(
+    "/{playlist_id}",
+    response_model=PlaylistRead,
+    summary="Get playlist",
+    responses={401: {"model": ErrorResponse}, 404: {"model": ErrorResponse}},
+)
+def get_playlist(
+    playlist_id: int,
+    db: Session = Depends(get_db),
+    current_user: CurrentUser = Depends(get_current_user),
+) -> Playlist:
+    return _svc(db).get_playlist(playlist_id, viewer_id=current_user.user_id)
+
+
+@router.get(
+    "/{playlist_id}/tracks",
+    response_model=PlaylistTracksPage,
+    summary="List playlist tracks in order (cursor-paginated)",
+    responses={400: {"model": ErrorResponse}, 401: {"model": ErrorResponse}, 404: {"model": ErrorResponse}},
+)
+def list_playlist_tracks(
+    playlist_id: int,
+    cursor: str | None = Query(default=None, description="next_cursor from the previous page"),
+    limit: int = Query(default=50, ge=1, le=200),
+    db: Session = Depends(get_db),
+    current_user: CurrentUser = Depends(get_current_user),
+) -> PlaylistTracksPage:
+    entries, next_cursor = _svc(db).list_tracks(playlist_id, viewer_id=current_user.user_id, cursor=cursor, limit=limit)
+    return PlaylistTracksPage(
+        items=[PlaylistTrackRead.model_validate(e) for e in entries],
+        next_cursor=next_cursor,
+    )
+
+
+@router.post(
+    "/{playlist_id}/tracks",
+    response_model=PlaylistTrackRead,
+    status_code=status.HTTP_201_CREATED,
+    summary="Add track to playlist (owner only)",
+    responses={
+        400: {"model": ErrorResponse},
+        401: {"model": ErrorResponse},
+        403: {"model": ErrorResponse},
+        404: {"model": ErrorResponse},
+        409: {"model": ErrorResponse},
+    },
+)
+def add_playlist_track(
+    playlist_id: int,
+    payload: PlaylistTrackAdd,
+    db: Session = Depends(get_db),
+    current_user: CurrentUser = Depends(get_current_user),
+) -> PlaylistTrack:
+    return _svc(db).add_track(
+        playlist_id,
+        owner_user_id=current_user.user_id,
+        track_id=payload.track_id,
+        after_track_id=payload.after_track_id,
+    )
+
+
+@router.patch(
+    "/{playlist_id}/tracks/{track_id}",
+    response_model=PlaylistTrackRead,
+    summary="Move track within playlist (owner only)",
+    responses={401: {"model": ErrorResponse}, 403: {"model": ErrorResponse}, 404: {"model": ErrorResponse}},
+)
+def move_playlist_track(
+    playlist_id: int,
+    track_id: int,
+    payload: PlaylistTrackMove,
+    db: Session = Depends(get_db),
+    current_user: CurrentUser = Depends(get_current_user),
+) -> PlaylistTrack:
+    return _svc(db).move_track(
+        playlist_id, owner_user_id=current_user.user_id, track_id=track_id, after_track_id=payload.after_track_id
+    )
+
+
+@router.delete(
+    "/{playlist_id}/tracks/{track_id}",
+    status_code=status.HTTP_204_NO_CONTENT,
+    summary="Remove track from playlist (owner only)",
+    responses={401: {"model": ErrorResponse}, 403: {"model": ErrorResponse}, 404: {"model": ErrorResponse}},
+)
+def remove_playlist_track(
+    playlist_id: int,
+    track_id: int,
+    db: Session = Depends(get_db),
+    current_user: CurrentUser = Depends(get_current_user),
+) -> None:
+    _svc(db).remove_track(playlist_id, owner_user_id=current_user.user_id, track_id=track_id)
@@ -2,32 +2,87 @@
 
 from pathlib import Path
 
-from fastapi import APIRouter, Depends, File, Form, UploadFile, HTTPException, status
+from fastapi import APIRouter, BackgroundTasks, Depends, File, Form, Query, Request, Response, UploadFile, HTTPException, status
 from fastapi.responses import FileResponse, RedirectResponse
-from sqlalchemy.orm import Session
-
-from app.api.deps import CurrentUser, get_current_user, get_db
+import orjson
+from pydantic import TypeAdapter
+from sqlalchemy.orm import Session, selectinload
+from starlette.concurrency import run_in_threadpool
+
+from app.api.deps import CurrentUser, get_current_user, get_db, upload_slot
+from app.api.responses import cached_json_response, cached_object_response
+from app.core.cache import TRACK_LIST_TAG, etag_matches, get_response_cache, make_etag, track_tag
 from app.core.config import settings
-from app.core.storage import StorageService
+from app.core.storage import StorageService, get_url_signer
 from app.models.track import Track
 from app.schemas import (
     ErrorResponse,
+    HotTrackItem,
+    HotTracksResponse,
+    SimilarTrackRead,
+    TrackBatchResponse,
     TrackCreate,
     TrackRead,
     TrackUpdate,
+    TrendingTrackRead,
     UploadFinalizeRequest,
     UploadInitiateRequest,
     UploadInitiateResponse,
+    UploadProgress,
 )
-from app.services.tracks import TrackService
+from app.services.chunked_uploads import ChunkedUploadService
+from app.services.feed import fan_out_track
+from app.services.heavy_hitters import METRICS, get_heavy_hitters
+from app.services.recommendations import RecommendationService
+from app.services.tracks import TrackService, parse_fields
+from app.services.trending import TrendingService
 
 router = APIRouter(prefix="/tracks", tags=["tracks"])
 
+_track_list_adapter = TypeAdapter(list[TrackRead])
+
 
 def _service(db: Session, storage: StorageService | None = None) -> TrackService:
     return TrackService(db=db, storage=storage or StorageService())
 
 
+_SIGNED_DESCRIPTION = "Add audio_signed_url / cover_signed_url (for the selected audio_url / cover_url) to fetch directly"
+_SIGNED_FIELDS = (("audio_url", "audio_signed_url", "stream"), ("cover_url", "cover_signed_url", "cover"))
+
+
+def _attach_signed_urls(rows: list[dict]) -> list[dict]:
+    """Add ready-to-use URLs next to the storage keys present in ``rows``, signed in one batch.
+
+    External cover URLs are passed through; when S3 is proxied through the disk
+    cache (``storage_presigned_redirects`` off) the URLs point at our own
+    stream/cover routes instead of the bucket.
+    """
+
+    signer = get_url_signer()
+    proxied = signer.storage.backend == "s3" and not settings.storage_presigned_redirects
+    keys = [
+        row[field]
+        for row in rows
+        for field, _, _ in _SIGNED_FIELDS
+        if row.get(field) and not row[field].startswith(("http://", "https://"))
+    ]
+    urls = {} if proxied else signer.sign_many(keys)
+    for row in rows:
+        for field, signed_field, route in _SIGNED_FIELDS:
+            if field not in row:
+                continue
+            key = row[field]
+            if not key:
+                row[signed_field] = None
+            elif key.startswith(("http://", "https://")):
+                row[signed_field] = key
+            elif proxied:
+                row[signed_field] = f"{settings.api_prefix}/tracks/{row['id']}/{route}"
+            else:
+                row[signed_field] = urls[key]
+    return rows
+
+
 @router.get(
     "",
     response_model=list[TrackRead],
@@ -35,13 +90,42 @@ def _service(db: Session, storage: StorageService | None = None) -> TrackService
     responses={400: {"model": ErrorResponse}, 401: {"model": ErrorResponse}, 500: {"model": ErrorResponse}},
 )
 def list_tracks(
+    request: Request,
     limit: int = 50,
     offset: int = 0,
+    fields: str | None = Query(default=None, description="Comma-separated TrackRead fields, e.g. id,title,cover_url"),
+    signed: bool = Query(default=False, description=_SIGNED_DESCRIPTION),
     db: Session = Depends(get_db),
-) -> list[Track]:
-    """Return a simple list of tracks."""
-
-    return _service(db).list_tracks(limit=limit, offset=offset)
+) -> Response:
+    """Return a simple list of tracks (cached, ETag-aware)."""
+
+    selected = parse_fields(fields)
+    suffix = ":signed" if signed else ""
+    if selected is not None:
+
+        def load_fields() -> bytes:
+            rows = _service(db).list_track_fields(selected, limit=limit, offset=offset)
+            return orjson.dumps(_attach_signed_urls(rows) if signed else rows)
+
+        return cached_json_response(
+            request,
+            key=f"tracks:list:limit={limit}:offset={offset}:fields={','.join(sorted(selected))}{suffix}",
+            loader=load_fields,
+            tags=[TRACK_LIST_TAG],
+        )
+
+    def load() -> bytes:
+        tracks = _track_list_adapter.validate_python(_service(db).list_tracks(limit=limit, offset=offset), from_attributes=True)
+        if not signed:
+            return _track_list_adapter.dump_json(tracks)
+        return orjson.dumps(_attach_signed_urls(_track_list_adapter.dump_python(tracks, mode="json")))
+
+    return cached_json_response(
+        request,
+        key=f"tracks:list:limit={limit}:offset={offset}{suffix}",
+        loader=load,
+        tags=[TRACK_LIST_TAG],
+    )
 
 
 @router.post(
@@ -53,12 +137,13 @@ def list_tracks(
 )
 def create_track(
     payload: TrackCreate,
+    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db),
     current_user: CurrentUser = Depends(get_current_user),
 ) -> Track:
-    """Create a track."""
+    """Create a track; followers' timelines are updated after the response."""
 
-    return _service(db).create_track(
+    track = _service(db).create_track(
         title=payload.title,
         description=payload.description,
         cover_url=payload.cover_url,
@@ -68,6 +153,107 @@ def create_track(
         ai_model=getattr(payload, "ai_model", None),
         owner_user_id=current_user.user_id,
     )
+    background_tasks.add_task(fan_out_track, db.get_bind(), track.id)
+    return track
+
+
+@router.get(
+    "/trending",
+    response_model=list[TrendingTrackRead],
+    summary="Trending tracks (time-decayed, optionally per genre)",
+    responses={400: {"model": ErrorResponse}, 500: {"model": ErrorResponse}},
+)
+def trending_tracks(
+    genre: str | None = None,
+    limit: int = 20,
+    db: Session = Depends(get_db),
+) -> list[Track]:
+    """Serve the precomputed leaderboard; scores are refreshed by a background job."""
+
+    return TrendingService(db).top(genre=genre, limit=limit)
+
+
+@router.get(
+    "/hot",
+    response_model=HotTracksResponse,
+    summary="Approximate most played / liked tracks in the sliding window",
+    responses={400: {"model": ErrorResponse}, 500: {"model": ErrorResponse}},
+)
+def hot_tracks(
+    metric: str = "plays",
+    limit: int = 10,
+    db: Session = Depends(get_db),
+) -> HotTracksResponse:
+    """Serve Count-Min Sketch estimates; see ``max_overcount`` for the error bound."""
+
+    if metric not in METRICS:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="UNKNOWN_METRIC")
+
+    hitters = get_heavy_hitters(metric).top(limit=min(max(limit, 1), 100))
+    ids = [track_id for track_id, _ in hitters.items]
+    tracks = {t.id: t for t in db.query(Track).options(selectinload(Track.owner)).filter(Track.id.in_(ids)).all()}
+
+    return HotTracksResponse(
+        metric=hitters.metric,
+        window_seconds=hitters.window_seconds,
+        total_events=hitters.total_events,
+        epsilon=hitters.epsilon,
+        delta=hitters.delta,
+        max_overcount=hitters.max_overcount,
+        items=[
+            HotTrackItem(track=TrackRead.model_validate(tracks[track_id]), estimated_count=count)
+            for track_id, count in hitters.items
+            if track_id in tracks
+        ],
+    )
+
+
+@router.get(
+    "/batch",
+    response_model=TrackBatchResponse,
+    summary="Get several tracks by id (order preserved, missing ids reported)",
+    responses={400: {"model": ErrorResponse}, 500: {"model": ErrorResponse}},
+)
+def get_tracks_batch(
+    request: Request,
+    ids: str = Query(description="Comma-separated track ids, e.g. 3,1,2"),
+    db: Session = Depends(get_db),
+) -> Response:
+    """Multi-get; per-track bodies are shared with ``GET /tracks/{id}`` in the response cache."""
+
+    try:
+        requested = list(dict.fromkeys(int(part) for part in ids.split(",") if part.strip()))
+    except ValueError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="INVALID_IDS") from None
+    if not requested:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="INVALID_IDS")
+    if len(requested) > settings.tracks_batch_max_ids:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="TOO_MANY_IDS")
+
+    cache = get_response_cache()
+    cached = cache.get_many([f"tracks:detail:{track_id}" for track_id in requested])
+    bodies = {int(key.rsplit(":", 1)[1]): entry.body for key, entry in cached.items()}
+
+    to_load = [track_id for track_id in requested if track_id not in bodies]
+    since = cache.snapshot()
+    for track_id, track in _service(db).get_tracks(to_load).items():
+        body = TrackRead.model_validate(track).model_dump_json().encode()
+        cache.set(f"tracks:detail:{track_id}", body, tags=[track_tag(track_id)], since=since)
+        bodies[track_id] = body
+
+    missing = [track_id for track_id in requested if track_id not in bodies]
+    content = (
+        b'{"items":['
+        + b",".join(bodies[track_id] for track_id in requested if track_id in bodies)
+        + b'],"missing":'
+        + orjson.dumps(missing)
+        + b"}"
+    )
+    etag = make_etag(content)
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(content=content, media_type="application/json", headers=headers)
 
 
 @router.get(
@@ -76,10 +262,42 @@ def create_track(
     summary="Get track detail",
     responses={404: {"model": ErrorResponse}, 401: {"model": ErrorResponse}, 500: {"model": ErrorResponse}},
 )
-def get_track(track_id: int, db: Session = Depends(get_db)) -> Track:
-    """Fetch a single track by ID."""
+def get_track(
+    track_id: int,
+    request: Request,
+    signed: bool = Query(default=False, description=_SIGNED_DESCRIPTION),
+    db: Session = Depends(get_db),
+) -> Response:
+    """Fetch a single track by ID (cached, ETag-aware)."""
+
+    if signed:
+        return cached_json_response(
+            request,
+            key=f"tracks:detail:{track_id}:signed",
+            loader=lambda: orjson.dumps(
+                _attach_signed_urls([TrackRead.model_validate(_service(db).get_track(track_id)).model_dump(mode="json")])[0]
+            ),
+            tags=[track_tag(track_id)],
+        )
+
+    return cached_json_response(
+        request,
+        key=f"tracks:detail:{track_id}",
+        loader=lambda: TrackRead.model_validate(_service(db).get_track(track_id)).model_dump_json().encode(),
+        tags=[track_tag(track_id)],
+    )
+
 
-    return _service(db).get_track(track_id)
+@router.get(
+    "/{track_id}/similar",
+    response_model=list[SimilarTrackRead],
+    summary="Listeners also liked (precomputed item-to-item neighbors)",
+    responses={404: {"model": ErrorResponse}, 500: {"model": ErrorResponse}},
+)
+def similar_tracks(track_id: int, limit: int = 20, db: Session = Depends(get_db)) -> list[Track]:
+    """Return neighbors computed offline by ``python -m app.services.recommendations``."""
+
+    return RecommendationService(db).similar(track_id, limit=limit)
 
 
 @router.patch(
@@ -131,6 +349,7 @@ def delete_track(
         401: {"model": ErrorResponse},
         403: {"model": ErrorResponse},
         404: {"model": ErrorResponse},
+        429: {"model": ErrorResponse},
         500: {"model": ErrorResponse},
     },
 )
@@ -138,11 +357,13 @@ async def replace_audio(
     track_id: int,
     file: UploadFile = File(...),
     db: Session = Depends(get_db),
-    current_user: CurrentUser = Depends(get_current_user),
+    current_user: CurrentUser = Depends(upload_slot),
 ) -> Track:
     """Replace the audio file of a track (local storage)."""
 
-    return _service(db).replace_audio(track_id=track_id, owner_user_id=current_user.user_id, file=file)
+    return await run_in_threadpool(
+        _service(db).replace_audio, track_id=track_id, owner_user_id=current_user.user_id, file=file
+    )
 
 
 @router.post(
@@ -175,6 +396,45 @@ def initiate_upload(
     )
 
 
+@router.put(
+    "/upload/{upload_id}/chunks",
+    response_model=UploadProgress,
+    summary="Upload one chunk of a resumable upload (local storage)",
+    responses={
+        400: {"model": ErrorResponse},
+        401: {"model": ErrorResponse},
+        404: {"model": ErrorResponse},
+        500: {"model": ErrorResponse},
+    },
+)
+async def upload_chunk(
+    upload_id: str,
+    request: Request,
+    offset: int = Query(description="Byte offset of this chunk in the final file"),
+    db: Session = Depends(get_db),
+    current_user: CurrentUser = Depends(get_current_user),
+) -> UploadProgress:
+    """Raw request body = chunk bytes. Chunks may be sent in parallel and in any order."""
+
+    return await ChunkedUploadService(db).receive_chunk(upload_id, current_user.user_id, offset, request.stream())
+
+
+@router.get(
+    "/upload/{upload_id}/chunks",
+    response_model=UploadProgress,
+    summary="Received byte ranges of a resumable upload",
+    responses={400: {"model": ErrorResponse}, 401: {"model": ErrorResponse}, 404: {"model": ErrorResponse}},
+)
+def upload_progress(
+    upload_id: str,
+    db: Session = Depends(get_db),
+    current_user: CurrentUser = Depends(get_current_user),
+) -> UploadProgress:
+    """Resume point: re-send only the ranges that are missing."""
+
+    return ChunkedUploadService(db).progress(upload_id, current_user.user_id)
+
+
 @router.post(
     "/upload/finalize",
     response_model=TrackRead,
@@ -184,34 +444,47 @@ def initiate_upload(
         400: {"model": ErrorResponse},
         401: {"model": ErrorResponse},
         404: {"model": ErrorResponse},
+        409: {"model": ErrorResponse},
         500: {"model": ErrorResponse},
     },
 )
 def finalize_upload(
     payload: UploadFinalizeRequest,
+    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db),
     current_user: CurrentUser = Depends(get_current_user),
 ) -> Track:
     """Finalize a previously initiated upload and create a Track."""
 
-    return _service(db).finalize_upload(payload, owner_user_id=current_user.user_id)
+    track = _service(db).finalize_upload(payload, owner_user_id=current_user.user_id)
+    background_tasks.add_task(fan_out_track, db.get_bind(), track.id)
+    return track
 
 
 @router.get(
     "/{track_id}/stream",
     summary="Stream a track from local storage (dev)",
-    responses={404: {"model": ErrorResponse}, 401: {"model": ErrorResponse}, 500: {"model": ErrorResponse}},
+    responses={
+        404: {"model": ErrorResponse},
+        401: {"model": ErrorResponse},
+        416: {"model": ErrorResponse},
+        500: {"model": ErrorResponse},
+    },
 )
-def stream_track(track_id: int, db: Session = Depends(get_db)) -> FileResponse:
-    """Stream track audio. If S3 사용 중이면 presigned URL로 리디렉션."""
+def stream_track(track_id: int, request: Request, db: Session = Depends(get_db)) -> FileResponse:
+    """Stream track audio. If S3 사용 중이면 presigned URL로 리디렉션 (or proxy via the disk cache)."""
 
     track = _service(db).get_track(track_id)
     if not track.audio_url:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="AUDIO_NOT_FOUND")
 
+    media_type = track.audio_content_type or "audio/mpeg"  # legacy rows predate sniffing
+
     # S3 사용 시 presigned GET으로 리디렉션
     storage = StorageService()
     if storage.is_s3_enabled:
+        if not settings.storage_presigned_redirects:
+            return cached_object_response(request, track.audio_url, media_type, "AUDIO_NOT_FOUND")
         presigned_url = storage.presign_get(track.audio_url)
         return RedirectResponse(url=presigned_url, status_code=status.HTTP_302_FOUND)
 
@@ -219,7 +492,7 @@ def stream_track(track_id: int, db: Session = Depends(get_db)) -> FileResponse:
     if not file_path.exists():
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="AUDIO_NOT_FOUND")
 
-    return FileResponse(path=file_path, media_type="audio/mpeg", filename=file_path.name)
+    return FileResponse(path=file_path, media_type=media_type, filename=file_path.name)
 
 
 @router.get(
@@ -227,7 +500,7 @@ def stream_track(track_id: int, db: Session = Depends(get_db)) -> FileResponse:
     summary="Fetch cover image for a track",
     responses={404: {"model": ErrorResponse}, 401: {"model": ErrorResponse}, 500: {"model": ErrorResponse}},
 )
-def get_cover(track_id: int, db: Session = Depends(get_db)):
+def get_cover(track_id: int, request: Request, db: Session = Depends(get_db)):
     """Return cover image file or presigned URL redirect."""
 
     track = _service(db).get_track(track_id)
@@ -236,6 +509,8 @@ def get_cover(track_id: int, db: Session = Depends(get_db)):
 
     storage = StorageService()
     if storage.is_s3_enabled:
+        if not settings.storage_presigned_redirects:
+            return cached_object_response(request, track.cover_url, _cover_media_type(track.cover_url), "COVER_NOT_FOUND")
         presigned_url = storage.presign_get(track.cover_url)
         return RedirectResponse(url=presigned_url, status_code=status.HTTP_302_FOUND)
 
@@ -243,14 +518,16 @@ def get_cover(track_id: int, db: Session = Depends(get_db)):
     if not file_path.exists():
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="COVER_NOT_FOUND")
 
-    media_type = "image/jpeg"
-    suffix = file_path.suffix.lower()
-    if suffix == ".png":
-        media_type = "image/png"
-    elif suffix == ".webp":
-        media_type = "image/webp"
+    return FileResponse(path=file_path, media_type=_cover_media_type(track.cover_url), filename=file_path.name)
 
-    return FileResponse(path=file_path, media_type=media_type, filename=file_path.name)
+
+def _cover_media_type(storage_key: str) -> str:
+    suffix = Path(storage_key).suffix.lower()
+    if suffix == ".png":
+        return "image/png"
+    if suffix == ".webp":
+        return "image/webp"
+    return "image/jpeg"
 
 
 @router.post(
@@ -276,10 +553,12 @@ def cleanup_expired_uploads(
     responses={
         400: {"model": ErrorResponse},
         401: {"model": ErrorResponse},
+        429: {"model": ErrorResponse},
         500: {"model": ErrorResponse},
     },
 )
 async def direct_upload(
+    background_tasks: BackgroundTasks,
     file: UploadFile = File(...),
     cover_file: UploadFile | None = File(None),
     title: str = Form(...),
@@ -289,11 +568,13 @@ async def direct_upload(
     ai_provider: str | None = Form(None),
     ai_model: str | None = Form(None),
     db: Session = Depends(get_db),
-    current_user: CurrentUser = Depends(get_current_user),
+    current_user: CurrentUser = Depends(upload_slot),
 ) -> Track:
     """Directly upload a file to local storage and create a Track."""
 
-    return _service(db).upload_direct(
+    # Sync service (file IO, metadata pool wait): keep it off the event loop.
+    track = await run_in_threadpool(
+        _service(db).upload_direct,
         file=file,
         cover_file=cover_file,
         title=title,
@@ -304,3 +585,5 @@ async def direct_upload(
         ai_model=ai_model,
         owner_user_id=current_user.user_id,
     )
+    background_tasks.add_task(fan_out_track, db.get_bind(), track.id)
+    return track
@@ -0,0 +1,215 @@
+"""Admission control: per-route-class concurrency limits with load shedding.
+
+Requests are classified before routing (so a rejected upload body is never
+read) into ``upload`` (including resumable chunk PUTs), ``stream`` and
+``read``; everything else, plus health and metrics probes, is admitted
+unconditionally. Each class has a semaphore of
+``MUSIC_ADMISSION_<CLASS>_LIMIT`` slots per worker process. When all slots are
+busy a request queues for at most ``MUSIC_ADMISSION_QUEUE_TIMEOUT_SECONDS``;
+once the smoothed queueing delay exceeds ``MUSIC_ADMISSION_TARGET_DELAY_MS``
+(or the queue is full) new arrivals fail fast with 503 and ``Retry-After``
+instead of piling up behind the backlog.
+
+Per-user upload concurrency is enforced separately after authentication by
+:class:`UploadQuota` (Redis counters shared by all workers, in-process
+fallback otherwise).
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import math
+import re
+import threading
+import time
+from functools import lru_cache
+
+from redis import Redis  # type: ignore[import]
+from redis.exceptions import RedisError  # type: ignore[import]
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from .config import settings
+from .metrics import ADMISSION_SHED, ADMISSION_WAIT
+from .redis import get_redis
+
+logger = logging.getLogger(__name__)
+
+_UPLOAD_PATH = re.compile(r"/upload/(direct|replace|[^/]+/chunks)$")
+_STREAM_PATH = re.compile(r"/(stream|cover)$")
+_EWMA_ALPHA = 0.2
+
+
+def classify(method: str, path: str) -> str | None:
+    """Route class for admission, or ``None`` when the request is not limited."""
+
+    if path.endswith(("/health", "/metrics")):
+        return None
+    if method in ("POST", "PUT") and _UPLOAD_PATH.search(path):
+        return "upload"
+    if method in ("GET", "HEAD"):
+        return "stream" if _STREAM_PATH.search(path) else "read"
+    return None
+
+
+class Gate:
+    """Bounded semaphore with a queue timeout and delay-based fast-fail."""
+
+    def __init__(self, name: str, limit: int, queue_timeout: float, target_delay: float, max_queue: int) -> None:
+        self.name = name
+        self.limit = limit
+        self.queue_timeout = queue_timeout
+        self.target_delay = target_delay
+        self.max_queue = max_queue
+        self.waiting = 0
+        self.delay = 0.0  # EWMA of queueing delay, seconds
+        self._semaphore = asyncio.Semaphore(limit)
+
+    def _record(self, waited: float) -> None:
+        self.delay += _EWMA_ALPHA * (waited - self.delay)
+        ADMISSION_WAIT.labels(route_class=self.name).observe(waited)
+
+    async def acquire(self) -> str | None:
+        """Take a slot; returns a shed reason instead when the request should be rejected."""
+
+        if not self._semaphore.locked():
+            await self._semaphore.acquire()
+            self._record(0.0)
+            return None
+        if self.waiting >= self.max_queue:
+            return "queue_full"
+        if self.delay > self.target_delay:
+            return "overloaded"
+
+        self.waiting += 1
+        start = time.perf_counter()
+        try:
+            await asyncio.wait_for(self._semaphore.acquire(), timeout=self.queue_timeout)
+        except asyncio.TimeoutError:
+            self._record(time.perf_counter() - start)
+            return "timeout"
+        finally:
+            self.waiting -= 1
+        self._record(time.perf_counter() - start)
+        return None
+
+    def release(self) -> None:
+        self._semaphore.release()
+
+    def retry_after(self) -> int:
+        return max(1, math.ceil(self.delay))
+
+
+def _gates() -> dict[str, Gate]:
+    limits = {
+        "upload": settings.admission_upload_limit,
+        "stream": settings.admission_stream_limit,
+        "read": settings.admission_read_limit,
+    }
+    return {
+        name: Gate(
+            name,
+            limit,
+            settings.admission_queue_timeout_seconds,
+            settings.admission_target_delay_ms / 1000,
+            settings.admission_max_queue,
+        )
+        for name, limit in limits.items()
+    }
+
+
+def _busy(retry_after: int) -> JSONResponse:
+    return JSONResponse(
+        {"code": "SERVER_BUSY", "message": "SERVER_BUSY"},
+        status_code=503,
+        headers={"Retry-After": str(retry_after)},
+    )
+
+
+class AdmissionMiddleware:
+    """Pure ASGI middleware applying the per-class :class:`Gate`."""
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+        self.gates = _gates()
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        route_class = classify(scope["method"], scope["path"]) if scope["type"] == "http" else None
+        if route_class is None:
+            await self.app(scope, receive, send)
+            return
+
+        gate = self.gates[route_class]
+        reason = await gate.acquire()
+        if reason is not None:
+            ADMISSION_SHED.labels(route_class=route_class, reason=reason).inc()
+            await _busy(gate.retry_after())(scope, receive, send)
+            return
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            gate.release()
+
+
+class UploadQuota:
+    """Concurrent uploads per user; Redis ``INCR``/``DECR`` counters or a local dict.
+
+    :meth:`acquire` returns the backend that granted the slot (``REDIS`` or
+    ``LOCAL``) and :meth:`release` must be given it back, so a slot taken from
+    the local fallback during a Redis outage is not "released" from Redis once
+    it recovers (and vice versa). Both block on Redis: call them from a thread.
+    """
+
+    REDIS = "redis"
+    LOCAL = "local"
+    _KEY = "admission:uploads:{user_id}"
+
+    def __init__(self, limit: int | None = None, redis_client: Redis | None = None) -> None:
+        self.limit = limit or settings.upload_user_concurrency
+        self.redis = redis_client if redis_client is not None else get_redis()
+        self._local: dict[int, int] = {}
+        self._lock = threading.Lock()
+
+    def acquire(self, user_id: int) -> str | None:
+        """Take a slot; returns the granting backend, or ``None`` when the user is at the limit."""
+
+        if self.redis is not None:
+            key = self._KEY.format(user_id=user_id)
+            try:
+                pipe = self.redis.pipeline()
+                pipe.incr(key)
+                # Safety net: a crashed worker's slots expire instead of blocking the user forever.
+                pipe.expire(key, settings.upload_quota_ttl_seconds)
+                count = pipe.execute()[0]
+                if count <= self.limit:
+                    return self.REDIS
+                self.redis.decr(key)
+                return None
+            except RedisError as exc:
+                logger.warning("Upload quota Redis call failed, using local counter: %s", exc)
+        with self._lock:
+            if self._local.get(user_id, 0) >= self.limit:
+                return None
+            self._local[user_id] = self._local.get(user_id, 0) + 1
+            return self.LOCAL
+
+    def release(self, user_id: int, backend: str) -> None:
+        if backend == self.REDIS:
+            try:
+                self.redis.decr(self._KEY.format(user_id=user_id))
+            except RedisError as exc:
+                # The key's TTL reclaims the slot eventually.
+                logger.warning("Upload quota Redis release failed: %s", exc)
+            return
+        with self._lock:
+            remaining = self._local.get(user_id, 0) - 1
+            if remaining > 0:
+                self._local[user_id] = remaining
+            else:
+                self._local.pop(user_id, None)
+
+
+@lru_cache
+def get_upload_quota() -> UploadQuota:
+    return UploadQuota()
@@ -83,6 +83,9 @@ async def decode_jwt(token: str, jwks_client: JWKSClient) -> dict:
 
     jwks = await jwks_client.get_jwks()
     key_data = _find_jwk_for_kid(kid, jwks)
+    if not key_data:
+        refreshed = await jwks_client.refresh()
+        key_data = _find_jwk_for_kid(kid, refreshed) if refreshed else None
     if not key_data:
         raise AuthError(code="JWKS_KEY_NOT_FOUND", message="Signing key not found")
 
@@ -0,0 +1,372 @@
+"""Response cache for hot read endpoints (in-process LRU + optional Redis)."""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass, field
+from functools import lru_cache
+
+from redis import Redis  # type: ignore[import]
+from redis.exceptions import RedisError  # type: ignore[import]
+
+from .config import settings
+from .invalidation import InvalidationBus, get_invalidation_bus
+from .metrics import CACHE_REQUESTS
+from .redis import get_redis
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class CacheEntry:
+    body: bytes
+    etag: str
+    expires_at: float
+    tags: frozenset[str] = field(default_factory=frozenset)
+
+
+def make_etag(body: bytes) -> str:
+    """Return a strong, quoted ETag for a response body."""
+
+    return '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """Evaluate an ``If-None-Match`` header against an ETag (weak comparison)."""
+
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = (tag.strip().removeprefix("W/") for tag in if_none_match.split(","))
+    return etag.removeprefix("W/") in candidates
+
+
+class _InFlight:
+    """A pending load that concurrent callers for the same key wait on."""
+
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.entry: CacheEntry | None = None
+        self.error: BaseException | None = None
+        self.stale = False
+
+
+class ResponseCache:
+    """Serialized-response cache keyed by route + params and invalidated by tags.
+
+    Entries live in a bounded in-process LRU. When Redis is configured it acts as
+    a shared second tier; any Redis failure degrades to a local miss. With a bus,
+    invalidations are also applied to the LRUs of the other workers.
+
+    Every invalidation advances an epoch and records it against the keys and
+    tags it touched. A body loaded before an invalidation of its key or tags is
+    stale: :meth:`set` with the :meth:`snapshot` taken before the load returns
+    it uncached instead of storing it for a whole TTL.
+    """
+
+    BUS_NAME = "response"
+    _KEY_PREFIX = "cache:resp:"
+    _TAG_PREFIX = "cache:tag:"
+    _MAX_INVALIDATIONS = 10_000
+
+    def __init__(
+        self,
+        max_entries: int | None = None,
+        ttl: int | None = None,
+        redis_client: Redis | None = None,
+        bus: InvalidationBus | None = None,
+    ) -> None:
+        self.max_entries = max_entries or settings.response_cache_max_entries
+        self.ttl = ttl or settings.response_cache_ttl
+        self._redis = redis_client
+        self._bus = bus
+        self._entries: OrderedDict[str, CacheEntry] = OrderedDict()
+        self._tag_index: dict[str, set[str]] = {}
+        self._inflight: dict[str, _InFlight] = {}
+        self._lock = threading.Lock()
+        self._epoch = 0
+        # "k:<key>" / "t:<tag>" -> epoch of its last invalidation, oldest first.
+        self._invalidated: OrderedDict[str, int] = OrderedDict()
+        self._floor = 0  # newest epoch pruned from _invalidated
+        self.hits = 0
+        self.misses = 0
+        if bus is not None:
+            bus.register(self.BUS_NAME, self._apply_invalidation)
+
+    def get(self, key: str) -> CacheEntry | None:
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry.expires_at > now:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    CACHE_REQUESTS.labels(cache="response", result="hit").inc()
+                    return entry
+                self._drop_locked(key)
+
+        entry = self._redis_get(key)
+        if entry is not None:
+            with self._lock:
+                self._store_locked(key, entry)
+                self.hits += 1
+            CACHE_REQUESTS.labels(cache="response", result="hit").inc()
+            return entry
+
+        with self._lock:
+            self.misses += 1
+        CACHE_REQUESTS.labels(cache="response", result="miss").inc()
+        return None
+
+    def get_many(self, keys: Iterable[str]) -> dict[str, CacheEntry]:
+        """Look up several keys; local misses go to Redis in one pipeline."""
+
+        now = time.time()
+        found: dict[str, CacheEntry] = {}
+        remote: list[str] = []
+        with self._lock:
+            for key in keys:
+                entry = self._entries.get(key)
+                if entry is not None and entry.expires_at > now:
+                    self._entries.move_to_end(key)
+                    found[key] = entry
+                else:
+                    if entry is not None:
+                        self._drop_locked(key)
+                    remote.append(key)
+
+        loaded = self._redis_get_many(remote)
+        with self._lock:
+            for key, entry in loaded.items():
+                self._store_locked(key, entry)
+            self.hits += len(found) + len(loaded)
+            self.misses += len(remote) - len(loaded)
+        CACHE_REQUESTS.labels(cache="response", result="hit").inc(len(found) + len(loaded))
+        CACHE_REQUESTS.labels(cache="response", result="miss").inc(len(remote) - len(loaded))
+        found.update(loaded)
+        return found
+
+    def snapshot(self) -> int:
+        """Current invalidation epoch; take it before loading a body for :meth:`set`."""
+
+        with self._lock:
+            return self._epoch
+
+    def set(self, key: str, body: bytes, tags: Iterable[str] = (), since: int | None = None) -> CacheEntry:
+        """Cache ``body``, unless ``key`` or ``tags`` were invalidated after epoch ``since``."""
+
+        return self._set(key, body, tags, since)[0]
+
+    def _set(self, key: str, body: bytes, tags: Iterable[str], since: int | None) -> tuple[CacheEntry, bool]:
+        entry = CacheEntry(
+            body=body,
+            etag=make_etag(body),
+            expires_at=time.time() + self.ttl,
+            tags=frozenset(tags),
+        )
+        with self._lock:
+            if self._stale_locked(key, entry.tags, since):
+                return entry, False
+            self._store_locked(key, entry)
+        self._redis_set(key, entry)
+        if since is not None:
+            with self._lock:
+                raced = self._stale_locked(key, entry.tags, since)
+            if raced:  # invalidated while the shared copy was being written
+                self._redis_invalidate(keys=(key,), tags=())
+        return entry, True
+
+    def get_or_load(self, key: str, loader: Callable[[], bytes], tags: Iterable[str] = ()) -> CacheEntry:
+        """Return a cached entry, loading it once even under concurrent misses."""
+
+        entry = self.get(key)
+        if entry is not None:
+            return entry
+
+        with self._lock:
+            pending = self._inflight.get(key)
+            leader = pending is None
+            if leader:
+                pending = self._inflight[key] = _InFlight()
+
+        if not leader:
+            pending.done.wait()
+            if pending.error is not None:
+                raise pending.error
+            if pending.stale:
+                return self.get_or_load(key, loader, tags)
+            assert pending.entry is not None
+            return pending.entry
+
+        try:
+            since = self.snapshot()
+            pending.entry, stored = self._set(key, loader(), tags, since)
+            pending.stale = not stored
+            return pending.entry
+        except BaseException as exc:
+            pending.error = exc
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+            pending.done.set()
+
+    def invalidate_tags(self, *tags: str) -> None:
+        # Advance the epoch before touching Redis so an in-flight load cannot re-store old data.
+        with self._lock:
+            self._bump_locked(keys=(), tags=tags)
+        self._redis_invalidate(keys=(), tags=tags)
+        self._publish(keys=[], tags=list(tags))
+
+    def invalidate_keys(self, *keys: str) -> None:
+        with self._lock:
+            self._bump_locked(keys=keys, tags=())
+        self._redis_invalidate(keys=keys, tags=())
+        self._publish(keys=list(keys), tags=[])
+
+    def _publish(self, keys: list[str], tags: list[str]) -> None:
+        if self._bus is not None:
+            self._bus.publish(self.BUS_NAME, keys=keys, tags=tags)
+        else:
+            self._apply_invalidation(keys, tags)
+
+    def _apply_invalidation(self, keys: list[str], tags: list[str]) -> None:
+        """Drop local entries only; shared tiers are handled by the publisher."""
+
+        with self._lock:
+            self._bump_locked(keys, tags)
+            for key in keys:
+                self._drop_locked(key)
+            for tag in tags:
+                for key in self._tag_index.pop(tag, set()):
+                    self._drop_locked(key)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._tag_index.clear()
+
+    def _bump_locked(self, keys: Iterable[str], tags: Iterable[str]) -> None:
+        self._epoch += 1
+        for name in [*("k:" + key for key in keys), *("t:" + tag for tag in tags)]:
+            self._invalidated[name] = self._epoch
+            self._invalidated.move_to_end(name)
+        while len(self._invalidated) > self._MAX_INVALIDATIONS:
+            _, epoch = self._invalidated.popitem(last=False)
+            self._floor = max(self._floor, epoch)
+
+    def _stale_locked(self, key: str, tags: Iterable[str], since: int | None) -> bool:
+        if since is None:
+            return False
+        if since < self._floor:
+            return True  # the record that could prove otherwise was pruned
+        names = ["k:" + key, *("t:" + tag for tag in tags)]
+        return any(self._invalidated.get(name, 0) > since for name in names)
+
+    def _store_locked(self, key: str, entry: CacheEntry) -> None:
+        if key in self._entries:
+            self._drop_locked(key)
+        self._entries[key] = entry
+        for tag in entry.tags:
+            self._tag_index.setdefault(tag, set()).add(key)
+        while len(self._entries) > self.max_entries:
+            oldest = next(iter(self._entries))
+            self._drop_locked(oldest)
+
+    def _drop_locked(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        for tag in entry.tags:
+            keys = self._tag_index.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tag_index[tag]
+
+    def _redis_get(self, key: str) -> CacheEntry | None:
+        return self._redis_get_many([key]).get(key)
+
+    def _redis_get_many(self, keys: list[str]) -> dict[str, CacheEntry]:
+        if not self._redis or not keys:
+            return {}
+        try:
+            pipe = self._redis.pipeline()
+            for key in keys:
+                pipe.get(self._KEY_PREFIX + key).ttl(self._KEY_PREFIX + key)
+            replies = pipe.execute()
+        except RedisError as exc:
+            logger.warning("Response cache Redis read failed: %s", exc)
+            return {}
+        entries = {}
+        for key, blob, ttl in zip(keys, replies[0::2], replies[1::2]):
+            if blob:
+                entries[key] = self._decode(blob, ttl)
+        return entries
+
+    @staticmethod
+    def _encode(entry: CacheEntry) -> bytes:
+        # "<etag>\t<tag>\t<tag>...\n<body>": tags travel with the entry so a worker
+        # that promotes it into its LRU still drops it on a bus tag invalidation.
+        header = "\t".join([entry.etag, *sorted(entry.tags)])
+        return header.encode() + b"\n" + entry.body
+
+    @staticmethod
+    def _decode(blob: bytes, ttl: int) -> CacheEntry:
+        header, _, body = blob.partition(b"\n")
+        etag, *tags = header.decode().split("\t")
+        return CacheEntry(body=body, etag=etag, expires_at=time.time() + max(int(ttl), 1), tags=frozenset(tags))
+
+    def _redis_set(self, key: str, entry: CacheEntry) -> None:
+        if not self._redis:
+            return
+        try:
+            pipe = self._redis.pipeline()
+            pipe.set(self._KEY_PREFIX + key, self._encode(entry), ex=self.ttl)
+            for tag in entry.tags:
+                pipe.sadd(self._TAG_PREFIX + tag, key)
+                pipe.expire(self._TAG_PREFIX + tag, self.ttl)
+            pipe.execute()
+        except RedisError as exc:
+            logger.warning("Response cache Redis write failed: %s", exc)
+
+    def _redis_invalidate(self, keys: Iterable[str], tags: Iterable[str]) -> None:
+        if not self._redis:
+            return
+        try:
+            doomed = [self._KEY_PREFIX + key for key in keys]
+            tags = list(tags)
+            if tags:
+                # MULTI/EXEC: reading a tag set and deleting it is one step, so a key
+                # added to the set in between cannot lose its membership.
+                pipe = self._redis.pipeline(transaction=True)
+                for tag in tags:
+                    pipe.smembers(self._TAG_PREFIX + tag)
+                    pipe.delete(self._TAG_PREFIX + tag)
+                replies = pipe.execute()
+                for members in replies[0::2]:
+                    doomed.extend(self._KEY_PREFIX + m.decode() for m in members)
+            if doomed:
+                self._redis.delete(*doomed)
+        except RedisError as exc:
+            logger.warning("Response cache Redis invalidation failed: %s", exc)
+
+
+def track_tag(track_id: int) -> str:
+    return f"track:{track_id}"
+
+
+TRACK_LIST_TAG = "tracks"
+
+
+@lru_cache
+def get_response_cache() -> ResponseCache:
+    """Return the process-wide response cache."""
+
+    return ResponseCache(redis_client=get_redis(), bus=get_invalidation_bus())
@@ -15,6 +15,11 @@ class Settings(BaseSettings):
 
     database_url: str = "sqlite:///./app.db"
     redis_url: str = "redis://localhost:6379/0"
+    redis_enabled: bool = False
+
+    response_cache_ttl: int = 300
+    response_cache_max_entries: int = 2048
+    tracks_batch_max_ids: int = 100
 
     jwks_url: AnyHttpUrl | None = None
     jwks_audience: str | None = None
@@ -35,6 +40,83 @@ class Settings(BaseSettings):
     aws_secret_access_key: str | None = None
 
     local_storage_path: str = "storage"
+    # False: stream/cover proxy S3 objects through the local disk cache instead of redirecting.
+    storage_presigned_redirects: bool = True
+    disk_cache_dir: str = "./cache/objects"
+    disk_cache_max_bytes: int = 2 * 1024**3
+    disk_cache_block_bytes: int = 1024**2
+    upload_chunk_dir: str = "./upload_chunks"
+    upload_chunk_max_bytes: int = 16 * 1024**2
+    metadata_workers: int = 2  # 0 = parse in the request thread
+    metadata_timeout_seconds: float = 10.0
+
+    trending_refresh_seconds: int = 60
+    trending_half_life_hours: float = 48.0
+    trending_window_days: int = 7
+    trending_top_n: int = 100
+    trending_max_tracked: int = 5000
+    trending_play_weight: float = 1.0
+    trending_like_weight: float = 3.0
+    trending_comment_weight: float = 5.0
+    trending_settle_seconds: int = 30  # longest an event insert may stay uncommitted
+
+    heavy_hitters_window_seconds: int = 3600
+    heavy_hitters_buckets: int = 12
+    heavy_hitters_epsilon: float = 0.0005
+    heavy_hitters_delta: float = 0.01
+    heavy_hitters_capacity: int = 200
+    heavy_hitters_flush_seconds: int = 5
+
+    recommender_neighbors: int = 50
+    recommender_chunk_size: int = 2048
+    recommender_workers: int = 0  # 0 = os.cpu_count()
+    recommender_like_weight: float = 3.0
+
+    feed_fanout_threshold: int = 10000
+    feed_timeline_cap: int = 800
+    feed_backfill: int = 20
+
+    playlist_max_tracks: int = 5000
+
+    metrics_enabled: bool = True
+    query_warn_count: int = 30
+    query_repeat_warn: int = 10
+    query_debug_header: bool | None = None  # None = only when environment == "development"
+
+    profiling_sample_rate: float = 0.0
+    profiling_secret: str | None = None
+    profiling_interval_ms: float = 5.0
+    profiling_dir: str = "./profiles"
+    profiling_max_files: int = 200
+
+    tracing_exporter: str = "none"  # none | json | otlp
+    tracing_sample_rate: float = 1.0
+    tracing_dir: str = "./traces"
+    tracing_otlp_endpoint: str = "http://127.0.0.1:4318/v1/traces"
+
+    admission_enabled: bool = True
+    admission_upload_limit: int = 4  # per worker process
+    admission_stream_limit: int = 64
+    admission_read_limit: int = 256
+    admission_queue_timeout_seconds: float = 5.0
+    admission_target_delay_ms: float = 500.0
+    admission_max_queue: int = 200
+    upload_user_concurrency: int = 2
+    upload_quota_ttl_seconds: int = 600
+
+    rate_limit_enabled: bool = True
+    # "METHOD /path/{template}" (without api_prefix) -> "count/period" per credential.
+    rate_limit_rules: dict[str, str] = {
+        "POST /interactions/tracks/{track_id}/like": "30/min",
+        "DELETE /interactions/tracks/{track_id}/like": "30/min",
+        "POST /interactions/tracks/{track_id}/comments": "10/min",
+        "POST /interactions/tracks/{track_id}/plays": "120/min",
+        "POST /creators/{user_id}/follow": "30/min",
+        "DELETE /creators/{user_id}/follow": "30/min",
+    }
+    rate_limit_ip_multiplier: float = 5.0  # 0 disables the per-IP bucket
+    # Proxy IPs/CIDRs whose X-Forwarded-For is believed when deriving the client IP.
+    rate_limit_trusted_proxies: list[str] = []
 
     model_config = SettingsConfigDict(
         env_file=".env",
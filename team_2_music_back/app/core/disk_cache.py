@@ -0,0 +1,247 @@
+"""Local LRU disk cache for objects proxied from S3.
+
+Used when ``MUSIC_STORAGE_PRESIGNED_REDIRECTS`` is off and the API streams
+object bytes itself. Objects are cached in fixed-size blocks
+(``MUSIC_DISK_CACHE_BLOCK_BYTES``) fetched with ranged GETs, so a seek into the
+middle of a track only pulls the blocks it touches. Concurrent misses for the
+same block share one fetch. The total size is bounded by
+``MUSIC_DISK_CACHE_MAX_BYTES``; a background thread evicts least-recently-used
+blocks once the bound is crossed, so request threads never delete files.
+Each object directory also holds a ``size`` file with the object's total size;
+it lives exactly as long as at least one of the object's blocks does.
+
+Block lookups are counted in ``cache_requests_total{cache="disk"}`` (``hit``,
+``miss`` or ``coalesced``) for the hit ratio.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import os
+import threading
+from collections import OrderedDict
+from collections.abc import Callable, Iterator
+from functools import lru_cache
+from pathlib import Path
+
+from .config import settings
+from .metrics import CACHE_REQUESTS
+
+logger = logging.getLogger(__name__)
+
+# (storage_key, first byte, last byte inclusive) -> (bytes, total object size)
+Fetcher = Callable[[str, int, int], tuple[bytes, int]]
+
+_LOW_WATERMARK = 0.9
+
+
+class _Flight:
+    __slots__ = ("done", "data", "error")
+
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.data = b""
+        self.error: BaseException | None = None
+
+
+class DiskCache:
+    def __init__(self, directory: str | Path, max_bytes: int, block_size: int, fetch: Fetcher) -> None:
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.block_size = block_size
+        self.fetch = fetch
+        self.size_bytes = 0
+        self._entries: OrderedDict[Path, int] = OrderedDict()
+        # Keyed by object directory, so eviction can drop them with the last block.
+        self._sizes: dict[Path, int] = {}
+        self._blocks: dict[Path, int] = {}
+        self._inflight: dict[Path, _Flight] = {}
+        self._lock = threading.Lock()
+        self._evict_wanted = threading.Event()
+        self._evictor: threading.Thread | None = None
+        self._load()
+
+    def _load(self) -> None:
+        """Index blocks left by a previous process, oldest access first."""
+
+        if not self.directory.exists():
+            return
+        found = []
+        for path in self.directory.glob("*/*/*.blk"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            if not (path.parent / "size").exists():
+                # Orphaned by a crash between writes: the object size is unknown.
+                path.unlink(missing_ok=True)
+                continue
+            found.append((stat.st_atime, path, stat.st_size))
+        for _, path, size in sorted(found):
+            self._entries[path] = size
+            self._blocks[path.parent] = self._blocks.get(path.parent, 0) + 1
+            self.size_bytes += size
+        if self.size_bytes > self.max_bytes:
+            self._schedule_eviction()
+
+    def _object_dir(self, key: str) -> Path:
+        digest = hashlib.sha1(key.encode("utf-8")).hexdigest()
+        return self.directory / digest[:2] / digest
+
+    def object_size(self, key: str) -> int:
+        """Total object size; fetches (and caches) the first block if unknown."""
+
+        obj = self._object_dir(key)
+        size = self._sizes.get(obj)
+        if size is not None:
+            return size
+        try:
+            size = int((obj / "size").read_text())
+        except (FileNotFoundError, ValueError):
+            self._block(key, 0)
+            size = self._sizes.get(obj)
+            if size is None:
+                # The evictor dropped the block, and its size with it, right after caching.
+                _, size = self.fetch(key, 0, 0)
+            return size
+        with self._lock:
+            # Only while a block is indexed, so the last eviction still clears it.
+            if obj in self._blocks:
+                self._sizes[obj] = size
+        return size
+
+    def iter_range(self, key: str, start: int, end: int) -> Iterator[bytes]:
+        """Yield bytes ``start..end`` (inclusive) block by block."""
+
+        bs = self.block_size
+        for index in range(start // bs, end // bs + 1):
+            data = self._block(key, index)
+            offset = index * bs
+            yield data[max(start - offset, 0) : end - offset + 1]
+
+    def _block(self, key: str, index: int) -> bytes:
+        path = self._object_dir(key) / f"{index}.blk"
+        with self._lock:
+            cached = path in self._entries
+            if cached:
+                self._entries.move_to_end(path)
+                flight, leader = None, False
+            else:
+                flight = self._inflight.get(path)
+                leader = flight is None
+                if leader:
+                    flight = self._inflight[path] = _Flight()
+
+        if cached:
+            try:
+                data = path.read_bytes()
+                os.utime(path)  # keeps restart ordering close to LRU on noatime mounts
+                CACHE_REQUESTS.labels(cache="disk", result="hit").inc()
+                return data
+            except FileNotFoundError:
+                # Evicted between the index lookup and the read: fetch it again.
+                self._forget(path)
+                return self._block(key, index)
+
+        assert flight is not None
+        if not leader:
+            CACHE_REQUESTS.labels(cache="disk", result="coalesced").inc()
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.data
+
+        CACHE_REQUESTS.labels(cache="disk", result="miss").inc()
+        try:
+            start = index * self.block_size
+            data, total = self.fetch(key, start, start + self.block_size - 1)
+            self._store(key, path, data, total)
+            flight.data = data
+            return data
+        except BaseException as exc:
+            flight.error = exc
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(path, None)
+            flight.done.set()
+
+    def _store(self, key: str, path: Path, data: bytes, total: int) -> None:
+        obj = path.parent
+        obj.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(f".{threading.get_ident()}.tmp")
+        tmp.write_bytes(data)
+        os.replace(tmp, path)
+        with self._lock:
+            if path not in self._entries:
+                self._blocks[obj] = self._blocks.get(obj, 0) + 1
+            if obj not in self._sizes:
+                # Written under the lock so it cannot race with evict() removing it.
+                self._sizes[obj] = total
+                (obj / "size").write_text(str(total))
+            self.size_bytes += len(data) - self._entries.get(path, 0)
+            self._entries[path] = len(data)
+            over = self.size_bytes > self.max_bytes
+        if over:
+            self._schedule_eviction()
+
+    def _forget(self, path: Path) -> None:
+        with self._lock:
+            if path in self._entries:
+                self.size_bytes -= self._drop_locked(path)
+
+    def _drop_locked(self, path: Path) -> int:
+        """Unindex a block; the object's size goes with its last block. Returns the block size."""
+
+        size = self._entries.pop(path)
+        obj = path.parent
+        remaining = self._blocks.pop(obj) - 1
+        if remaining:
+            self._blocks[obj] = remaining
+        else:
+            self._sizes.pop(obj, None)
+            (obj / "size").unlink(missing_ok=True)
+        return size
+
+    def _schedule_eviction(self) -> None:
+        if self._evictor is None or not self._evictor.is_alive():
+            self._evictor = threading.Thread(target=self._evict_loop, name="disk-cache-evictor", daemon=True)
+            self._evictor.start()
+        self._evict_wanted.set()
+
+    def _evict_loop(self) -> None:
+        while True:
+            self._evict_wanted.wait()
+            self._evict_wanted.clear()
+            try:
+                self.evict()
+            except Exception:  # pragma: no cover - keep the evictor alive
+                logger.exception("Disk cache eviction failed")
+
+    def evict(self) -> int:
+        """Drop least-recently-used blocks down to the low watermark; returns bytes freed."""
+
+        victims = []
+        target = int(self.max_bytes * _LOW_WATERMARK)
+        with self._lock:
+            while self.size_bytes > target and self._entries:
+                path = next(iter(self._entries))
+                size = self._drop_locked(path)
+                self.size_bytes -= size
+                victims.append((path, size))
+        for path, _ in victims:
+            path.unlink(missing_ok=True)
+        return sum(size for _, size in victims)
+
+
+@lru_cache
+def get_disk_cache() -> DiskCache:
+    from .storage import StorageService
+
+    return DiskCache(
+        settings.disk_cache_dir,
+        settings.disk_cache_max_bytes,
+        settings.disk_cache_block_bytes,
+        StorageService().get_range,
+    )
@@ -27,7 +27,10 @@ def register_error_handlers(app: FastAPI) -> None:
     async def http_exception_handler(request: Request, exc: StarletteHTTPException) -> JSONResponse:
         detail = exc.detail if isinstance(exc.detail, str) else DEFAULT_MESSAGE
         code = detail if detail.isupper() else "HTTP_ERROR"
-        return _error_response(code=code, message=detail, status_code=exc.status_code)
+        response = _error_response(code=code, message=detail, status_code=exc.status_code)
+        if exc.headers:
+            response.headers.update(exc.headers)
+        return response
 
     @app.exception_handler(RequestValidationError)
     async def validation_exception_handler(request: Request, exc: RequestValidationError) -> JSONResponse:
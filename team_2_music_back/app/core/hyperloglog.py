@@ -0,0 +1,102 @@
+"""NumPy HyperLogLog for approximate distinct counts.
+
+Uses the same precision as Redis (``p = 14``, 16384 registers, ~0.81% standard
+error) so local-only mode and ``PFCOUNT`` report comparable numbers.
+"""
+
+from __future__ import annotations
+
+import struct
+import zlib
+from collections.abc import Iterable
+
+from .lazy import lazy_import
+
+np = lazy_import("numpy")
+
+_HLL_MAGIC = b"HLL1"
+_HEADER = struct.Struct("<4sB")
+_CLZ_STEPS = (
+    (32, 0x00000000FFFFFFFF),
+    (16, 0x0000FFFFFFFFFFFF),
+    (8, 0x00FFFFFFFFFFFFFF),
+    (4, 0x0FFFFFFFFFFFFFFF),
+    (2, 0x3FFFFFFFFFFFFFFF),
+    (1, 0x7FFFFFFFFFFFFFFF),
+)
+
+
+def _splitmix64(values: np.ndarray) -> np.ndarray:
+    """Vectorized 64-bit finalizer; spreads sequential ids over the hash space."""
+
+    with np.errstate(over="ignore"):
+        z = values.astype(np.uint64) + np.uint64(0x9E3779B97F4A7C15)
+        z = (z ^ (z >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+        z = (z ^ (z >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+        return z ^ (z >> np.uint64(31))
+
+
+def _leading_zeros(x: np.ndarray) -> np.ndarray:
+    """Count leading zero bits of uint64 values (64 for zero)."""
+
+    n = np.zeros(x.shape, dtype=np.uint8)
+    x = x.copy()
+    for bits, limit in _CLZ_STEPS:
+        small = x <= np.uint64(limit)
+        n[small] += bits
+        x[small] <<= np.uint64(bits)
+    n[x == 0] = 64
+    return n
+
+
+class HyperLogLog:
+    """Dense HyperLogLog over integer members."""
+
+    def __init__(self, precision: int = 14) -> None:
+        if not 4 <= precision <= 18:
+            raise ValueError("precision must be between 4 and 18")
+        self.precision = precision
+        self.registers = np.zeros(1 << precision, dtype=np.uint8)
+
+    @property
+    def m(self) -> int:
+        return self.registers.size
+
+    def add(self, members: Iterable[int] | np.ndarray) -> None:
+        members = np.asarray(members, dtype=np.int64).ravel()
+        if members.size == 0:
+            return
+        hashed = _splitmix64(members)
+        index = (hashed >> np.uint64(64 - self.precision)).astype(np.intp)
+        remainder = hashed << np.uint64(self.precision)
+        rank = np.minimum(_leading_zeros(remainder) + 1, 64 - self.precision + 1).astype(np.uint8)
+        np.maximum.at(self.registers, index, rank)
+
+    def count(self) -> int:
+        m = float(self.m)
+        alpha = 0.7213 / (1.0 + 1.079 / m)
+        estimate = alpha * m * m / np.sum(np.exp2(-self.registers.astype(np.float64)))
+        zeros = int(np.count_nonzero(self.registers == 0))
+        if estimate <= 2.5 * m and zeros:
+            estimate = m * np.log(m / zeros)  # linear counting for small cardinalities
+        return int(round(estimate))
+
+    def merge(self, other: "HyperLogLog") -> None:
+        if other.precision != self.precision:
+            raise ValueError("cannot merge HyperLogLogs with different precision")
+        np.maximum(self.registers, other.registers, out=self.registers)
+
+    def to_bytes(self) -> bytes:
+        return _HEADER.pack(_HLL_MAGIC, self.precision) + zlib.compress(self.registers.tobytes(), level=6)
+
+    @classmethod
+    def from_bytes(cls, blob: bytes) -> "HyperLogLog":
+        magic, precision = _HEADER.unpack_from(blob, 0)
+        if magic != _HLL_MAGIC:
+            raise ValueError("not a HyperLogLog blob")
+        hll = cls(precision)
+        registers = np.frombuffer(zlib.decompress(blob[_HEADER.size :]), dtype=np.uint8)
+        if registers.size != hll.m:
+            raise ValueError("corrupt HyperLogLog blob")
+        hll.registers = registers.copy()
+        return hll
@@ -0,0 +1,210 @@
+"""Cross-worker cache invalidation bus.
+
+Every uvicorn worker keeps its own in-process caches. Caches register a handler
+under a name; ``publish`` applies the invalidation locally and broadcasts it so
+the other workers drop the same keys/tags. Redis pub/sub carries messages in
+production, ``LocalInvalidationBus`` is an in-process stand-in for tests.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass, field
+from functools import lru_cache
+from uuid import uuid4
+
+from redis import Redis  # type: ignore[import]
+from redis.exceptions import RedisError  # type: ignore[import]
+
+from .config import settings
+from .metrics import INVALIDATION_PROPAGATION
+from .redis import get_redis
+
+logger = logging.getLogger(__name__)
+
+InvalidationHandler = Callable[[list[str], list[str]], None]
+
+
+@dataclass
+class InvalidationMessage:
+    cache: str
+    keys: list[str] = field(default_factory=list)
+    tags: list[str] = field(default_factory=list)
+    origin: str = ""
+    sent_at: float = 0.0
+
+    def to_json(self) -> str:
+        return json.dumps(
+            {"cache": self.cache, "keys": self.keys, "tags": self.tags, "origin": self.origin, "sent_at": self.sent_at}
+        )
+
+    @classmethod
+    def from_json(cls, raw: str | bytes) -> "InvalidationMessage":
+        data = json.loads(raw)
+        return cls(
+            cache=data["cache"],
+            keys=list(data.get("keys") or []),
+            tags=list(data.get("tags") or []),
+            origin=data.get("origin", ""),
+            sent_at=float(data.get("sent_at") or 0.0),
+        )
+
+
+@dataclass
+class PropagationStats:
+    """Delivery latency of invalidations received from other workers."""
+
+    count: int = 0
+    total_seconds: float = 0.0
+    max_seconds: float = 0.0
+    last_seconds: float = 0.0
+
+    def observe(self, seconds: float) -> None:
+        seconds = max(seconds, 0.0)
+        self.count += 1
+        self.total_seconds += seconds
+        self.last_seconds = seconds
+        self.max_seconds = max(self.max_seconds, seconds)
+
+    @property
+    def mean_seconds(self) -> float:
+        return self.total_seconds / self.count if self.count else 0.0
+
+
+class InvalidationBus(ABC):
+    """Base bus: local handler registry plus latency bookkeeping; subclasses supply the transport."""
+
+    def __init__(self) -> None:
+        self.origin = f"{os.getpid()}-{uuid4().hex[:8]}"
+        self._handlers: dict[str, list[InvalidationHandler]] = {}
+        self._lock = threading.Lock()
+        self.stats = PropagationStats()
+
+    def register(self, cache: str, handler: InvalidationHandler) -> None:
+        with self._lock:
+            self._handlers.setdefault(cache, []).append(handler)
+
+    def publish(self, cache: str, keys: Iterable[str] = (), tags: Iterable[str] = ()) -> None:
+        """Invalidate locally, then broadcast to the other workers."""
+
+        message = InvalidationMessage(
+            cache=cache, keys=list(keys), tags=list(tags), origin=self.origin, sent_at=time.time()
+        )
+        if not message.keys and not message.tags:
+            return
+        self._dispatch(message)
+        self._broadcast(message)
+
+    def start(self) -> None:
+        """Begin receiving remote invalidations (no-op for local buses)."""
+
+    def stop(self) -> None:
+        """Stop receiving remote invalidations."""
+
+    @abstractmethod
+    def _broadcast(self, message: InvalidationMessage) -> None:
+        """Deliver ``message`` to the other workers (the local dispatch already happened)."""
+
+    def _receive(self, message: InvalidationMessage) -> None:
+        if message.origin == self.origin:
+            return
+        delay = time.time() - message.sent_at
+        self.stats.observe(delay)
+        INVALIDATION_PROPAGATION.observe(max(delay, 0.0))
+        self._dispatch(message)
+
+    def _dispatch(self, message: InvalidationMessage) -> None:
+        with self._lock:
+            handlers = list(self._handlers.get(message.cache, ()))
+        for handler in handlers:
+            try:
+                handler(message.keys, message.tags)
+            except Exception as exc:  # noqa: BLE001
+                logger.warning("Invalidation handler for %s failed: %s", message.cache, exc)
+
+
+class LocalInvalidationBus(InvalidationBus):
+    """In-process stand-in; buses sharing a ``peers`` list behave like separate workers."""
+
+    def __init__(self, peers: list["LocalInvalidationBus"] | None = None) -> None:
+        super().__init__()
+        self._peers = peers if peers is not None else []
+        self._peers.append(self)
+
+    def _broadcast(self, message: InvalidationMessage) -> None:
+        for peer in list(self._peers):
+            if peer is not self:
+                peer._receive(message)
+
+
+class RedisInvalidationBus(InvalidationBus):
+    """Redis pub/sub transport; a daemon thread applies messages from other workers."""
+
+    CHANNEL = "cache:invalidate"
+
+    def __init__(self, redis_client: Redis) -> None:
+        super().__init__()
+        self._redis = redis_client
+        # Dedicated connection without a read timeout: the subscriber blocks on reads.
+        self._subscriber = Redis.from_url(settings.redis_url, socket_connect_timeout=0.5)
+        self._thread: threading.Thread | None = None
+        self._stopping = threading.Event()
+
+    def _broadcast(self, message: InvalidationMessage) -> None:
+        try:
+            self._redis.publish(self.CHANNEL, message.to_json())
+        except RedisError as exc:
+            # Other workers fall back to TTL expiry for this message.
+            logger.warning("Invalidation publish failed: %s", exc)
+
+    def start(self) -> None:
+        if self._thread and self._thread.is_alive():
+            return
+        self._stopping.clear()
+        self._thread = threading.Thread(target=self._listen, name="cache-invalidation", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stopping.set()
+        if self._thread:
+            self._thread.join(timeout=2)
+            self._thread = None
+
+    def _listen(self) -> None:
+        while not self._stopping.is_set():
+            pubsub = self._subscriber.pubsub(ignore_subscribe_messages=True)
+            try:
+                pubsub.subscribe(self.CHANNEL)
+                while not self._stopping.is_set():
+                    raw = pubsub.get_message(timeout=1.0)
+                    if raw and raw.get("type") == "message":
+                        self._handle_raw(raw["data"])
+            except RedisError as exc:
+                logger.warning("Invalidation subscriber error, reconnecting: %s", exc)
+                self._stopping.wait(1.0)
+            finally:
+                pubsub.close()
+
+    def _handle_raw(self, data: str | bytes) -> None:
+        try:
+            message = InvalidationMessage.from_json(data)
+        except (ValueError, KeyError, TypeError) as exc:
+            logger.warning("Malformed invalidation message ignored: %s", exc)
+            return
+        self._receive(message)
+
+
+@lru_cache
+def get_invalidation_bus() -> InvalidationBus:
+    """Return the process-wide bus (Redis when enabled, otherwise local)."""
+
+    redis_client = get_redis()
+    if redis_client is None:
+        return LocalInvalidationBus()
+    return RedisInvalidationBus(redis_client)
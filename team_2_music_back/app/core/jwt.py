@@ -3,6 +3,7 @@
 from __future__ import annotations
 
 import json
+import logging
 import time
 from typing import Any
 
@@ -10,19 +11,31 @@ import httpx
 from redis.asyncio import Redis  # type: ignore[import]
 
 from .config import settings
+from .invalidation import InvalidationBus
+from .metrics import CACHE_REQUESTS
+from .tracing import HTTPX_EVENT_HOOKS, span
+
+
+logger = logging.getLogger(__name__)
 
 
 class JWKSClient:
     """Fetch and cache JWKS documents for RS256 verification."""
 
+    BUS_NAME = "jwks"
     _CACHE_KEY = "auth:jwks"
+    _MIN_REFRESH_SECONDS = 30.0  # unknown-kid refetches, so random kids cannot hammer the IdP
 
-    def __init__(self, redis_client: Redis | None = None) -> None:
+    def __init__(self, redis_client: Redis | None = None, bus: InvalidationBus | None = None) -> None:
         self._redis = redis_client
+        self._bus = bus
         # httpx expects a string URL; Pydantic's AnyHttpUrl needs to be cast.
         self._jwks_url = str(settings.jwks_url) if settings.jwks_url else None
         self._ttl = settings.jwks_cache_ttl
         self._local_cache: tuple[float, dict[str, Any]] | None = None
+        self._last_refresh = 0.0
+        if bus is not None:
+            bus.register(self.BUS_NAME, self.invalidate)
 
     async def warm(self) -> None:
         """Prime the cache so the first request is fast.
@@ -36,9 +49,7 @@ class JWKSClient:
         try:
             await self.get_jwks()
         except Exception as exc:  # noqa: BLE001
-            import logging
-
-            logging.getLogger(__name__).warning("JWKS warmup failed: %s", exc)
+            logger.warning("JWKS warmup failed: %s", exc)
 
     async def get_jwks(self) -> dict[str, Any]:
         """Retrieve JWKS using Redis and in-process caching."""
@@ -48,17 +59,21 @@ class JWKSClient:
 
         cached = self._read_from_local_cache()
         if cached:
+            CACHE_REQUESTS.labels(cache="jwks", result="hit").inc()
             return cached
 
         if self._redis:
             blob = await self._redis.get(self._CACHE_KEY)
             if blob:
+                CACHE_REQUESTS.labels(cache="jwks", result="hit").inc()
                 data = json.loads(blob)
                 self._write_local_cache(data)
                 return data
 
-        async with httpx.AsyncClient(timeout=10) as client:
-            response = await client.get(self._jwks_url)
+        CACHE_REQUESTS.labels(cache="jwks", result="miss").inc()
+        async with httpx.AsyncClient(timeout=10, event_hooks=HTTPX_EVENT_HOOKS) as client:
+            with span("auth.jwks_fetch"):
+                response = await client.get(self._jwks_url)
             response.raise_for_status()
             data = response.json()
 
@@ -68,6 +83,31 @@ class JWKSClient:
         self._write_local_cache(data)
         return data
 
+    async def refresh(self) -> dict[str, Any] | None:
+        """Refetch after a token named an unknown ``kid`` (the IdP rotated its keys).
+
+        Every worker drops its copy through the bus, so the others pick up the new
+        keys too. Returns ``None`` when a refresh already ran in the last
+        ``_MIN_REFRESH_SECONDS``.
+        """
+
+        now = time.time()
+        if now - self._last_refresh < self._MIN_REFRESH_SECONDS:
+            return None
+        self._last_refresh = now
+        if self._bus is not None:
+            self._bus.publish(self.BUS_NAME, keys=[self._CACHE_KEY])
+        else:
+            self.invalidate()
+        if self._redis:
+            await self._redis.delete(self._CACHE_KEY)
+        return await self.get_jwks()
+
+    def invalidate(self, keys: list[str] | None = None, tags: list[str] | None = None) -> None:
+        """Drop the in-process copy (e.g. after key rotation on another worker)."""
+
+        self._local_cache = None
+
     def _read_from_local_cache(self) -> dict[str, Any] | None:
         if not self._local_cache:
             return None
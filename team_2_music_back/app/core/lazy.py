@@ -0,0 +1,25 @@
+"""Deferred imports for heavy optional dependencies.
+
+``np = lazy_import("numpy")`` binds a stand-in module that performs the real
+import on first attribute access, so importing ``app`` (worker boot, test
+collection) does not pay for NumPy/SciPy unless a code path actually uses
+them. Module-level constants must not touch the stand-in, or the saving is lost.
+"""
+
+from __future__ import annotations
+
+import importlib
+from types import ModuleType
+from typing import Any
+
+
+class _LazyModule(ModuleType):
+    def __getattr__(self, attr: str) -> Any:
+        module = importlib.import_module(self.__name__)
+        # Copy the namespace so later lookups skip this hook entirely.
+        self.__dict__.update(module.__dict__)
+        return getattr(module, attr)
+
+
+def lazy_import(name: str) -> ModuleType:
+    return _LazyModule(name)
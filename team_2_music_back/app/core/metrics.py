@@ -0,0 +1,135 @@
+"""Prometheus metrics.
+
+All metrics live on the default registry. With several uvicorn workers set
+``PROMETHEUS_MULTIPROC_DIR`` (an empty, writable directory) before start-up;
+``/metrics`` then aggregates every worker's samples. Route labels use the
+matched route template (``/api/tracks/{track_id}``), never the raw path, so
+label cardinality is bounded by the number of routes.
+"""
+
+from __future__ import annotations
+
+import os
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+from starlette.requests import Request
+from starlette.responses import Response
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+_LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+_FAST_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0)
+
+HTTP_REQUESTS = Counter("http_requests_total", "HTTP requests by route template and status", ["method", "route", "status"])
+HTTP_LATENCY = Histogram(
+    "http_request_duration_seconds", "HTTP request latency", ["method", "route"], buckets=_LATENCY_BUCKETS
+)
+HTTP_IN_FLIGHT = Gauge("http_requests_in_flight", "Requests currently being served", multiprocess_mode="livesum")
+
+DB_CHECKOUT = Histogram("db_pool_checkout_seconds", "Time to obtain a pooled DB connection", buckets=_FAST_BUCKETS)
+DB_QUERIES_PER_REQUEST = Histogram(
+    "db_queries_per_request", "SQL statements executed per HTTP request", ["route"], buckets=(0, 1, 2, 3, 5, 10, 20, 50, 100)
+)
+
+STORAGE_LATENCY = Histogram(
+    "storage_operation_seconds", "Storage operation latency", ["operation", "backend"], buckets=_LATENCY_BUCKETS
+)
+UPLOAD_BYTES = Counter("upload_bytes_total", "Bytes received through upload endpoints", ["kind"])
+
+AUTH_LATENCY = Histogram("auth_verification_seconds", "Auth verification latency", ["step"], buckets=_LATENCY_BUCKETS)
+CACHE_REQUESTS = Counter("cache_requests_total", "Cache lookups by cache and result", ["cache", "result"])
+ADMISSION_SHED = Counter("admission_shed_total", "Requests rejected by admission control", ["route_class", "reason"])
+ADMISSION_WAIT = Histogram(
+    "admission_queue_wait_seconds", "Time spent waiting for an admission slot", ["route_class"], buckets=_FAST_BUCKETS
+)
+RATE_LIMITED = Counter("rate_limited_total", "Requests rejected by rate limiting", ["rule"])
+INVALIDATION_PROPAGATION = Histogram(
+    "cache_invalidation_propagation_seconds",
+    "Delay between publishing an invalidation and another worker applying it",
+    buckets=_FAST_BUCKETS,
+)
+
+
+@contextmanager
+def observe(histogram: Histogram, **labels: str) -> Iterator[None]:
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        (histogram.labels(**labels) if labels else histogram).observe(time.perf_counter() - start)
+
+
+def instrument_engine(engine) -> None:
+    """Time pool checkouts for ``engine`` (per-request statement counts live in ``query_audit``)."""
+
+    pool = engine.pool
+    connect = pool.connect
+
+    def timed_connect():
+        with observe(DB_CHECKOUT):
+            return connect()
+
+    pool.connect = timed_connect
+
+
+def route_template(scope: Scope) -> str:
+    route = scope.get("route")
+    path = getattr(route, "path_format", None) or getattr(route, "path", None)
+    return path or "unmatched"
+
+
+class MetricsMiddleware:
+    """Pure ASGI middleware recording latency and status per route."""
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        HTTP_IN_FLIGHT.inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - start
+            HTTP_IN_FLIGHT.dec()
+            route = route_template(scope)
+            method = scope["method"]
+            HTTP_REQUESTS.labels(method=method, route=route, status=str(status_code)).inc()
+            HTTP_LATENCY.labels(method=method, route=route).observe(elapsed)
+
+
+def metrics_endpoint(request: Request) -> Response:
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return Response(generate_latest(registry), media_type=CONTENT_TYPE_LATEST)
+    return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
+
+
+def mark_worker_dead() -> None:
+    """Drop this worker's live gauges from the multiprocess directory on shutdown."""
+
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        multiprocess.mark_process_dead(os.getpid())
@@ -0,0 +1,211 @@
+"""Sampling request profiler.
+
+A profiled request gets a sampler thread that snapshots ``sys._current_frames()``
+every ``MUSIC_PROFILING_INTERVAL_MS`` and folds the stacks of the event-loop
+thread and of any worker thread currently running code from the ``app``
+package (sync routes and services run in the threadpool). Samples are written
+as collapsed stacks (``frame;frame;frame count``), which speedscope, inferno
+and ``flamegraph.pl`` load directly. Under concurrent traffic worker threads
+serving other requests can leak into a profile; profile on a quiet worker
+when that matters.
+
+A request is profiled when it is picked by ``MUSIC_PROFILING_SAMPLE_RATE`` or
+carries a valid ``X-Profile`` header (see :func:`sign_token`). When neither a
+rate nor a secret is configured the middleware is not installed at all.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import hmac
+import random
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from .config import settings
+from .metrics import route_template
+
+PROFILE_HEADER = "x-profile"
+PROFILE_SUFFIX = ".collapsed"
+
+_APP_ROOT = str(Path(__file__).resolve().parents[1])
+_IDLE = "<event loop idle>"
+_WORKER_PREFIX = "AnyIO worker thread"
+
+
+def profiling_enabled() -> bool:
+    return settings.profiling_sample_rate > 0 or bool(settings.profiling_secret)
+
+
+def sign_token(secret: str, ttl: int = 300, now: float | None = None) -> str:
+    """Return an ``X-Profile`` value (``<expires>.<hmac>``) valid for ``ttl`` seconds."""
+
+    expires = int((now or time.time()) + ttl)
+    digest = hmac.new(secret.encode(), str(expires).encode(), hashlib.sha256).hexdigest()
+    return f"{expires}.{digest}"
+
+
+def verify_token(token: str | None, secret: str | None, now: float | None = None) -> bool:
+    if not token or not secret:
+        return False
+    expires, _, digest = token.partition(".")
+    if not expires.isdigit() or int(expires) < (now or time.time()):
+        return False
+    expected = hmac.new(secret.encode(), expires.encode(), hashlib.sha256).hexdigest()
+    return hmac.compare_digest(digest, expected)
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    filename = code.co_filename
+    if filename.startswith(_APP_ROOT):
+        filename = "app" + filename[len(_APP_ROOT) :]
+    else:
+        filename = Path(filename).name
+    return f"{code.co_name} ({filename}:{code.co_firstlineno})".replace(";", ",")
+
+
+def _stack(frame) -> tuple[list[str], bool]:
+    labels: list[str] = []
+    in_app = False
+    while frame is not None:
+        labels.append(_frame_label(frame))
+        in_app = in_app or frame.f_code.co_filename.startswith(_APP_ROOT)
+        frame = frame.f_back
+    labels.reverse()
+    return labels, in_app
+
+
+class Sampler:
+    """Background thread folding stack samples into collapsed-stack counts."""
+
+    def __init__(self, loop_thread: int, interval: float) -> None:
+        self.loop_thread = loop_thread
+        self.interval = interval
+        self.samples: Counter[str] = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            workers = {t.ident for t in threading.enumerate() if t.name.startswith(_WORKER_PREFIX)}
+            for ident, frame in sys._current_frames().items():
+                if ident != self.loop_thread and ident not in workers:
+                    continue
+                labels, in_app = _stack(frame)
+                if ident == self.loop_thread:
+                    self.samples[";".join(labels) if in_app else _IDLE] += 1
+                elif in_app:
+                    self.samples[";".join(["<worker thread>", *labels])] += 1
+
+
+@dataclass
+class ProfileInfo:
+    name: str
+    method: str
+    route: str
+    duration_ms: int
+    samples: int
+    size_bytes: int
+    created_at: datetime
+
+
+_NAME = re.compile(r"^(?P<ts>\d{8}T\d{6}\d{6})_(?P<method>[A-Z]+)_(?P<route>[A-Za-z0-9-]+)_(?P<ms>\d+)ms\.collapsed$")
+
+
+class ProfileStore:
+    """Collapsed-stack files in one directory, keeping the newest ``max_files``."""
+
+    def __init__(self, directory: str | Path | None = None, max_files: int | None = None) -> None:
+        self.directory = Path(directory or settings.profiling_dir)
+        self.max_files = max_files or settings.profiling_max_files
+
+    def write(self, method: str, route: str, duration: float, samples: Counter[str]) -> Path:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S%f")
+        slug = re.sub(r"[^A-Za-z0-9]+", "-", route).strip("-") or "root"
+        path = self.directory / f"{stamp}_{method}_{slug}_{int(duration * 1000)}ms{PROFILE_SUFFIX}"
+        path.write_text("".join(f"{stack} {count}\n" for stack, count in samples.most_common()), encoding="utf-8")
+        self._rotate()
+        return path
+
+    def _files(self) -> list[Path]:
+        if not self.directory.is_dir():
+            return []
+        return sorted(self.directory.glob(f"*{PROFILE_SUFFIX}"), reverse=True)
+
+    def _rotate(self) -> None:
+        for stale in self._files()[self.max_files :]:
+            stale.unlink(missing_ok=True)
+
+    def list(self, limit: int = 50) -> list[ProfileInfo]:
+        items = []
+        for path in self._files()[:limit]:
+            match = _NAME.match(path.name)
+            if not match:
+                continue
+            text = path.read_text(encoding="utf-8")
+            items.append(
+                ProfileInfo(
+                    name=path.name,
+                    method=match["method"],
+                    route=match["route"],
+                    duration_ms=int(match["ms"]),
+                    samples=sum(int(line.rsplit(" ", 1)[1]) for line in text.splitlines() if line),
+                    size_bytes=path.stat().st_size,
+                    created_at=datetime.strptime(match["ts"], "%Y%m%dT%H%M%S%f").replace(tzinfo=timezone.utc),
+                )
+            )
+        return items
+
+    def path_for(self, name: str) -> Path | None:
+        if not _NAME.match(name):
+            return None
+        path = self.directory / name
+        return path if path.is_file() else None
+
+
+class ProfilingMiddleware:
+    """Pure ASGI middleware that samples selected requests; see module docstring."""
+
+    def __init__(self, app: ASGIApp, store: ProfileStore | None = None) -> None:
+        self.app = app
+        self.store = store or ProfileStore()
+
+    def _selected(self, scope: Scope) -> bool:
+        if scope["path"].startswith(f"{settings.api_prefix}/admin/"):  # admin calls carry the token too
+            return False
+        for name, value in scope.get("headers", []):
+            if name == PROFILE_HEADER.encode():
+                return verify_token(value.decode("latin-1"), settings.profiling_secret)
+        return random.random() < settings.profiling_sample_rate
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not self._selected(scope):
+            await self.app(scope, receive, send)
+            return
+
+        sampler = Sampler(threading.get_ident(), settings.profiling_interval_ms / 1000)
+        start = time.perf_counter()
+        sampler.start()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            sampler.stop()
+            if sampler.samples:
+                self.store.write(scope["method"], route_template(scope), time.perf_counter() - start, sampler.samples)
@@ -0,0 +1,148 @@
+"""Per-request SQL auditing.
+
+Engine event hooks record, for the request being served, how many statements
+ran, how long they took and how often each statement *shape* repeated. The
+shape (fingerprint) ignores literals and the length of ``IN (...)`` lists, so a
+lazy load issued once per row of a page shows up as one fingerprint with a high
+count: the usual N+1 signature.
+
+Requests over ``MUSIC_QUERY_WARN_COUNT`` statements, or with a fingerprint
+repeated ``MUSIC_QUERY_REPEAT_WARN`` times, are logged as warnings. With
+``MUSIC_QUERY_DEBUG_HEADER`` (on by default in development) responses carry an
+``X-DB-Queries`` header such as ``count=4; time=1.8ms; max-repeat=1``.
+"""
+
+from __future__ import annotations
+
+import logging
+import re
+import time
+from collections import Counter
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+
+from sqlalchemy import event
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from .config import settings
+from .metrics import DB_QUERIES_PER_REQUEST, route_template
+
+logger = logging.getLogger(__name__)
+
+DEBUG_HEADER = "x-db-queries"
+
+_IN_LIST = re.compile(r"\(\s*(?:\?|%\(\w+\)s|%s|:\w+|\$\d+)(?:\s*,\s*(?:\?|%\(\w+\)s|%s|:\w+|\$\d+))*\s*\)")
+_LITERAL = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+_SPACE = re.compile(r"\s+")
+
+
+def fingerprint(statement: str) -> str:
+    """Normalise ``statement`` so executions differing only in parameters compare equal."""
+
+    text = _LITERAL.sub("?", statement)
+    text = _IN_LIST.sub("(?)", text)
+    return _SPACE.sub(" ", text).strip()
+
+
+@dataclass
+class QueryStats:
+    queries: int = 0
+    seconds: float = 0.0
+    fingerprints: Counter = field(default_factory=Counter)
+
+    @property
+    def max_repeat(self) -> int:
+        return max(self.fingerprints.values(), default=0)
+
+    def repeated(self, threshold: int) -> list[tuple[str, int]]:
+        return [(fp, n) for fp, n in self.fingerprints.most_common() if n >= threshold]
+
+    def header_value(self) -> str:
+        return f"count={self.queries}; time={self.seconds * 1000:.1f}ms; max-repeat={self.max_repeat}"
+
+
+_current: ContextVar[QueryStats | None] = ContextVar("query_stats", default=None)
+
+
+def current_stats() -> QueryStats | None:
+    return _current.get()
+
+
+@contextmanager
+def track_queries() -> Iterator[QueryStats]:
+    """Collect statements executed in this context (and threadpool calls made from it)."""
+
+    stats = QueryStats()
+    token = _current.set(stats)
+    try:
+        yield stats
+    finally:
+        _current.reset(token)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    if _current.get() is not None:
+        conn.info.setdefault("query_audit_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    stats = _current.get()
+    if stats is None:
+        return
+    starts = conn.info.get("query_audit_start")
+    if starts:
+        stats.seconds += time.perf_counter() - starts.pop()
+    stats.queries += 1
+    stats.fingerprints[fingerprint(statement)] += 1
+
+
+def instrument_engine(engine) -> None:
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+def _report(route: str, stats: QueryStats) -> None:
+    repeated = stats.repeated(settings.query_repeat_warn)
+    if stats.queries < settings.query_warn_count and not repeated:
+        return
+    detail = "; ".join(f"{n}x {fp[:200]}" for fp, n in repeated[:3])
+    logger.warning(
+        "%s ran %d SQL statements in %.1fms%s",
+        route,
+        stats.queries,
+        stats.seconds * 1000,
+        f" (repeated: {detail})" if detail else "",
+    )
+
+
+class QueryAuditMiddleware:
+    """Pure ASGI middleware that opens a :func:`track_queries` scope per HTTP request."""
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+        self.debug_header = settings.query_debug_header
+        if self.debug_header is None:
+            self.debug_header = settings.environment == "development"
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        async def send_wrapper(message: Message) -> None:
+            if self.debug_header and message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                headers.append((DEBUG_HEADER.encode(), stats.header_value().encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        with track_queries() as stats:
+            try:
+                await self.app(scope, receive, send_wrapper)
+            finally:
+                route = route_template(scope)
+                if settings.metrics_enabled:
+                    DB_QUERIES_PER_REQUEST.labels(route=route).observe(stats.queries)
+                _report(route, stats)
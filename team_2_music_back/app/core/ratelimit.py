@@ -0,0 +1,261 @@
+"""Token-bucket rate limiting for write-heavy routes.
+
+Rules map ``"METHOD /path/{template}"`` (without the API prefix) to a rate such
+as ``"10/min"``: a bucket of 10 tokens refilled evenly over a minute. Every
+matching request spends one token from a per-credential bucket and one from a
+per-IP bucket (``MUSIC_RATE_LIMIT_IP_MULTIPLIER`` times larger, since many
+users can share an address; 0 turns it off). The check runs in middleware
+before routing, so rejected requests never reach JWT/userinfo verification or
+the database.
+
+The client IP is the socket peer, or, when the peer is listed in
+``MUSIC_RATE_LIMIT_TRUSTED_PROXIES``, the rightmost ``X-Forwarded-For`` hop
+that is not itself a trusted proxy. Behind a proxy that is not configured,
+every user would share the proxy's bucket.
+
+The credential is a digest of the bearer token (or the dev ``X-User-Id``
+header), not an unverified ``sub`` claim, so a forged token cannot drain
+someone else's bucket; rotating forged tokens still hits the IP bucket.
+
+With Redis both buckets are checked and debited atomically by one Lua script
+(one round trip, shared by all workers), called from the threadpool so a slow
+Redis never stalls the event loop; otherwise, or when Redis errors, an
+in-process limiter is used inline.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import ipaddress
+import logging
+import math
+import re
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from functools import lru_cache
+
+from redis import Redis  # type: ignore[import]
+from redis.exceptions import RedisError  # type: ignore[import]
+from starlette.concurrency import run_in_threadpool
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from .config import settings
+from .metrics import RATE_LIMITED
+from .redis import get_redis
+
+logger = logging.getLogger(__name__)
+
+_PERIODS = {"s": 1, "sec": 1, "m": 60, "min": 60, "h": 3600, "hour": 3600}
+_RATE = re.compile(r"^\s*(\d+)\s*/\s*(\d*)\s*([a-z]+)\s*$")
+
+# KEYS: bucket keys. ARGV: cost, then (capacity, refill per second) for each key.
+# Returns {allowed, seconds until the blocking bucket has enough tokens}.
+_TOKEN_BUCKET_LUA = """
+local now_parts = redis.call('TIME')
+local now = tonumber(now_parts[1]) + tonumber(now_parts[2]) / 1000000
+local cost = tonumber(ARGV[1])
+local levels = {}
+local wait = 0
+for i, key in ipairs(KEYS) do
+  local capacity = tonumber(ARGV[i * 2])
+  local rate = tonumber(ARGV[i * 2 + 1])
+  local state = redis.call('HMGET', key, 't', 'ts')
+  local tokens = tonumber(state[1]) or capacity
+  local ts = tonumber(state[2]) or now
+  tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+  levels[i] = tokens
+  if tokens < cost then
+    wait = math.max(wait, (cost - tokens) / rate)
+  end
+end
+local allowed = wait == 0 and 1 or 0
+for i, key in ipairs(KEYS) do
+  local capacity = tonumber(ARGV[i * 2])
+  local rate = tonumber(ARGV[i * 2 + 1])
+  local tokens = levels[i]
+  if allowed == 1 then tokens = tokens - cost end
+  redis.call('HSET', key, 't', tokens, 'ts', now)
+  redis.call('PEXPIRE', key, math.ceil(capacity / rate * 1000) + 1000)
+end
+return {allowed, tostring(wait)}
+"""
+
+
+def parse_rate(spec: str) -> tuple[int, float]:
+    """``"10/min"`` or ``"5/30s"`` -> (capacity, tokens refilled per second)."""
+
+    match = _RATE.match(spec.lower())
+    if not match or match[3] not in _PERIODS or int(match[1]) <= 0:
+        raise ValueError(f"invalid rate {spec!r}; expected e.g. '10/min' or '5/30s'")
+    period = int(match[2] or 1) * _PERIODS[match[3]]
+    capacity = int(match[1])
+    return capacity, capacity / period
+
+
+@dataclass(frozen=True)
+class Rule:
+    name: str
+    method: str
+    pattern: re.Pattern
+    capacity: int
+    rate: float
+
+    def matches(self, method: str, path: str) -> bool:
+        return method == self.method and self.pattern.match(path) is not None
+
+
+def compile_rules(rules: dict[str, str], prefix: str = "") -> list[Rule]:
+    compiled = []
+    for name, spec in rules.items():
+        method, _, template = name.partition(" ")
+        regex = re.sub(r"\\\{[^}]+\\\}", "[^/]+", re.escape(prefix + template))
+        capacity, rate = parse_rate(spec)
+        compiled.append(Rule(name, method.upper(), re.compile(f"^{regex}$"), capacity, rate))
+    return compiled
+
+
+class MemoryBuckets:
+    """In-process token buckets with LRU eviction of idle keys."""
+
+    def __init__(self, max_keys: int = 100_000) -> None:
+        self.max_keys = max_keys
+        self._buckets: OrderedDict[str, tuple[float, float]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def take(self, buckets: list[tuple[str, int, float]], cost: float = 1.0) -> tuple[bool, float]:
+        now = time.monotonic()
+        with self._lock:
+            levels = []
+            wait = 0.0
+            for key, capacity, rate in buckets:
+                tokens, ts = self._buckets.get(key, (capacity, now))
+                tokens = min(capacity, tokens + (now - ts) * rate)
+                levels.append(tokens)
+                if tokens < cost:
+                    wait = max(wait, (cost - tokens) / rate)
+            allowed = wait == 0
+            for (key, _, _), tokens in zip(buckets, levels):
+                self._buckets[key] = (tokens - cost if allowed else tokens, now)
+                self._buckets.move_to_end(key)
+            while len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        return allowed, wait
+
+
+class RateLimiter:
+    def __init__(self, redis_client: Redis | None = None) -> None:
+        self.redis = redis_client if redis_client is not None else get_redis()
+        self.memory = MemoryBuckets()
+        self._script = self.redis.register_script(_TOKEN_BUCKET_LUA) if self.redis is not None else None
+
+    def take(self, buckets: list[tuple[str, int, float]]) -> tuple[bool, float]:
+        """Spend one token from every bucket, or none; returns (allowed, retry-after seconds)."""
+
+        if self._script is not None:
+            args: list[float] = [1]
+            for _, capacity, rate in buckets:
+                args += [capacity, rate]
+            try:
+                allowed, wait = self._script(keys=[key for key, _, _ in buckets], args=args)
+                return bool(allowed), float(wait)
+            except RedisError as exc:
+                logger.warning("Rate limit Redis call failed, using in-process buckets: %s", exc)
+        return self.memory.take(buckets)
+
+
+@lru_cache
+def get_rate_limiter() -> RateLimiter:
+    return RateLimiter()
+
+
+def _credential(scope: Scope) -> str | None:
+    for name, value in scope.get("headers", []):
+        if name == b"authorization" and value.startswith(b"Bearer "):
+            return hashlib.blake2b(value[7:].strip(), digest_size=12).hexdigest()
+        if name == b"x-user-id" and settings.allow_header_auth:
+            return "h" + value.decode("latin-1")
+    return None
+
+
+Network = ipaddress.IPv4Network | ipaddress.IPv6Network
+
+
+def _in_networks(address: str, networks: list[Network]) -> bool:
+    try:
+        ip = ipaddress.ip_address(address)
+    except ValueError:
+        return False
+    return any(ip in network for network in networks)
+
+
+def client_ip(scope: Scope, trusted_proxies: list[Network]) -> str:
+    """Return the address the request came from, honouring trusted proxies only.
+
+    ``X-Forwarded-For`` is client-controlled except for the hops appended by our
+    own proxies, so it is walked from the right and the first address that is
+    not a trusted proxy wins.
+    """
+
+    client = scope.get("client")
+    peer = client[0] if client else "unknown"
+    if not trusted_proxies or not _in_networks(peer, trusted_proxies):
+        return peer
+    hops = [
+        hop.strip()
+        for name, value in scope.get("headers", [])
+        if name == b"x-forwarded-for"
+        for hop in value.decode("latin-1").split(",")
+    ]
+    for hop in reversed(hops):
+        if hop and not _in_networks(hop, trusted_proxies):
+            return hop
+    return peer
+
+
+class RateLimitMiddleware:
+    """Pure ASGI middleware enforcing :func:`compile_rules` buckets before routing."""
+
+    def __init__(self, app: ASGIApp, limiter: RateLimiter | None = None) -> None:
+        self.app = app
+        self.rules = compile_rules(settings.rate_limit_rules, settings.api_prefix)
+        self.limiter = limiter
+        self.trusted_proxies = [ipaddress.ip_network(net, strict=False) for net in settings.rate_limit_trusted_proxies]
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        rule = None
+        if scope["type"] == "http":
+            rule = next((r for r in self.rules if r.matches(scope["method"], scope["path"])), None)
+        if rule is None:
+            await self.app(scope, receive, send)
+            return
+
+        limiter = self.limiter or get_rate_limiter()
+        buckets = []
+        multiplier = settings.rate_limit_ip_multiplier
+        if multiplier > 0:
+            ip = client_ip(scope, self.trusted_proxies)
+            buckets.append((f"rl:{rule.name}:ip:{ip}", max(1, int(rule.capacity * multiplier)), rule.rate * multiplier))
+        credential = _credential(scope)
+        if credential is not None:
+            buckets.append((f"rl:{rule.name}:user:{credential}", rule.capacity, rule.rate))
+
+        if not buckets:
+            await self.app(scope, receive, send)
+            return
+        if limiter.redis is not None:
+            allowed, wait = await run_in_threadpool(limiter.take, buckets)
+        else:
+            allowed, wait = limiter.take(buckets)
+        if allowed:
+            await self.app(scope, receive, send)
+            return
+        RATE_LIMITED.labels(rule=rule.name).inc()
+        response = JSONResponse(
+            {"code": "RATE_LIMITED", "message": "RATE_LIMITED"},
+            status_code=429,
+            headers={"Retry-After": str(max(1, math.ceil(wait)))},
+        )
+        await response(scope, receive, send)
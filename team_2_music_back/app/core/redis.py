@@ -0,0 +1,29 @@
+"""Shared Redis client helpers.
+
+Redis is optional: when ``MUSIC_REDIS_ENABLED`` is false (the local default) callers
+receive ``None`` and fall back to in-process state.
+"""
+
+from __future__ import annotations
+
+import logging
+from functools import lru_cache
+
+from redis import Redis  # type: ignore[import]
+
+from .config import settings
+
+logger = logging.getLogger(__name__)
+
+
+@lru_cache
+def get_redis() -> Redis | None:
+    """Return a process-wide synchronous Redis client, or ``None`` when disabled."""
+
+    if not settings.redis_enabled or not settings.redis_url:
+        return None
+    try:
+        return Redis.from_url(settings.redis_url, socket_timeout=0.5, socket_connect_timeout=0.5)
+    except Exception as exc:  # noqa: BLE001
+        logger.warning("Redis client init failed, using local fallback: %s", exc)
+        return None
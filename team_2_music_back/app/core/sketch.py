@@ -0,0 +1,257 @@
+"""Streaming sketches for approximate heavy-hitter counting.
+
+``CountMinSketch`` with width ``w = 2 ** ceil(log2(e / epsilon))`` and depth
+``d = ceil(ln(1 / delta))`` never under-counts, and over-counts a key by at most
+``epsilon * N`` (``N`` = total events in the sketch) with probability ``1 - delta``.
+``SlidingWindowSketch`` keeps one CMS per time bucket so old buckets simply fall
+out of the window; its window boundary is exact to one bucket. All sketches with
+identical parameters merge by element-wise addition and serialize compactly.
+"""
+
+from __future__ import annotations
+
+import heapq
+import math
+import struct
+import zlib
+from collections.abc import Iterable
+
+from .lazy import lazy_import
+
+np = lazy_import("numpy")
+
+_SKETCH_MAGIC = b"SKW1"
+_HEADER = struct.Struct("<4sIIQdI")
+_BUCKET_HEADER = struct.Struct("<qQ")
+
+
+class CountMinSketch:
+    """Count-Min Sketch over integer keys using vectorized multiply-shift hashing."""
+
+    def __init__(self, width: int, depth: int, seed: int = 0x5EED) -> None:
+        if width < 2 or width & (width - 1):
+            raise ValueError("width must be a power of two")
+        self.width = width
+        self.depth = depth
+        self.seed = seed
+        self.total = 0
+        self.counts = np.zeros((depth, width), dtype=np.uint32)
+        self._shift = np.uint64(64 - int(math.log2(width)))
+        rng = np.random.default_rng(seed)
+        self._a = rng.integers(1, 2**63, size=depth, dtype=np.uint64) | np.uint64(1)
+        self._b = rng.integers(0, 2**63, size=depth, dtype=np.uint64)
+        self._rows = np.arange(depth)[:, None]
+
+    @classmethod
+    def from_error_bounds(cls, epsilon: float, delta: float, seed: int = 0x5EED) -> "CountMinSketch":
+        width = 1 << max(1, math.ceil(math.log2(math.e / epsilon)))
+        depth = max(1, math.ceil(math.log(1.0 / delta)))
+        return cls(width=width, depth=depth, seed=seed)
+
+    @property
+    def epsilon(self) -> float:
+        return math.e / self.width
+
+    @property
+    def delta(self) -> float:
+        return math.exp(-self.depth)
+
+    def _columns(self, keys: np.ndarray) -> np.ndarray:
+        x = keys.astype(np.uint64)[None, :]
+        with np.errstate(over="ignore"):
+            return ((self._a[:, None] * x + self._b[:, None]) >> self._shift).astype(np.intp)
+
+    def add(self, keys: Iterable[int] | np.ndarray, counts: Iterable[int] | np.ndarray | int = 1) -> None:
+        keys = np.asarray(keys, dtype=np.int64).ravel()
+        if keys.size == 0:
+            return
+        counts = np.broadcast_to(np.asarray(counts, dtype=np.uint32), keys.shape)
+        columns = self._columns(keys)
+        for row in range(self.depth):
+            np.add.at(self.counts[row], columns[row], counts)
+        self.total += int(counts.sum())
+
+    def estimate(self, keys: Iterable[int] | np.ndarray) -> np.ndarray:
+        keys = np.asarray(keys, dtype=np.int64).ravel()
+        if keys.size == 0:
+            return np.zeros(0, dtype=np.uint64)
+        return self.counts[self._rows, self._columns(keys)].min(axis=0).astype(np.uint64)
+
+    def compatible(self, other: "CountMinSketch") -> bool:
+        return (self.width, self.depth, self.seed) == (other.width, other.depth, other.seed)
+
+    def merge(self, other: "CountMinSketch") -> None:
+        if not self.compatible(other):
+            raise ValueError("cannot merge sketches with different parameters")
+        self.counts += other.counts
+        self.total += other.total
+
+    def copy(self) -> "CountMinSketch":
+        clone = CountMinSketch(self.width, self.depth, self.seed)
+        clone.counts = self.counts.copy()
+        clone.total = self.total
+        return clone
+
+
+class SlidingWindowSketch:
+    """Ring of per-bucket Count-Min Sketches covering the last ``window_seconds``."""
+
+    def __init__(
+        self,
+        window_seconds: float,
+        buckets: int,
+        epsilon: float,
+        delta: float,
+        seed: int = 0x5EED,
+    ) -> None:
+        self.bucket_seconds = window_seconds / buckets
+        self.n_buckets = buckets
+        template = CountMinSketch.from_error_bounds(epsilon, delta, seed)
+        self.width, self.depth, self.seed = template.width, template.depth, template.seed
+        self._buckets: dict[int, CountMinSketch] = {}
+
+    @property
+    def window_seconds(self) -> float:
+        return self.bucket_seconds * self.n_buckets
+
+    @property
+    def epsilon(self) -> float:
+        return math.e / self.width
+
+    @property
+    def delta(self) -> float:
+        return math.exp(-self.depth)
+
+    def bucket_id(self, ts: float) -> int:
+        """Index of the time bucket containing ``ts``; changes when the window rotates."""
+
+        return int(ts // self.bucket_seconds)
+
+    def _expire(self, now: float) -> None:
+        oldest_live = self.bucket_id(now) - self.n_buckets + 1
+        for bucket_id in [b for b in self._buckets if b < oldest_live]:
+            del self._buckets[bucket_id]
+
+    def add(self, keys: Iterable[int] | np.ndarray, ts: float, counts: Iterable[int] | np.ndarray | int = 1) -> None:
+        self._expire(ts)
+        bucket_id = self.bucket_id(ts)
+        bucket = self._buckets.get(bucket_id)
+        if bucket is None:
+            bucket = self._buckets[bucket_id] = CountMinSketch(self.width, self.depth, self.seed)
+        bucket.add(keys, counts)
+
+    def estimate(self, keys: Iterable[int] | np.ndarray, now: float) -> np.ndarray:
+        """Sum of per-bucket estimates; still ``>= true`` and within ``epsilon * N``."""
+
+        self._expire(now)
+        keys = np.asarray(keys, dtype=np.int64).ravel()
+        result = np.zeros(keys.size, dtype=np.uint64)
+        if keys.size == 0 or not self._buckets:
+            return result
+        # Every bucket shares the same hash functions, so hash once.
+        first = next(iter(self._buckets.values()))
+        rows, columns = first._rows, first._columns(keys)
+        for bucket in self._buckets.values():
+            result += bucket.counts[rows, columns].min(axis=0)
+        return result
+
+    def total(self, now: float) -> int:
+        self._expire(now)
+        return sum(bucket.total for bucket in self._buckets.values())
+
+    def merge(self, other: "SlidingWindowSketch") -> None:
+        if (self.width, self.depth, self.seed, self.bucket_seconds) != (
+            other.width,
+            other.depth,
+            other.seed,
+            other.bucket_seconds,
+        ):
+            raise ValueError("cannot merge sliding sketches with different parameters")
+        for bucket_id, bucket in other._buckets.items():
+            mine = self._buckets.get(bucket_id)
+            if mine is None:
+                self._buckets[bucket_id] = bucket.copy()
+            else:
+                mine.merge(bucket)
+
+    def to_bytes(self) -> bytes:
+        parts = [
+            _HEADER.pack(_SKETCH_MAGIC, self.width, self.depth, self.seed, self.bucket_seconds, self.n_buckets)
+        ]
+        for bucket_id, bucket in sorted(self._buckets.items()):
+            parts.append(_BUCKET_HEADER.pack(bucket_id, bucket.total))
+            parts.append(bucket.counts.astype("<u4").tobytes())
+        return zlib.compress(b"".join(parts), level=6)
+
+    @classmethod
+    def from_bytes(cls, blob: bytes) -> "SlidingWindowSketch":
+        raw = zlib.decompress(blob)
+        magic, width, depth, seed, bucket_seconds, n_buckets = _HEADER.unpack_from(raw, 0)
+        if magic != _SKETCH_MAGIC:
+            raise ValueError("not a sliding-window sketch")
+        sketch = cls.__new__(cls)
+        sketch.bucket_seconds = bucket_seconds
+        sketch.n_buckets = n_buckets
+        sketch.width, sketch.depth, sketch.seed = width, depth, seed
+        sketch._buckets = {}
+
+        offset = _HEADER.size
+        cells = width * depth
+        while offset < len(raw):
+            bucket_id, total = _BUCKET_HEADER.unpack_from(raw, offset)
+            offset += _BUCKET_HEADER.size
+            bucket = CountMinSketch(width, depth, seed)
+            bucket.counts = np.frombuffer(raw, dtype="<u4", count=cells, offset=offset).reshape(depth, width).copy()
+            bucket.total = total
+            sketch._buckets[bucket_id] = bucket
+            offset += cells * 4
+        return sketch
+
+
+class TopK:
+    """Bounded candidate set of likely heavy hitters (min-heap with lazy updates)."""
+
+    def __init__(self, capacity: int) -> None:
+        self.capacity = capacity
+        self._estimates: dict[int, int] = {}
+        self._heap: list[tuple[int, int]] = []
+
+    def offer(self, key: int, estimate: int) -> None:
+        if key in self._estimates or len(self._estimates) < self.capacity:
+            self._estimates[key] = estimate
+            heapq.heappush(self._heap, (estimate, key))
+            if len(self._heap) > 4 * self.capacity:
+                self.compact()
+            return
+
+        while self._heap:
+            smallest, victim = self._heap[0]
+            if self._estimates.get(victim) != smallest:
+                heapq.heappop(self._heap)  # stale entry
+                continue
+            if estimate <= smallest:
+                return
+            heapq.heapreplace(self._heap, (estimate, key))
+            del self._estimates[victim]
+            self._estimates[key] = estimate
+            return
+
+    def candidates(self) -> list[int]:
+        return list(self._estimates)
+
+    def rescore(self, estimates: dict[int, int]) -> None:
+        """Replace every candidate's estimate, e.g. after old sketch buckets expired.
+
+        Offers only compare against stored estimates, so without this a key that
+        was hot an hour ago would hold its slot forever. Keys that no longer have
+        any events in the window are dropped outright.
+        """
+
+        self._estimates = {key: est for key, est in estimates.items() if key in self._estimates and est > 0}
+        self.compact()
+
+    def compact(self) -> None:
+        """Rebuild the heap to drop stale entries."""
+
+        self._heap = [(est, key) for key, est in self._estimates.items()]
+        heapq.heapify(self._heap)
@@ -0,0 +1,129 @@
+"""Magic-byte content sniffing for uploads.
+
+The client ``Content-Type`` is only a claim: the first :data:`SNIFF_BYTES` of
+the body decide what the file is. A declared type must agree with the sniffed
+one (after alias normalization, e.g. ``audio/mp3`` -> ``audio/mpeg``); a
+missing declaration is replaced by the sniffed type, and bytes that match no
+allowed signature are rejected before the rest of the payload is read.
+"""
+
+from __future__ import annotations
+
+from fastapi import HTTPException, status
+
+SNIFF_BYTES = 4096
+AUDIO_TYPES = frozenset({"audio/mpeg", "audio/flac", "audio/wav"})
+IMAGE_TYPES = frozenset({"image/jpeg", "image/png", "image/webp"})
+
+_ALIASES = {
+    "audio/mp3": "audio/mpeg",
+    "audio/mpeg3": "audio/mpeg",
+    "audio/x-mpeg": "audio/mpeg",
+    "audio/x-flac": "audio/flac",
+    "audio/x-wav": "audio/wav",
+    "audio/wave": "audio/wav",
+    "audio/vnd.wave": "audio/wav",
+    "image/jpg": "image/jpeg",
+    "image/pjpeg": "image/jpeg",
+}
+
+# MPEG audio frame header tables (kbps / Hz); index 0 of each is "free"/reserved.
+_MPEG1_L3_BITRATES = (0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320)
+_MPEG2_L3_BITRATES = (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160)
+_SAMPLE_RATES = {3: (44100, 48000, 32000), 2: (22050, 24000, 16000), 0: (11025, 12000, 8000)}
+
+# ID3v2 major version -> header flag bits it defines; any other bit is reserved.
+_ID3_FLAGS = {2: 0xC0, 3: 0xE0, 4: 0xF0}
+
+
+def normalize(content_type: str | None) -> str | None:
+    if not content_type:
+        return None
+    base = content_type.split(";", 1)[0].strip().lower()
+    if base == "application/octet-stream":  # "unknown" as far as the client is concerned
+        return None
+    return _ALIASES.get(base, base)
+
+
+def _mpeg_frame_length(head: bytes, pos: int) -> int | None:
+    """Length of a valid MPEG audio (Layer I-III) frame header at ``pos``, else ``None``."""
+
+    if pos + 4 > len(head) or head[pos] != 0xFF or head[pos + 1] & 0xE0 != 0xE0:
+        return None
+    version = (head[pos + 1] >> 3) & 0b11  # 3 = MPEG-1, 2 = MPEG-2, 0 = MPEG-2.5
+    layer = (head[pos + 1] >> 1) & 0b11  # 0 is reserved (and ADTS AAC uses it)
+    bitrate_index = head[pos + 2] >> 4
+    rate_index = (head[pos + 2] >> 2) & 0b11
+    if version == 1 or layer == 0 or bitrate_index in (0, 15) or rate_index == 3:
+        return None
+    padding = (head[pos + 2] >> 1) & 1
+    sample_rate = _SAMPLE_RATES[version][rate_index]
+    if layer == 1:  # Layer III: the only one actually uploaded; size the frame precisely
+        bitrate = (_MPEG1_L3_BITRATES if version == 3 else _MPEG2_L3_BITRATES)[bitrate_index] * 1000
+        return (144 if version == 3 else 72) * bitrate // sample_rate + padding
+    return 0  # Layer I/II: valid header, length not needed
+
+
+def _is_mpeg_audio(head: bytes, pos: int = 0) -> bool:
+    length = _mpeg_frame_length(head, pos)
+    if length is None:
+        return False
+    # When the next frame is inside the sniffed window it must be a frame header too.
+    following = pos + length
+    return not length or following + 4 > len(head) or _mpeg_frame_length(head, following) is not None
+
+
+def _sniff_id3(head: bytes) -> str | None:
+    """Type of the audio behind an ID3v2 tag; ``None`` unless the header is well formed."""
+
+    if len(head) < 10 or head[3] not in _ID3_FLAGS or head[4] == 0xFF:
+        return None
+    if head[5] & ~_ID3_FLAGS[head[3]] & 0xFF or any(b & 0x80 for b in head[6:10]):
+        return None  # reserved flag bits set or size bytes not syncsafe
+    size = head[6] << 21 | head[7] << 14 | head[8] << 7 | head[9]
+    end = 10 + size + (10 if head[3] == 4 and head[5] & 0x10 else 0)  # v2.4 footer
+    if end + 4 > len(head):
+        return "audio/mpeg"  # MPEG frames start beyond the window for large tags (cover art)
+    if head[end : end + 4] == b"fLaC":
+        return "audio/flac"
+    return "audio/mpeg" if _is_mpeg_audio(head, end) else None
+
+
+def sniff(head: bytes) -> str | None:
+    """Media type from the leading bytes of a file, or ``None`` if unrecognised."""
+
+    if head.startswith(b"ID3"):
+        return _sniff_id3(head)
+    if head.startswith(b"fLaC"):
+        return "audio/flac"
+    if head[:4] == b"RIFF" and head[8:12] == b"WAVE":
+        return "audio/wav"
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return "image/webp"
+    if head.startswith(b"\xff\xd8\xff"):
+        return "image/jpeg"
+    if head.startswith(b"\x89PNG\r\n\x1a\n"):
+        return "image/png"
+    if _is_mpeg_audio(head):
+        return "audio/mpeg"
+    return None
+
+
+def check_media_type(head: bytes, declared: str | None, allowed: set[str], *, prefix: str = "") -> str:
+    """Validate sniffed bytes against the declared and allowed types; returns the detected type.
+
+    Errors use ``UNSUPPORTED_<prefix>TYPE`` / ``<prefix>CONTENT_TYPE_MISMATCH`` details
+    (``prefix="COVER_"`` for images) to match the existing upload error codes.
+    """
+
+    allowed = {normalize(t) for t in allowed}
+    declared = normalize(declared)
+    unsupported = "UNSUPPORTED_MEDIA_TYPE" if not prefix else f"UNSUPPORTED_{prefix}TYPE"
+    if declared is not None and declared not in allowed:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=unsupported)
+    detected = sniff(head)
+    if detected is None or detected not in allowed:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=unsupported)
+    if declared is not None and declared != detected:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"{prefix}CONTENT_TYPE_MISMATCH")
+    return detected
@@ -1,12 +1,17 @@
 """Storage signing utilities (stub)."""
 
+import os
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Iterable
 from dataclasses import dataclass
+from functools import lru_cache
 from pathlib import Path
 
-import boto3
-from botocore.exceptions import BotoCoreError, NoCredentialsError
-
 from app.core.config import settings
+from app.core.metrics import STORAGE_LATENCY, observe
+from app.core.tracing import instrument_boto3, span
 
 
 @dataclass
@@ -32,6 +37,8 @@ class StorageService:
 
         self.s3_client = None
         if self.is_s3_enabled:
+            import boto3  # deferred: ~150ms to import and unused in local-storage mode
+
             # boto3 will pick up IAM Role if access keys are not provided
             self.s3_client = boto3.client(
                 "s3",
@@ -39,15 +46,21 @@ class StorageService:
                 aws_access_key_id=settings.aws_access_key_id,
                 aws_secret_access_key=settings.aws_secret_access_key,
             )
+            instrument_boto3(self.s3_client)
+
+    @property
+    def backend(self) -> str:
+        return "s3" if self.is_s3_enabled and self.s3_client else "local"
 
     def presign_put(self, storage_key: str, expires_in: int | None = None) -> PresignedUpload:
         ttl = expires_in or settings.presign_expiration
         if self.is_s3_enabled and self.s3_client:
-            url = self.s3_client.generate_presigned_url(
-                "put_object",
-                Params={"Bucket": self.bucket, "Key": storage_key},
-                ExpiresIn=ttl,
-            )
+            with observe(STORAGE_LATENCY, operation="presign_put", backend="s3"), span("storage.presign_put"):
+                url = self.s3_client.generate_presigned_url(
+                    "put_object",
+                    Params={"Bucket": self.bucket, "Key": storage_key},
+                    ExpiresIn=ttl,
+                )
             return PresignedUpload(url=url, expires_in=ttl, storage_key=storage_key)
         # local fallback
         url = f"/uploads/{storage_key}"
@@ -56,7 +69,15 @@ class StorageService:
     def save_file(self, storage_key: str, file_bytes: bytes, content_type: str | None = None) -> str:
         """Save file to S3 if enabled, otherwise local storage. Always return storage_key."""
 
+        with observe(STORAGE_LATENCY, operation="save_file", backend=self.backend), span(
+            "storage.save_file", backend=self.backend, bytes=len(file_bytes)
+        ):
+            return self._save_file(storage_key, file_bytes, content_type)
+
+    def _save_file(self, storage_key: str, file_bytes: bytes, content_type: str | None) -> str:
         if self.is_s3_enabled and self.s3_client:
+            from botocore.exceptions import BotoCoreError, NoCredentialsError
+
             try:
                 put_kwargs = {"Bucket": self.bucket, "Key": storage_key, "Body": file_bytes}
                 if content_type:
@@ -75,8 +96,105 @@ class StorageService:
     def presign_get(self, storage_key: str, expires_in: int | None = None) -> str:
         ttl = expires_in or settings.presign_expiration
         if self.is_s3_enabled and self.s3_client:
-            return self.s3_client.generate_presigned_url(
-                "get_object", Params={"Bucket": self.bucket, "Key": storage_key}, ExpiresIn=ttl
-            )
+            with observe(STORAGE_LATENCY, operation="presign_get", backend="s3"), span("storage.presign_get"):
+                return self.s3_client.generate_presigned_url(
+                    "get_object", Params={"Bucket": self.bucket, "Key": storage_key}, ExpiresIn=ttl
+                )
         # local fallback (not used for remote clients)
         return str(self.base_path / storage_key)
+
+    def get_range(self, storage_key: str, start: int, end: int) -> tuple[bytes, int]:
+        """Read bytes ``start..end`` (inclusive, clipped to the object); returns (bytes, object size).
+
+        Raises ``FileNotFoundError`` when the object does not exist.
+        """
+
+        with observe(STORAGE_LATENCY, operation="get_range", backend=self.backend), span(
+            "storage.get_range", backend=self.backend, start=start, end=end
+        ):
+            if self.is_s3_enabled and self.s3_client:
+                from botocore.exceptions import ClientError
+
+                try:
+                    obj = self.s3_client.get_object(Bucket=self.bucket, Key=storage_key, Range=f"bytes={start}-{end}")
+                except ClientError as exc:
+                    code = exc.response.get("Error", {}).get("Code")
+                    if code in ("NoSuchKey", "404"):
+                        raise FileNotFoundError(storage_key) from exc
+                    if code == "InvalidRange":  # start past the end (or an empty object)
+                        head = self.s3_client.head_object(Bucket=self.bucket, Key=storage_key)
+                        return b"", int(head["ContentLength"])
+                    raise
+                # ContentRange: "bytes 0-1048575/5242880"
+                total = int(obj["ContentRange"].rsplit("/", 1)[1]) if obj.get("ContentRange") else obj["ContentLength"]
+                return obj["Body"].read(), total
+
+            path = self.base_path / storage_key
+            with path.open("rb") as fh:
+                total = os.fstat(fh.fileno()).st_size
+                fh.seek(start)
+                return fh.read(max(0, end - start + 1)), total
+
+
+class URLSigner:
+    """Presigned GET URLs for many storage keys at once, reusing still-fresh signatures.
+
+    Signed URLs end up inside cached list/detail bodies, so a signature is reused
+    only while it stays valid for ``min_remaining`` seconds (by default the
+    response cache TTL plus a minute); otherwise a new one is generated.
+    """
+
+    def __init__(
+        self,
+        storage: StorageService | None = None,
+        ttl: int | None = None,
+        min_remaining: int | None = None,
+        max_entries: int = 50_000,
+    ) -> None:
+        self.storage = storage or StorageService()
+        self.min_remaining = min_remaining if min_remaining is not None else settings.response_cache_ttl + 60
+        self.ttl = max(ttl or settings.presign_expiration, 2 * self.min_remaining)
+        self.max_entries = max_entries
+        self._signed: OrderedDict[str, tuple[str, float]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def sign_many(self, storage_keys: Iterable[str]) -> dict[str, str]:
+        keys = set(storage_keys)
+        now = time.time()
+        urls = {}
+        with self._lock:
+            for key in keys:
+                cached = self._signed.get(key)
+                if cached is not None and cached[1] - now >= self.min_remaining:
+                    urls[key] = cached[0]
+        to_sign = keys - urls.keys()
+        if not to_sign:
+            return urls
+
+        if self.storage.backend == "s3":
+            with observe(STORAGE_LATENCY, operation="presign_get_many", backend="s3"), span(
+                "storage.presign_get_many", count=len(to_sign)
+            ):
+                fresh = {
+                    key: self.storage.s3_client.generate_presigned_url(
+                        "get_object", Params={"Bucket": self.storage.bucket, "Key": key}, ExpiresIn=self.ttl
+                    )
+                    for key in to_sign
+                }
+        else:
+            # local fallback: the dev StaticFiles mount
+            fresh = {key: f"/uploads/{key}" for key in to_sign}
+
+        with self._lock:
+            for key, url in fresh.items():
+                self._signed[key] = (url, now + self.ttl)
+                self._signed.move_to_end(key)
+            while len(self._signed) > self.max_entries:
+                self._signed.popitem(last=False)
+        urls.update(fresh)
+        return urls
+
+
+@lru_cache
+def get_url_signer() -> URLSigner:
+    return URLSigner()
@@ -0,0 +1,359 @@
+"""Lightweight request tracing with W3C ``traceparent`` propagation.
+
+Each traced HTTP request gets a root span; code along the way opens child
+spans with :func:`span` / :func:`traced` (auth, storage, metadata extraction,
+commits, SQL statements). Incoming ``traceparent`` headers are continued, and
+the current context is injected into outbound httpx requests
+(:data:`HTTPX_EVENT_HOOKS`) and boto3 S3 calls (:func:`instrument_boto3`).
+
+When the root span ends the finished trace is queued for a background
+exporter: ``MUSIC_TRACING_EXPORTER=json`` appends one JSON line per trace to
+``MUSIC_TRACING_DIR/traces-YYYYMMDD.jsonl``; ``otlp`` posts OTLP/HTTP JSON to
+``MUSIC_TRACING_OTLP_ENDPOINT`` (a collector, or ``benchmarks.otlp_stub``).
+With the default ``none`` the middleware is not installed and every
+:func:`span` call reduces to one context-variable lookup.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import queue
+import random
+import re
+import threading
+import time
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from functools import lru_cache, wraps
+from pathlib import Path
+from typing import Any, TypeVar
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from .config import settings
+from .metrics import route_template
+
+logger = logging.getLogger(__name__)
+
+TRACEPARENT = "traceparent"
+_TRACEPARENT_RE = re.compile(r"^00-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})$")
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+
+@dataclass
+class Span:
+    trace: Trace
+    name: str
+    span_id: str
+    parent_id: str | None
+    start_ns: int
+    end_ns: int | None = None
+    attributes: dict[str, Any] = field(default_factory=dict)
+    error: str | None = None
+
+    @property
+    def traceparent(self) -> str:
+        return f"00-{self.trace.trace_id}-{self.span_id}-01"
+
+    def end(self) -> None:
+        if self.end_ns is None:
+            self.end_ns = time.time_ns()
+            self.trace.spans.append(self)
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "trace_id": self.trace.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "start_ns": self.start_ns,
+            "duration_ms": round(((self.end_ns or self.start_ns) - self.start_ns) / 1e6, 3),
+            "attributes": self.attributes,
+            "error": self.error,
+        }
+
+
+@dataclass
+class Trace:
+    trace_id: str
+    spans: list[Span] = field(default_factory=list)
+
+
+_current: ContextVar[Span | None] = ContextVar("trace_span", default=None)
+
+
+def _new_id(nbytes: int) -> str:
+    return os.urandom(nbytes).hex()
+
+
+def current_span() -> Span | None:
+    return _current.get()
+
+
+def start_span(name: str, **attributes: Any) -> Span | None:
+    """Open a child of the current span without making it current (caller must ``end()`` it)."""
+
+    parent = _current.get()
+    if parent is None:
+        return None
+    return Span(parent.trace, name, _new_id(8), parent.span_id, time.time_ns(), attributes=attributes)
+
+
+@contextmanager
+def span(name: str, **attributes: Any) -> Iterator[Span | None]:
+    """Time the enclosed block as a child span; a no-op outside a traced request."""
+
+    child = start_span(name, **attributes)
+    if child is None:
+        yield None
+        return
+    token = _current.set(child)
+    try:
+        yield child
+    except BaseException as exc:
+        child.error = type(exc).__name__
+        raise
+    finally:
+        _current.reset(token)
+        child.end()
+
+
+def traced(name: str) -> Callable[[F], F]:
+    """Decorator form of :func:`span` for sync functions."""
+
+    def decorator(fn: F) -> F:
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            with span(name):
+                return fn(*args, **kwargs)
+
+        return wrapper  # type: ignore[return-value]
+
+    return decorator
+
+
+async def _inject_httpx(request) -> None:
+    current = _current.get()
+    if current is not None:
+        request.headers[TRACEPARENT] = current.traceparent
+
+
+HTTPX_EVENT_HOOKS = {"request": [_inject_httpx]}
+
+
+def instrument_boto3(client) -> None:
+    """Add ``traceparent`` to every S3 request sent by ``client`` (after signing, so it stays unsigned)."""
+
+    def inject(request, **_kwargs) -> None:
+        current = _current.get()
+        if current is not None:
+            request.headers[TRACEPARENT] = current.traceparent
+
+    client.meta.events.register("before-send.s3", inject)
+
+
+# --- SQLAlchemy -------------------------------------------------------------
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    child = start_span("db.query", statement=statement[:300])
+    if child is not None:
+        conn.info.setdefault("trace_spans", []).append(child)
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    spans = conn.info.get("trace_spans")
+    if spans:
+        spans.pop().end()
+
+
+def _before_commit(session: Session) -> None:
+    child = start_span("db.commit")
+    if child is not None:
+        session.info["trace_commit"] = child
+
+
+def _after_commit(session: Session) -> None:
+    child = session.info.pop("trace_commit", None)
+    if child is not None:
+        child.end()
+
+
+def _after_soft_rollback(session: Session, previous_transaction) -> None:
+    child = session.info.pop("trace_commit", None)
+    if child is not None:
+        child.error = "rollback"
+        child.end()
+
+
+def instrument_engine(engine) -> None:
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+def instrument_sessions() -> None:
+    if not event.contains(Session, "before_commit", _before_commit):
+        event.listen(Session, "before_commit", _before_commit)
+        event.listen(Session, "after_commit", _after_commit)
+        event.listen(Session, "after_soft_rollback", _after_soft_rollback)
+
+
+# --- export -----------------------------------------------------------------
+
+
+class JsonFileExporter:
+    def __init__(self, directory: str | Path) -> None:
+        self.directory = Path(directory)
+
+    def export(self, spans: list[dict[str, Any]]) -> None:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        path = self.directory / f"traces-{datetime.now(timezone.utc):%Y%m%d}.jsonl"
+        with path.open("a", encoding="utf-8") as fh:
+            fh.write(json.dumps({"trace_id": spans[0]["trace_id"], "spans": spans}) + "\n")
+
+
+class OtlpHttpExporter:
+    """POST spans as OTLP/HTTP JSON (``/v1/traces``)."""
+
+    def __init__(self, endpoint: str, service_name: str) -> None:
+        import httpx
+
+        self.endpoint = endpoint
+        self.service_name = service_name
+        self._client = httpx.Client(timeout=5)
+
+    def _otlp_span(self, item: dict[str, Any]) -> dict[str, Any]:
+        attributes = [{"key": k, "value": {"stringValue": str(v)}} for k, v in item["attributes"].items()]
+        return {
+            "traceId": item["trace_id"],
+            "spanId": item["span_id"],
+            "parentSpanId": item["parent_id"] or "",
+            "name": item["name"],
+            "kind": 2 if item["parent_id"] is None else 1,
+            "startTimeUnixNano": str(item["start_ns"]),
+            "endTimeUnixNano": str(item["start_ns"] + int(item["duration_ms"] * 1e6)),
+            "attributes": attributes,
+            "status": {"code": 2, "message": item["error"]} if item["error"] else {},
+        }
+
+    def export(self, spans: list[dict[str, Any]]) -> None:
+        body = {
+            "resourceSpans": [
+                {
+                    "resource": {"attributes": [{"key": "service.name", "value": {"stringValue": self.service_name}}]},
+                    "scopeSpans": [{"scope": {"name": __name__}, "spans": [self._otlp_span(s) for s in spans]}],
+                }
+            ]
+        }
+        self._client.post(self.endpoint, json=body).raise_for_status()
+
+
+class ExportQueue:
+    """Hands finished traces to the exporter on a daemon thread; drops traces when full."""
+
+    def __init__(self, exporter, max_pending: int = 1000) -> None:
+        self.exporter = exporter
+        self._queue: queue.Queue[list[dict[str, Any]]] = queue.Queue(max_pending)
+        self._thread = threading.Thread(target=self._run, name="trace-exporter", daemon=True)
+        self._thread.start()
+
+    def submit(self, spans: list[dict[str, Any]]) -> None:
+        try:
+            self._queue.put_nowait(spans)
+        except queue.Full:
+            logger.warning("Trace export queue full; dropping trace %s", spans[0]["trace_id"])
+
+    def flush(self, timeout: float = 5.0) -> None:
+        deadline = time.monotonic() + timeout
+        while self._queue.unfinished_tasks and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+    def _run(self) -> None:
+        while True:
+            spans = self._queue.get()
+            try:
+                self.exporter.export(spans)
+            except Exception as exc:  # noqa: BLE001
+                logger.warning("Trace export failed: %s", exc)
+            finally:
+                self._queue.task_done()
+
+
+@lru_cache
+def get_export_queue() -> ExportQueue | None:
+    if settings.tracing_exporter == "json":
+        return ExportQueue(JsonFileExporter(settings.tracing_dir))
+    if settings.tracing_exporter == "otlp":
+        return ExportQueue(OtlpHttpExporter(settings.tracing_otlp_endpoint, settings.project_name))
+    return None
+
+
+def tracing_enabled() -> bool:
+    return settings.tracing_exporter != "none"
+
+
+# --- middleware -------------------------------------------------------------
+
+
+def _parse_traceparent(scope: Scope) -> tuple[str, str, bool] | None:
+    for name, value in scope.get("headers", []):
+        if name == TRACEPARENT.encode():
+            match = _TRACEPARENT_RE.match(value.decode("latin-1").strip().lower())
+            if match:
+                return match[1], match[2], int(match[3], 16) & 1 == 1
+    return None
+
+
+class TracingMiddleware:
+    """Pure ASGI middleware opening the root span of each sampled HTTP request."""
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        incoming = _parse_traceparent(scope)
+        if incoming is not None:
+            trace_id, parent_id, sampled = incoming
+        else:
+            trace_id, parent_id, sampled = _new_id(16), None, random.random() < settings.tracing_sample_rate
+        exporter = get_export_queue()
+        if not sampled or exporter is None:
+            await self.app(scope, receive, send)
+            return
+
+        root = Span(Trace(trace_id), "http.request", _new_id(8), parent_id, time.time_ns())
+        root.attributes["http.method"] = scope["method"]
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                root.attributes["http.status_code"] = message["status"]
+                headers = list(message.get("headers", []))
+                headers.append((TRACEPARENT.encode(), root.traceparent.encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        token = _current.set(root)
+        try:
+            await self.app(scope, receive, send_wrapper)
+        except BaseException as exc:
+            root.error = type(exc).__name__
+            raise
+        finally:
+            _current.reset(token)
+            route = route_template(scope)
+            root.name = f"{scope['method']} {route}"
+            root.attributes["http.route"] = route
+            root.end()
+            exporter.submit([s.as_dict() for s in root.trace.spans])
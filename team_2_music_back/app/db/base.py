@@ -10,3 +10,7 @@ from app.models.track import Track  # noqa: F401
 from app.models.user_profile import UserProfile  # noqa: F401
 from app.models.vote import Like  # noqa: F401
 from app.models.upload_session import UploadSession  # noqa: F401
+from app.models.ranking import RankingCheckpoint, TrendingScore  # noqa: F401
+from app.models.listener_sketch import ListenerSketch  # noqa: F401
+from app.models.recommendation import TrackNeighbors  # noqa: F401
+from app.models.feed import FeedItem  # noqa: F401
@@ -4,7 +4,12 @@ from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 
 from app.core.config import settings
+from app.core import metrics, query_audit, tracing
 
 engine = create_engine(settings.database_url, pool_pre_ping=True)
+metrics.instrument_engine(engine)
+query_audit.instrument_engine(engine)
+tracing.instrument_engine(engine)
+tracing.instrument_sessions()
 
 SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False)
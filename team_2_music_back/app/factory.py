@@ -1,5 +1,7 @@
 """FastAPI application factory and lifecycle hooks."""
 
+import asyncio
+import logging
 from collections.abc import AsyncIterator
 from contextlib import asynccontextmanager
 
@@ -8,24 +10,77 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 
 from .api.routes import router as api_router
+from .core.admission import AdmissionMiddleware
 from .core.config import settings
 from .core.errors import register_error_handlers
+from .core.invalidation import get_invalidation_bus
 from .core.jwt import JWKSClient
+from .core.metrics import MetricsMiddleware, mark_worker_dead, metrics_endpoint
+from .core.profiling import ProfilingMiddleware, profiling_enabled
+from .core.query_audit import QueryAuditMiddleware
+from .core.ratelimit import RateLimitMiddleware
+from .core.tracing import TracingMiddleware, get_export_queue, tracing_enabled
+from .core.redis import get_redis
+from .services.heavy_hitters import flush_heavy_hitters
+from .services.metadata import get_metadata_extractor
+from .services.trending import refresh_trending
 from app.db import base  # noqa: F401  # ensure models are imported for SQLAlchemy mappings
 
+logger = logging.getLogger(__name__)
+
+
+async def _run_trending_refresher(interval: int) -> None:
+    """Periodically fold new play/like/comment events into the trending leaderboard."""
+
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await asyncio.to_thread(refresh_trending)
+        except Exception as exc:  # noqa: BLE001
+            logger.warning("Trending refresh failed: %s", exc)
+
+
+async def _run_sketch_flusher(interval: int) -> None:
+    """Publish this worker's heavy-hitter sketches so other workers can merge them."""
+
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await asyncio.to_thread(flush_heavy_hitters)
+        except Exception as exc:  # noqa: BLE001
+            logger.warning("Sketch flush failed: %s", exc)
+
 
 @asynccontextmanager
 async def lifespan(app: FastAPI) -> AsyncIterator[None]:
     """Warm caches and dispose shared resources gracefully."""
 
-    jwks_client = JWKSClient()
+    bus = get_invalidation_bus()
+    jwks_client = JWKSClient(bus=bus)
     app.state.jwks_client = jwks_client
+    bus.start()
+    app.state.invalidation_bus = bus
 
     if settings.jwks_url:
         await jwks_client.warm()
 
+    background: list[asyncio.Task] = []
+    if settings.trending_refresh_seconds > 0:
+        background.append(asyncio.create_task(_run_trending_refresher(settings.trending_refresh_seconds)))
+    if get_redis() is not None and settings.heavy_hitters_flush_seconds > 0:
+        background.append(asyncio.create_task(_run_sketch_flusher(settings.heavy_hitters_flush_seconds)))
+
     yield
 
+    for task in background:
+        task.cancel()
+    bus.stop()
+    get_metadata_extractor().shutdown()
+    exporter = get_export_queue()
+    if exporter is not None:
+        exporter.flush()
+    mark_worker_dead()
+
 
 def create_app() -> FastAPI:
     """Instantiate the FastAPI application with routing and middleware."""
@@ -47,6 +102,23 @@ def create_app() -> FastAPI:
         allow_headers=["*"],
     )
 
+    if settings.admission_enabled:
+        # Innermost of the cross-cutting middleware, so shed requests still show up in metrics.
+        application.add_middleware(AdmissionMiddleware)
+    if settings.rate_limit_enabled:
+        # Outside admission: rejected spam never occupies a concurrency slot.
+        application.add_middleware(RateLimitMiddleware)
+    if settings.metrics_enabled:
+        # Added after CORS so preflight requests are measured too.
+        application.add_middleware(MetricsMiddleware)
+        application.add_route("/metrics", metrics_endpoint, include_in_schema=False)
+    application.add_middleware(QueryAuditMiddleware)
+    if profiling_enabled():
+        # Not installed otherwise, so unprofiled deployments pay nothing.
+        application.add_middleware(ProfilingMiddleware)
+    if tracing_enabled():
+        application.add_middleware(TracingMiddleware)
+
     # Serve local uploads (only for dev/local)
     application.mount(
         "/uploads",
@@ -10,6 +10,10 @@ from .comment import Comment  # noqa: F401
 from .follow import Follow  # noqa: F401
 from .play_history import PlayHistory  # noqa: F401
 from .upload_session import UploadSession  # noqa: F401
+from .ranking import RankingCheckpoint, TrendingScore  # noqa: F401
+from .listener_sketch import ListenerSketch  # noqa: F401
+from .recommendation import TrackNeighbors  # noqa: F401
+from .feed import FeedItem  # noqa: F401
 
 __all__ = [
     "Base",
@@ -24,4 +28,9 @@ __all__ = [
     "Follow",
     "PlayHistory",
     "UploadSession",
+    "TrendingScore",
+    "RankingCheckpoint",
+    "ListenerSketch",
+    "TrackNeighbors",
+    "FeedItem",
 ]
@@ -0,0 +1,24 @@
+"""Home feed timeline model."""
+
+from datetime import datetime
+
+from sqlalchemy import Column, DateTime, ForeignKey, Index, Integer, UniqueConstraint
+
+from .base import Base
+
+
+class FeedItem(Base):
+    """A track pushed into a follower's timeline (fan-out-on-write)."""
+
+    __tablename__ = "feed_items"
+    __table_args__ = (
+        UniqueConstraint("user_id", "track_id", name="uq_feed_item_user_track"),
+        Index("ix_feed_items_user_created", "user_id", "created_at", "track_id"),
+    )
+
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, ForeignKey("user_profiles.id"), nullable=False)
+    track_id = Column(Integer, ForeignKey("tracks.id", ondelete="CASCADE"), nullable=False)
+    author_id = Column(Integer, ForeignKey("user_profiles.id"), nullable=False)
+    # Track creation time, so pushed and pulled items share one ordering.
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
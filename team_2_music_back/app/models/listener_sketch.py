@@ -0,0 +1,17 @@
+"""Unique-listener sketch storage for local-only mode."""
+
+from datetime import datetime
+
+from sqlalchemy import Column, DateTime, LargeBinary, String
+
+from .base import Base
+
+
+class ListenerSketch(Base):
+    """Serialized HyperLogLog registers keyed by ``track:{id}`` / ``owner:{id}``."""
+
+    __tablename__ = "listener_sketches"
+
+    key = Column(String(64), primary_key=True)
+    registers = Column(LargeBinary, nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
@@ -3,7 +3,7 @@
 from datetime import datetime
 
 from sqlalchemy import Column, DateTime, ForeignKey, Integer
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import backref, relationship
 
 from .base import Base
 
@@ -19,4 +19,5 @@ class PlayHistory(Base):
     played_at = Column(DateTime, default=datetime.utcnow, nullable=False, index=True)
 
     user = relationship("UserProfile", backref="play_history")
-    track = relationship("Track", backref="play_events")
+    # Play rows belong to the track: deleting it must not leave rows pointing at a missing id.
+    track = relationship("Track", backref=backref("play_events", cascade="all, delete-orphan"))
@@ -2,7 +2,7 @@
 
 from datetime import datetime
 
-from sqlalchemy import Column, DateTime, ForeignKey, Integer, String, UniqueConstraint
+from sqlalchemy import Column, DateTime, Float, ForeignKey, Index, Integer, String, UniqueConstraint
 from sqlalchemy.orm import relationship
 
 from .base import Base
@@ -29,12 +29,18 @@ class PlaylistTrack(Base):
     """Association table for tracks inside a playlist with ordering."""
 
     __tablename__ = "playlist_tracks"
-    __table_args__ = (UniqueConstraint("playlist_id", "track_id", name="uq_playlist_track"),)
+    __table_args__ = (
+        UniqueConstraint("playlist_id", "track_id", name="uq_playlist_track"),
+        Index("ix_playlist_tracks_playlist_order", "playlist_id", "order_key", "id"),
+    )
 
     id = Column(Integer, primary_key=True)
     playlist_id = Column(Integer, ForeignKey("playlists.id"), nullable=False)
     track_id = Column(Integer, ForeignKey("tracks.id"), nullable=False)
-    position = Column(Integer, nullable=True)
+    position = Column(Integer, nullable=True)  # legacy; ordering uses order_key
+    # Fractional index: a move writes only the moved row (see PlaylistService).
+    order_key = Column(Float, nullable=False, default=0.0, server_default="0")
+    added_at = Column(DateTime, default=datetime.utcnow, nullable=False)
 
     playlist = relationship("Playlist", back_populates="tracks")
     track = relationship("Track", back_populates="playlist_links")
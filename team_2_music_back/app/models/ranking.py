@@ -0,0 +1,29 @@
+"""Precomputed ranking models."""
+
+from datetime import datetime
+
+from sqlalchemy import Column, DateTime, Float, ForeignKey, Index, Integer, String
+
+from .base import Base
+
+
+class TrendingScore(Base):
+    """Forward-decayed trending score per track (snapshot-table leaderboard)."""
+
+    __tablename__ = "trending_scores"
+    __table_args__ = (Index("ix_trending_scores_genre_score", "genre", "score"),)
+
+    track_id = Column(Integer, ForeignKey("tracks.id", ondelete="CASCADE"), primary_key=True)
+    genre = Column(String(100), nullable=True)
+    score = Column(Float, nullable=False, default=0.0, index=True)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+
+
+class RankingCheckpoint(Base):
+    """Named integer watermark used by background ranking jobs."""
+
+    __tablename__ = "ranking_checkpoints"
+
+    name = Column(String(64), primary_key=True)
+    value = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
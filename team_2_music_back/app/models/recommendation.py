@@ -0,0 +1,18 @@
+"""Precomputed item-to-item recommendation model."""
+
+from datetime import datetime
+
+from sqlalchemy import Column, DateTime, ForeignKey, Integer, LargeBinary
+
+from .base import Base
+
+
+class TrackNeighbors(Base):
+    """Top-K similar tracks, stored as packed int32 ids / float32 cosine scores."""
+
+    __tablename__ = "track_neighbors"
+
+    track_id = Column(Integer, ForeignKey("tracks.id", ondelete="CASCADE"), primary_key=True)
+    neighbor_ids = Column(LargeBinary, nullable=False)
+    scores = Column(LargeBinary, nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
@@ -2,7 +2,7 @@
 
 from datetime import datetime
 
-from sqlalchemy import Column, DateTime, ForeignKey, Integer, String, Text
+from sqlalchemy import Column, DateTime, ForeignKey, Index, Integer, String, Text
 from sqlalchemy.orm import relationship
 
 from .base import Base
@@ -12,6 +12,7 @@ class Track(Base):
     """Music track uploaded by a user."""
 
     __tablename__ = "tracks"
+    __table_args__ = (Index("ix_tracks_owner_created", "owner_user_id", "created_at"),)
 
     id = Column(Integer, primary_key=True, index=True)
     owner_user_id = Column(Integer, ForeignKey("user_profiles.id"), nullable=False, index=True)
@@ -23,6 +24,7 @@ class Track(Base):
     duration_seconds = Column(Integer, nullable=True)
     bpm = Column(Integer, nullable=True)
     audio_url = Column(String(255), nullable=True)
+    audio_content_type = Column(String(100), nullable=True)  # sniffed from the file, not the client header
     cover_url = Column(String(255), nullable=True)
     ai_provider = Column(String(50), nullable=True)
     ai_model = Column(String(100), nullable=True)
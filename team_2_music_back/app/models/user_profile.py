@@ -20,3 +20,5 @@ class UserProfile(Base):
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
     is_active = Column(Integer, default=1, nullable=False)
+    # Denormalized so the feed can pick fan-out-on-write vs. on-read cheaply.
+    follower_count = Column(Integer, default=0, nullable=False, server_default="0")
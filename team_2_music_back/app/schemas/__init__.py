@@ -1,22 +1,59 @@
 """Pydantic schemas package."""
 
-from .system import HealthResponse, ErrorResponse
-from .track import TrackBase, TrackCreate, TrackRead, TrackUpdate
-from .upload import UploadFinalizeRequest, UploadInitiateRequest, UploadInitiateResponse
-from .like import LikeActionResponse
+from .system import HealthResponse, ErrorResponse, ProfileRead
+from .track import (
+    HotTrackItem,
+    HotTracksResponse,
+    SimilarTrackRead,
+    TrackBase,
+    TrackBatchResponse,
+    TrackCreate,
+    TrackRead,
+    TrackUpdate,
+    TrendingTrackRead,
+)
+from .upload import UploadFinalizeRequest, UploadInitiateRequest, UploadInitiateResponse, UploadProgress
+from .like import LikeActionResponse, PlayActionResponse
 from .comment import CommentCreate, CommentRead
+from .creator import CreatorStatsResponse
+from .feed import FeedPage, FollowResponse
+from .playlist import (
+    PlaylistCreate,
+    PlaylistRead,
+    PlaylistTrackAdd,
+    PlaylistTrackMove,
+    PlaylistTrackRead,
+    PlaylistTracksPage,
+)
 
 __all__ = [
     "HealthResponse",
     "ErrorResponse",
+    "ProfileRead",
     "TrackBase",
     "TrackCreate",
     "TrackRead",
+    "TrackBatchResponse",
     "TrackUpdate",
+    "TrendingTrackRead",
+    "HotTrackItem",
+    "HotTracksResponse",
+    "SimilarTrackRead",
     "UploadInitiateRequest",
     "UploadInitiateResponse",
     "UploadFinalizeRequest",
+    "UploadProgress",
     "LikeActionResponse",
+    "PlayActionResponse",
     "CommentCreate",
     "CommentRead",
+    "CreatorStatsResponse",
+    "FollowResponse",
+    "FeedPage",
+    "PlaylistCreate",
+    "PlaylistRead",
+    "PlaylistTrackAdd",
+    "PlaylistTrackMove",
+    "PlaylistTrackRead",
+    "PlaylistTracksPage",
 ]
@@ -0,0 +1,11 @@
+"""Creator (track owner) schemas."""
+
+from pydantic import BaseModel, Field
+
+
+class CreatorStatsResponse(BaseModel):
+    user_id: int
+    display_name: str
+    track_count: int
+    likes_count: int
+    unique_listeners: int = Field(description="Approximate (HyperLogLog, ~1% error)")
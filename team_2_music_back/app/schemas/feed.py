@@ -0,0 +1,15 @@
+"""Follow and home feed schemas."""
+
+from pydantic import BaseModel, Field
+
+from .track import TrackRead
+
+
+class FollowResponse(BaseModel):
+    user_id: int
+    following: bool
+
+
+class FeedPage(BaseModel):
+    items: list[TrackRead]
+    next_cursor: str | None = Field(default=None, description="Opaque cursor for the next page; null at the end")
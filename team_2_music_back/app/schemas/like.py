@@ -1,4 +1,6 @@
-"""Like schemas."""
+"""Like and play schemas."""
+
+from datetime import datetime
 
 from pydantic import BaseModel
 
@@ -6,3 +8,8 @@ from pydantic import BaseModel
 class LikeActionResponse(BaseModel):
     track_id: int
     liked: bool
+
+
+class PlayActionResponse(BaseModel):
+    track_id: int
+    played_at: datetime
@@ -0,0 +1,50 @@
+"""Playlist schemas."""
+
+from datetime import datetime
+
+from pydantic import BaseModel, Field
+
+from .track import TrackRead
+
+
+class PlaylistCreate(BaseModel):
+    title: str = Field(min_length=1, max_length=200)
+    description: str | None = Field(default=None, max_length=500)
+    is_public: bool = True
+
+
+class PlaylistRead(BaseModel):
+    id: int
+    owner_user_id: int
+    title: str
+    description: str | None = None
+    is_public: bool
+    track_count: int = 0
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
+
+
+class PlaylistTrackAdd(BaseModel):
+    track_id: int
+    after_track_id: int | None = Field(default=None, description="Insert after this track; omitted = append")
+
+
+class PlaylistTrackMove(BaseModel):
+    after_track_id: int | None = Field(default=None, description="Place after this track; null = move to the front")
+
+
+class PlaylistTrackRead(BaseModel):
+    track_id: int
+    order_key: float
+    added_at: datetime
+    track: TrackRead | None = None
+
+    class Config:
+        from_attributes = True
+
+
+class PlaylistTracksPage(BaseModel):
+    items: list[PlaylistTrackRead]
+    next_cursor: str | None = Field(default=None, description="Opaque cursor for the next page; null at the end")
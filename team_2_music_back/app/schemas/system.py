@@ -1,5 +1,7 @@
 """System-level API schemas."""
 
+from datetime import datetime
+
 from pydantic import BaseModel
 
 
@@ -12,3 +14,13 @@ class HealthResponse(BaseModel):
 class ErrorResponse(BaseModel):
     code: str
     message: str
+
+
+class ProfileRead(BaseModel):
+    name: str
+    method: str
+    route: str
+    duration_ms: int
+    samples: int
+    size_bytes: int
+    created_at: datetime
@@ -37,6 +37,7 @@ class TrackRead(TrackBase):
     owner_display_name: str | None = None
     status: str
     audio_url: str | None = None
+    audio_content_type: str | None = None
     genre: str | None = None
     tags: str | None = None
     ai_provider: str | None = None
@@ -44,7 +45,36 @@ class TrackRead(TrackBase):
     duration_seconds: int | None = None
     likes_count: int = 0
     plays_count: int = 0
+    unique_listeners: int = Field(default=0, description="Approximate (HyperLogLog, ~1% error)")
     created_at: datetime
 
     class Config:
         from_attributes = True
+
+
+class TrendingTrackRead(TrackRead):
+    trending_score: float = 0.0
+
+
+class SimilarTrackRead(TrackRead):
+    similarity: float = 0.0
+
+
+class HotTrackItem(BaseModel):
+    track: TrackRead
+    estimated_count: int
+
+
+class HotTracksResponse(BaseModel):
+    metric: str
+    window_seconds: float
+    total_events: int
+    epsilon: float
+    delta: float
+    max_overcount: int = Field(description="Estimates exceed true counts by at most this, with probability 1 - delta")
+    items: list[HotTrackItem]
+
+
+class TrackBatchResponse(BaseModel):
+    items: list[TrackRead] = Field(description="Found tracks, in the requested order")
+    missing: list[int] = Field(default_factory=list, description="Requested ids that do not exist")
@@ -21,3 +21,11 @@ class UploadFinalizeRequest(BaseModel):
     title: str = Field(min_length=1, max_length=200)
     description: str | None = Field(default=None, max_length=2000)
     cover_url: str | None = Field(default=None, max_length=255)
+
+
+class UploadProgress(BaseModel):
+    upload_id: str
+    file_size: int
+    received_bytes: int
+    ranges: list[tuple[int, int]] = Field(description="Received [start, end) byte ranges, merged and sorted")
+    complete: bool
@@ -0,0 +1,210 @@
+"""Bulk catalog export/import as NDJSON.
+
+Export streams each table with a server-side cursor (``stream_results``) and
+writes one JSON object per line, so memory stays flat regardless of size.
+Import loads tables in foreign-key order using batched ``executemany`` (or
+``COPY`` on PostgreSQL) and commits per chunk. The number of lines loaded per
+table is stored in ``ranking_checkpoints`` in the same transaction as the chunk,
+so an interrupted import resumes exactly where it stopped.
+
+    python -m app.services.catalog export --dir dump/
+    python -m app.services.catalog import --dir dump/ [--restart]
+"""
+
+from __future__ import annotations
+
+import argparse
+import base64
+import itertools
+import logging
+from collections.abc import Callable, Iterable, Iterator
+from datetime import datetime
+from pathlib import Path
+
+import orjson
+from sqlalchemy import Connection, DateTime, Engine, LargeBinary, Table, delete, func, select, text
+
+from app.db.base import Base
+from app.db.session import engine as default_engine
+from app.models.ranking import RankingCheckpoint
+
+logger = logging.getLogger(__name__)
+
+CATALOG_TABLES = (
+    "user_profiles",
+    "tags",
+    "tracks",
+    "track_tags",
+    "likes",
+    "comments",
+    "follows",
+    "playlists",
+    "playlist_tracks",
+    "play_history",
+)
+_CHECKPOINT_PREFIX = "catalog-import:"
+
+
+def _tables(names: Iterable[str]) -> list[Table]:
+    """Resolve table names, ordered so parents load before children."""
+
+    wanted = set(names)
+    unknown = wanted - set(Base.metadata.tables)
+    if unknown:
+        raise ValueError(f"unknown tables: {', '.join(sorted(unknown))}")
+    return [t for t in Base.metadata.sorted_tables if t.name in wanted]
+
+
+def _default(value):
+    if isinstance(value, bytes):
+        return base64.b64encode(value).decode()
+    raise TypeError(f"cannot serialize {type(value).__name__}")
+
+
+def _decoders(table: Table) -> dict[str, Callable]:
+    decoders = {}
+    for column in table.columns:
+        if isinstance(column.type, DateTime):
+            decoders[column.name] = datetime.fromisoformat
+        elif isinstance(column.type, LargeBinary):
+            decoders[column.name] = base64.b64decode
+    return decoders
+
+
+def export_table(conn: Connection, table: Table, path: Path, batch_size: int = 5000) -> int:
+    """Stream ``table`` to ``path`` as NDJSON ordered by primary key; returns rows written."""
+
+    query = select(table).order_by(*table.primary_key.columns)
+    result = conn.execution_options(stream_results=True, yield_per=batch_size).execute(query)
+    written = 0
+    with path.open("wb") as fh:
+        for partition in result.mappings().partitions():
+            fh.write(b"".join(orjson.dumps(dict(row), default=_default) + b"\n" for row in partition))
+            written += len(partition)
+    return written
+
+
+def export_catalog(directory: Path, tables: Iterable[str] = CATALOG_TABLES, engine: Engine | None = None) -> dict[str, int]:
+    directory.mkdir(parents=True, exist_ok=True)
+    counts = {}
+    with (engine or default_engine).connect() as conn:
+        for table in _tables(tables):
+            counts[table.name] = export_table(conn, table, directory / f"{table.name}.ndjson")
+    return counts
+
+
+def _read_rows(path: Path, table: Table, skip: int) -> Iterator[dict]:
+    decoders = _decoders(table)
+    columns = set(table.columns.keys())
+    with path.open("rb") as fh:
+        for line in itertools.islice(fh, skip, None):
+            if not line.strip():
+                continue
+            row = {k: v for k, v in orjson.loads(line).items() if k in columns}
+            for name, decode in decoders.items():
+                if row.get(name) is not None:
+                    row[name] = decode(row[name])
+            yield row
+
+
+def _copy_rows(conn: Connection, table: Table, rows: list[dict]) -> None:
+    """PostgreSQL ``COPY FROM STDIN`` through the psycopg driver connection."""
+
+    names = list(table.columns.keys())
+    cursor = conn.connection.driver_connection.cursor()
+    with cursor.copy(f'COPY {table.name} ({", ".join(names)}) FROM STDIN') as copy:
+        for row in rows:
+            copy.write_row([row.get(name) for name in names])
+
+
+def _checkpoint(conn: Connection, table: Table) -> int:
+    value = conn.execute(
+        select(RankingCheckpoint.value).where(RankingCheckpoint.name == _CHECKPOINT_PREFIX + table.name)
+    ).scalar()
+    return int(value or 0)
+
+
+def _set_checkpoint(conn: Connection, table: Table, value: int) -> None:
+    name = _CHECKPOINT_PREFIX + table.name
+    updated = conn.execute(
+        RankingCheckpoint.__table__.update()
+        .where(RankingCheckpoint.name == name)
+        .values(value=value, updated_at=datetime.utcnow())
+    )
+    if updated.rowcount == 0:
+        conn.execute(RankingCheckpoint.__table__.insert().values(name=name, value=value, updated_at=datetime.utcnow()))
+
+
+def import_table(conn: Connection, table: Table, path: Path, chunk_size: int = 5000) -> int:
+    """Load one NDJSON file, committing every ``chunk_size`` rows; returns rows loaded now."""
+
+    done = _checkpoint(conn, table)
+    conn.commit()
+    use_copy = conn.dialect.name == "postgresql"
+    rows = _read_rows(path, table, skip=done)
+    loaded = 0
+    while chunk := list(itertools.islice(rows, chunk_size)):
+        if use_copy:
+            _copy_rows(conn, table, chunk)
+        else:
+            conn.execute(table.insert(), chunk)
+        loaded += len(chunk)
+        _set_checkpoint(conn, table, done + loaded)
+        conn.commit()
+    if use_copy and loaded and "id" in table.columns:
+        # COPY bypasses the serial sequence; move it past the imported ids.
+        conn.execute(
+            text(f"SELECT setval(pg_get_serial_sequence('{table.name}', 'id'), (SELECT MAX(id) FROM {table.name}))")
+        )
+        conn.commit()
+    return loaded
+
+
+def import_catalog(
+    directory: Path,
+    tables: Iterable[str] = CATALOG_TABLES,
+    chunk_size: int = 5000,
+    restart: bool = False,
+    engine: Engine | None = None,
+) -> dict[str, int]:
+    counts = {}
+    with (engine or default_engine).connect() as conn:
+        if restart:
+            conn.execute(delete(RankingCheckpoint).where(RankingCheckpoint.name.like(_CHECKPOINT_PREFIX + "%")))
+            conn.commit()
+        for table in _tables(tables):
+            path = directory / f"{table.name}.ndjson"
+            if not path.exists():
+                continue
+            counts[table.name] = import_table(conn, table, path, chunk_size=chunk_size)
+            logger.info("imported %s rows into %s", counts[table.name], table.name)
+    return counts
+
+
+def table_counts(tables: Iterable[str] = CATALOG_TABLES, engine: Engine | None = None) -> dict[str, int]:
+    with (engine or default_engine).connect() as conn:
+        return {t.name: conn.execute(select(func.count()).select_from(t)).scalar() for t in _tables(tables)}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Export/import the catalog as NDJSON.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    for name in ("export", "import"):
+        cmd = sub.add_parser(name)
+        cmd.add_argument("--dir", type=Path, required=True)
+        cmd.add_argument("--tables", nargs="+", default=list(CATALOG_TABLES))
+    sub.choices["import"].add_argument("--chunk-size", type=int, default=5000)
+    sub.choices["import"].add_argument("--restart", action="store_true", help="ignore saved checkpoints")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    if args.command == "export":
+        counts = export_catalog(args.dir, args.tables)
+    else:
+        counts = import_catalog(args.dir, args.tables, chunk_size=args.chunk_size, restart=args.restart)
+    for table, count in counts.items():
+        print(f"{args.command}ed {count} rows: {table}")
+
+
+if __name__ == "__main__":
+    main()
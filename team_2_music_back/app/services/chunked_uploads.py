@@ -0,0 +1,238 @@
+"""Resumable chunked uploads for the local storage backend.
+
+Each chunk is addressed by its byte offset in the final file and staged as its
+own part file under ``MUSIC_UPLOAD_CHUNK_DIR/<upload_id>/`` (written to a temp
+name, fsynced, then renamed), so chunks may arrive in parallel and out of
+order, and a retried chunk simply replaces its part. The received ranges are
+derived from the part names; a client that lost its connection asks for them
+and re-sends only what is missing. On finalize the parts are concatenated
+in-kernel (``copy_file_range``/``sendfile``) into the storage path.
+"""
+
+from __future__ import annotations
+
+import os
+import shutil
+from collections.abc import AsyncIterator
+from datetime import datetime, timedelta
+from pathlib import Path
+from uuid import uuid4
+
+from fastapi import HTTPException, status
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import settings
+from app.core.metrics import UPLOAD_BYTES
+from app.core.sniff import AUDIO_TYPES, SNIFF_BYTES, check_media_type
+from app.models.upload_session import UploadSession
+from app.schemas import UploadProgress
+
+
+def merge_ranges(parts: list[tuple[int, int]]) -> list[tuple[int, int]]:
+    """Merge (offset, length) parts into sorted, non-overlapping [start, end) ranges."""
+
+    merged: list[list[int]] = []
+    for offset, length in sorted(parts):
+        if merged and offset <= merged[-1][1]:
+            merged[-1][1] = max(merged[-1][1], offset + length)
+        else:
+            merged.append([offset, offset + length])
+    return [(start, end) for start, end in merged]
+
+
+def _copy_range(src: int, dst: int, count: int, src_offset: int) -> None:
+    """Append ``count`` bytes of ``src`` from ``src_offset`` to ``dst`` without a userspace copy."""
+
+    if hasattr(os, "copy_file_range"):
+        try:
+            while count:
+                copied = os.copy_file_range(src, dst, count, src_offset)
+                if copied == 0:
+                    raise OSError("short copy")
+                src_offset += copied
+                count -= copied
+            return
+        except OSError:
+            pass  # e.g. cross-filesystem on older kernels; sendfile handles it
+    if hasattr(os, "sendfile"):
+        try:
+            while count:
+                sent = os.sendfile(dst, src, src_offset, count)
+                if sent == 0:
+                    raise OSError("short copy")
+                src_offset += sent
+                count -= sent
+            return
+        except OSError:
+            pass
+    os.lseek(src, src_offset, os.SEEK_SET)
+    while count:
+        data = os.read(src, min(count, 1024 * 1024))
+        if not data:
+            raise OSError("short read")
+        os.write(dst, data)
+        count -= len(data)
+
+
+class ChunkStore:
+    """Part files on local disk for in-flight chunked uploads."""
+
+    def __init__(self, root: str | Path | None = None) -> None:
+        self.root = Path(root or settings.upload_chunk_dir)
+
+    def _dir(self, upload_id: str) -> Path:
+        return self.root / upload_id
+
+    def parts(self, upload_id: str) -> list[tuple[int, int]]:
+        directory = self._dir(upload_id)
+        if not directory.exists():
+            return []
+        found = []
+        for path in directory.glob("*.part"):
+            offset, _, length = path.stem.partition("-")
+            found.append((int(offset), int(length)))
+        return found
+
+    def open_part(self, upload_id: str, offset: int) -> tuple[Path, object]:
+        directory = self._dir(upload_id)
+        directory.mkdir(parents=True, exist_ok=True)
+        tmp = directory / f"{offset}.{uuid4().hex}.tmp"
+        return tmp, tmp.open("wb")
+
+    def commit_part(self, upload_id: str, offset: int, tmp: Path, fh) -> int:
+        fh.flush()
+        os.fsync(fh.fileno())
+        length = fh.tell()
+        fh.close()
+        directory = self._dir(upload_id)
+        # A retry with a different length leaves the old part; assembly tolerates overlaps.
+        os.replace(tmp, directory / f"{offset}-{length}.part")
+        dir_fd = os.open(directory, os.O_RDONLY)
+        try:
+            os.fsync(dir_fd)
+        finally:
+            os.close(dir_fd)
+        return length
+
+    def assemble(self, upload_id: str, file_size: int, target: Path, base_path: Path) -> None:
+        """Concatenate parts into ``target``; raises 409 ``UPLOAD_INCOMPLETE`` on gaps.
+
+        ``target`` must resolve inside ``base_path`` (the storage root).
+        """
+
+        if not target.resolve().is_relative_to(base_path.resolve()):
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="INVALID_FILENAME")
+        parts = sorted(self.parts(upload_id))
+        if merge_ranges(parts) != [(0, file_size)]:
+            raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="UPLOAD_INCOMPLETE")
+
+        target.parent.mkdir(parents=True, exist_ok=True)
+        tmp = target.with_name(f".{target.name}.{uuid4().hex}.tmp")
+        dst = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+        try:
+            cursor = 0
+            for offset, length in parts:
+                if offset + length <= cursor:
+                    continue  # fully covered by an earlier part
+                src = os.open(self._dir(upload_id) / f"{offset}-{length}.part", os.O_RDONLY)
+                try:
+                    _copy_range(src, dst, offset + length - cursor, cursor - offset)
+                finally:
+                    os.close(src)
+                cursor = offset + length
+            os.fsync(dst)
+        except BaseException:
+            os.close(dst)
+            tmp.unlink(missing_ok=True)
+            raise
+        os.close(dst)
+        os.replace(tmp, target)
+        self.discard(upload_id)
+
+    def discard(self, upload_id: str) -> None:
+        shutil.rmtree(self._dir(upload_id), ignore_errors=True)
+
+
+class ChunkedUploadService:
+    def __init__(self, db: Session, store: ChunkStore | None = None) -> None:
+        self.db = db
+        self.store = store or ChunkStore()
+
+    def _session(self, upload_id: str, owner_user_id: int) -> UploadSession:
+        session = (
+            self.db.query(UploadSession)
+            .filter(UploadSession.upload_id == upload_id, UploadSession.owner_user_id == owner_user_id)
+            .first()
+        )
+        if not session:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="UPLOAD_NOT_FOUND")
+        if session.status != "initiated":
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="UPLOAD_INVALID_STATE")
+        if session.expires_at and session.expires_at < datetime.utcnow():
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="UPLOAD_EXPIRED")
+        return session
+
+    def progress(self, upload_id: str, owner_user_id: int) -> UploadProgress:
+        session = self._session(upload_id, owner_user_id)
+        return self._progress(session)
+
+    def _progress(self, session: UploadSession) -> UploadProgress:
+        ranges = merge_ranges(self.store.parts(session.upload_id))
+        return UploadProgress(
+            upload_id=session.upload_id,
+            file_size=session.file_size,
+            received_bytes=sum(end - start for start, end in ranges),
+            ranges=ranges,
+            complete=ranges == [(0, session.file_size)],
+        )
+
+    async def receive_chunk(
+        self, upload_id: str, owner_user_id: int, offset: int, body: AsyncIterator[bytes]
+    ) -> UploadProgress:
+        """Stream one chunk to disk; its bytes must fit inside ``[offset, file_size)``.
+
+        Called from an async route: every blocking DB or filesystem call goes
+        through the threadpool.
+        """
+
+        session = await run_in_threadpool(self._session, upload_id, owner_user_id)
+        if offset < 0 or offset >= session.file_size:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="CHUNK_OUT_OF_RANGE")
+        limit = min(session.file_size - offset, settings.upload_chunk_max_bytes)
+
+        tmp, fh = await run_in_threadpool(self.store.open_part, upload_id, offset)
+        received = 0
+        # The chunk at offset 0 holds the file signature: hold back its first bytes
+        # and reject a wrong file type before anything else is written.
+        head = bytearray() if offset == 0 else None
+        try:
+            async for piece in body:
+                received += len(piece)
+                if received > limit:
+                    raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="CHUNK_OUT_OF_RANGE")
+                if head is not None:
+                    head += piece
+                    if len(head) < SNIFF_BYTES:
+                        continue
+                    check_media_type(bytes(head[:SNIFF_BYTES]), session.content_type, AUDIO_TYPES)
+                    piece, head = bytes(head), None
+                await run_in_threadpool(fh.write, piece)
+            if received == 0:
+                raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="EMPTY_CHUNK")
+            if head is not None:  # first chunk shorter than the sniff window
+                check_media_type(bytes(head), session.content_type, AUDIO_TYPES)
+                await run_in_threadpool(fh.write, bytes(head))
+            await run_in_threadpool(self.store.commit_part, upload_id, offset, tmp, fh)
+        except BaseException:
+            fh.close()
+            tmp.unlink(missing_ok=True)
+            raise
+        UPLOAD_BYTES.labels(kind="chunk").inc(received)
+        return await run_in_threadpool(self._extend, session)
+
+    def _extend(self, session: UploadSession) -> UploadProgress:
+        # Sliding expiry: an upload stays alive while chunks keep arriving.
+        session.expires_at = datetime.utcnow() + timedelta(seconds=settings.presign_expiration)
+        self.db.commit()
+        return self._progress(session)
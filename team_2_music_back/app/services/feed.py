@@ -0,0 +1,327 @@
+"""Follow graph and home feed.
+
+New tracks are pushed into each follower's timeline (fan-out-on-write, run as a
+background task after the create/upload response via :func:`fan_out_track`); Redis
+and SQL timelines are both capped at ``feed_timeline_cap`` entries.
+Accounts with more than ``feed_fanout_threshold`` followers are not pushed;
+their tracks are pulled at read time (fan-out-on-read) and merged in. Pages are
+ordered by ``(created_at, track_id)`` descending and addressed by an opaque cursor.
+"""
+
+from __future__ import annotations
+
+import base64
+import logging
+from datetime import datetime
+
+from fastapi import HTTPException, status
+from redis import Redis  # type: ignore[import]
+from redis.exceptions import RedisError  # type: ignore[import]
+from sqlalchemy import and_, delete, func, insert, or_, select, update
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session, selectinload
+
+from app.core.config import settings
+from app.core.redis import get_redis
+from app.core.tracing import traced
+from app.models.feed import FeedItem
+from app.models.follow import Follow
+from app.models.track import Track
+from app.models.user_profile import UserProfile
+from app.models.vote import Like
+
+logger = logging.getLogger(__name__)
+
+_FANOUT_BATCH = 1000
+
+Cursor = tuple[int, int]  # (created_at in microseconds, track_id)
+
+
+def _micros(value: datetime) -> int:
+    return int((value - datetime(1970, 1, 1)).total_seconds() * 1_000_000)
+
+
+def _from_micros(value: int) -> datetime:
+    return datetime.utcfromtimestamp(value / 1_000_000)
+
+
+def encode_cursor(cursor: Cursor) -> str:
+    return base64.urlsafe_b64encode(f"{cursor[0]}:{cursor[1]}".encode()).decode().rstrip("=")
+
+
+def decode_cursor(raw: str | None) -> Cursor | None:
+    if not raw:
+        return None
+    try:
+        padded = raw + "=" * (-len(raw) % 4)
+        micros, track_id = base64.urlsafe_b64decode(padded.encode()).decode().split(":")
+        return int(micros), int(track_id)
+    except (ValueError, UnicodeDecodeError):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="INVALID_CURSOR") from None
+
+
+def _insert_ignoring_duplicates(db: Session):
+    """``INSERT`` that skips rows hitting a unique constraint instead of failing the batch."""
+
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+        return pg_insert(FeedItem).on_conflict_do_nothing()
+    if dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+        return sqlite_insert(FeedItem).on_conflict_do_nothing()
+    return insert(FeedItem).prefix_with("IGNORE")  # MySQL / MariaDB
+
+
+class SqlTimelineStore:
+    """Timelines kept in the ``feed_items`` table."""
+
+    def __init__(self, db: Session) -> None:
+        self.db = db
+
+    def push(self, follower_ids: list[int], track: Track) -> None:
+        # A follower may already hold this track (e.g. backfilled on follow); skip
+        # that row rather than rolling back the whole fan-out.
+        statement = _insert_ignoring_duplicates(self.db)
+        for start in range(0, len(follower_ids), _FANOUT_BATCH):
+            batch = follower_ids[start : start + _FANOUT_BATCH]
+            self.db.execute(
+                statement,
+                [
+                    {"user_id": uid, "track_id": track.id, "author_id": track.owner_user_id, "created_at": track.created_at}
+                    for uid in batch
+                ],
+            )
+            self._trim(batch)
+        self.db.commit()
+
+    def _trim(self, user_ids: list[int]) -> None:
+        """Drop everything past ``feed_timeline_cap`` in these users' timelines."""
+
+        ranked = (
+            select(
+                FeedItem.id,
+                func.row_number()
+                .over(partition_by=FeedItem.user_id, order_by=(FeedItem.created_at.desc(), FeedItem.track_id.desc()))
+                .label("position"),
+            )
+            .where(FeedItem.user_id.in_(user_ids))
+            .subquery()
+        )
+        overflow = select(ranked.c.id).where(ranked.c.position > settings.feed_timeline_cap)
+        self.db.execute(delete(FeedItem).where(FeedItem.id.in_(overflow)))
+
+    def backfill(self, user_id: int, tracks: list[Track]) -> None:
+        existing = {
+            t for (t,) in self.db.query(FeedItem.track_id).filter(
+                FeedItem.user_id == user_id, FeedItem.track_id.in_([t.id for t in tracks])
+            )
+        }
+        for track in tracks:
+            if track.id not in existing:
+                self.db.add(
+                    FeedItem(user_id=user_id, track_id=track.id, author_id=track.owner_user_id, created_at=track.created_at)
+                )
+        self.db.flush()
+        self._trim([user_id])
+        self.db.commit()
+
+    def remove_author(self, user_id: int, author_id: int) -> None:
+        self.db.execute(delete(FeedItem).where(FeedItem.user_id == user_id, FeedItem.author_id == author_id))
+        self.db.commit()
+
+    def page(self, user_id: int, before: Cursor | None, limit: int) -> list[Cursor]:
+        query = self.db.query(FeedItem.created_at, FeedItem.track_id).filter(FeedItem.user_id == user_id)
+        if before:
+            at = _from_micros(before[0])
+            query = query.filter(
+                or_(FeedItem.created_at < at, and_(FeedItem.created_at == at, FeedItem.track_id < before[1]))
+            )
+        rows = query.order_by(FeedItem.created_at.desc(), FeedItem.track_id.desc()).limit(limit).all()
+        return [(_micros(created_at), track_id) for created_at, track_id in rows]
+
+
+class RedisTimelineStore:
+    """Timelines kept in Redis sorted sets (score = created_at micros, member = track id)."""
+
+    def __init__(self, redis_client: Redis, db: Session) -> None:
+        self._redis = redis_client
+        self.db = db
+
+    @staticmethod
+    def _key(user_id: int) -> str:
+        return f"feed:{user_id}"
+
+    def push(self, follower_ids: list[int], track: Track) -> None:
+        score = _micros(track.created_at)
+        pipe = self._redis.pipeline(transaction=False)
+        for i, user_id in enumerate(follower_ids, start=1):
+            pipe.zadd(self._key(user_id), {track.id: score})
+            pipe.zremrangebyrank(self._key(user_id), 0, -(settings.feed_timeline_cap + 1))
+            if i % _FANOUT_BATCH == 0:
+                pipe.execute()
+        pipe.execute()
+
+    def backfill(self, user_id: int, tracks: list[Track]) -> None:
+        if tracks:
+            self._redis.zadd(self._key(user_id), {t.id: _micros(t.created_at) for t in tracks})
+
+    def remove_author(self, user_id: int, author_id: int) -> None:
+        ids = [
+            t
+            for (t,) in self.db.query(Track.id)
+            .filter(Track.owner_user_id == author_id)
+            .order_by(Track.created_at.desc())
+            .limit(settings.feed_timeline_cap)
+        ]
+        if ids:
+            self._redis.zrem(self._key(user_id), *ids)
+
+    def page(self, user_id: int, before: Cursor | None, limit: int) -> list[Cursor]:
+        # Fetch by score then apply the (score, id) tie-break locally.
+        max_score = f"{before[0]}" if before else "+inf"
+        rows = self._redis.zrevrangebyscore(self._key(user_id), max_score, "-inf", start=0, num=limit + 50, withscores=True)
+        items = sorted(((int(score), int(member)) for member, score in rows), reverse=True)
+        if before:
+            items = [item for item in items if item < before]
+        return items[:limit]
+
+
+class FeedService:
+    """Follow/unfollow and cursor-paginated home feed."""
+
+    def __init__(self, db: Session, store: SqlTimelineStore | RedisTimelineStore | None = None) -> None:
+        self.db = db
+        if store is None:
+            redis_client = get_redis()
+            store = RedisTimelineStore(redis_client, db) if redis_client is not None else SqlTimelineStore(db)
+        self.store = store
+
+    def follow(self, follower_id: int, following_id: int) -> bool:
+        if follower_id == following_id:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="CANNOT_FOLLOW_SELF")
+        target = self.db.get(UserProfile, following_id)
+        if not target:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="USER_NOT_FOUND")
+
+        try:
+            self.db.add(Follow(follower_id=follower_id, following_id=following_id))
+            self.db.execute(
+                update(UserProfile)
+                .where(UserProfile.id == following_id)
+                .values(follower_count=UserProfile.follower_count + 1)
+            )
+            self.db.commit()
+        except IntegrityError:
+            self.db.rollback()
+            return True  # already following
+
+        if target.follower_count <= settings.feed_fanout_threshold:
+            recent = (
+                self.db.query(Track)
+                .filter(Track.owner_user_id == following_id)
+                .order_by(Track.created_at.desc())
+                .limit(settings.feed_backfill)
+                .all()
+            )
+            self._safely(self.store.backfill, follower_id, recent)
+        return True
+
+    def unfollow(self, follower_id: int, following_id: int) -> bool:
+        deleted = (
+            self.db.query(Follow)
+            .filter(Follow.follower_id == follower_id, Follow.following_id == following_id)
+            .delete(synchronize_session=False)
+        )
+        if deleted:
+            self.db.execute(
+                update(UserProfile)
+                .where(UserProfile.id == following_id, UserProfile.follower_count > 0)
+                .values(follower_count=UserProfile.follower_count - 1)
+            )
+        self.db.commit()
+        if deleted:
+            self._safely(self.store.remove_author, follower_id, following_id)
+        return False
+
+    @traced("feed.fan_out")
+    def fan_out(self, track: Track) -> int:
+        """Push a new track to its owner's followers; returns timelines written."""
+
+        author = self.db.get(UserProfile, track.owner_user_id)
+        if not author or author.follower_count > settings.feed_fanout_threshold:
+            return 0  # large account: served by fan-out-on-read
+        follower_ids = [
+            f for (f,) in self.db.query(Follow.follower_id).filter(Follow.following_id == track.owner_user_id)
+        ]
+        if follower_ids:
+            self._safely(self.store.push, follower_ids, track)
+        return len(follower_ids)
+
+    def timeline(self, user_id: int, cursor: str | None = None, limit: int = 20) -> tuple[list[Track], str | None]:
+        limit = min(max(limit, 1), 100)
+        before = decode_cursor(cursor)
+
+        entries = self.store.page(user_id, before, limit)
+        entries += self._pull_large_accounts(user_id, before, limit)
+
+        seen: set[int] = set()
+        merged: list[Cursor] = []
+        for entry in sorted(entries, reverse=True):
+            if entry[1] not in seen:
+                seen.add(entry[1])
+                merged.append(entry)
+        merged = merged[:limit]
+
+        ids = [track_id for _, track_id in merged]
+        tracks = {t.id: t for t in self.db.query(Track).options(selectinload(Track.owner)).filter(Track.id.in_(ids))}
+        likes = dict(
+            self.db.query(Like.track_id, func.count(Like.id)).filter(Like.track_id.in_(ids)).group_by(Like.track_id).all()
+        )
+        items = []
+        for track_id in ids:
+            track = tracks.get(track_id)
+            if track is not None:
+                track.likes_count = likes.get(track_id, 0)
+                track.plays_count = 0
+                items.append(track)
+        next_cursor = encode_cursor(merged[-1]) if len(merged) == limit else None
+        return items, next_cursor
+
+    def _pull_large_accounts(self, user_id: int, before: Cursor | None, limit: int) -> list[Cursor]:
+        large = [
+            uid
+            for (uid,) in self.db.query(Follow.following_id)
+            .join(UserProfile, UserProfile.id == Follow.following_id)
+            .filter(Follow.follower_id == user_id, UserProfile.follower_count > settings.feed_fanout_threshold)
+        ]
+        if not large:
+            return []
+        query = self.db.query(Track.created_at, Track.id).filter(Track.owner_user_id.in_(large))
+        if before:
+            at = _from_micros(before[0])
+            query = query.filter(or_(Track.created_at < at, and_(Track.created_at == at, Track.id < before[1])))
+        rows = query.order_by(Track.created_at.desc(), Track.id.desc()).limit(limit).all()
+        return [(_micros(created_at), track_id) for created_at, track_id in rows]
+
+    def _safely(self, action, *args) -> None:
+        try:
+            action(*args)
+        except (RedisError, IntegrityError) as exc:
+            self.db.rollback()
+            logger.warning("Feed timeline update failed: %s", exc)
+
+
+def fan_out_track(bind: Engine | Connection, track_id: int) -> int:
+    """Background-task entry point: fan a committed track out on a session of its own.
+
+    The request's session is closed by the time the task runs, so only the bind
+    and the id cross over.
+    """
+
+    with Session(bind=bind) as db:
+        track = db.get(Track, track_id)
+        return FeedService(db).fan_out(track) if track is not None else 0
@@ -0,0 +1,188 @@
+"""Approximate "most played / most liked in the last hour" tracking.
+
+Each worker feeds play and like events into a local sliding-window Count-Min
+Sketch plus a Top-K candidate set. With Redis enabled the workers periodically
+publish their serialized sketches to a hash; reads merge every live worker's
+sketch and re-rank the union of candidates. Published sketches only change once
+per ``heavy_hitters_flush_seconds``, so the merge of the other workers' sketches
+is cached that long and only the local sketch is folded in per read. Estimates never under-count and
+over-count by at most ``epsilon * total_events`` with probability ``1 - delta``.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import struct
+import threading
+import time
+from dataclasses import dataclass
+from functools import lru_cache
+from uuid import uuid4
+
+from redis import Redis  # type: ignore[import]
+from redis.exceptions import RedisError  # type: ignore[import]
+
+from app.core.config import settings
+from app.core.lazy import lazy_import
+from app.core.redis import get_redis
+from app.core.sketch import SlidingWindowSketch, TopK
+
+np = lazy_import("numpy")
+logger = logging.getLogger(__name__)
+
+METRICS = ("plays", "likes")
+_BLOB_HEADER = struct.Struct("<dI")
+
+
+@dataclass
+class HeavyHitters:
+    metric: str
+    window_seconds: float
+    total_events: int
+    epsilon: float
+    delta: float
+    items: list[tuple[int, int]]
+
+    @property
+    def max_overcount(self) -> int:
+        return int(np.ceil(self.epsilon * self.total_events))
+
+
+class HeavyHitterTracker:
+    """Per-process sketch for one metric, mergeable across workers through Redis."""
+
+    def __init__(self, metric: str, redis_client: Redis | None = None) -> None:
+        self.metric = metric
+        self._redis = redis_client
+        self._origin = f"{os.getpid()}-{uuid4().hex[:8]}"
+        self._lock = threading.Lock()
+        self.sketch = self._new_sketch()
+        self.topk = TopK(settings.heavy_hitters_capacity)
+        self._bucket: int | None = None
+        self._remote_lock = threading.Lock()
+        # (monotonic time built, merged sketch of the other workers, their candidates)
+        self._remote: tuple[float, SlidingWindowSketch, set[int]] | None = None
+
+    @staticmethod
+    def _new_sketch() -> SlidingWindowSketch:
+        return SlidingWindowSketch(
+            window_seconds=settings.heavy_hitters_window_seconds,
+            buckets=settings.heavy_hitters_buckets,
+            epsilon=settings.heavy_hitters_epsilon,
+            delta=settings.heavy_hitters_delta,
+        )
+
+    @property
+    def _redis_key(self) -> str:
+        return f"sketch:{self.metric}"
+
+    def record(self, track_id: int, ts: float | None = None) -> None:
+        ts = time.time() if ts is None else ts
+        with self._lock:
+            self.sketch.add([track_id], ts)
+            bucket = self.sketch.bucket_id(ts)
+            if bucket != self._bucket:
+                # A bucket rotated out: candidates' stored estimates are stale (too high).
+                self._bucket = bucket
+                self._rescore(ts)
+            self.topk.offer(track_id, int(self.sketch.estimate([track_id], ts)[0]))
+
+    def _rescore(self, now: float) -> None:
+        candidates = self.topk.candidates()
+        if candidates:
+            estimates = self.sketch.estimate(candidates, now)
+            self.topk.rescore(dict(zip(candidates, estimates.tolist())))
+
+    def top(self, limit: int, now: float | None = None) -> HeavyHitters:
+        now = now or time.time()
+        sketch, candidates = self._merged(now)
+        keys = np.fromiter(candidates, dtype=np.int64, count=len(candidates))
+        estimates = sketch.estimate(keys, now)
+        order = np.argsort(-estimates.astype(np.int64), kind="stable")[:limit]
+        items = [(int(keys[i]), int(estimates[i])) for i in order if estimates[i] > 0]
+        return HeavyHitters(
+            metric=self.metric,
+            window_seconds=sketch.window_seconds,
+            total_events=sketch.total(now),
+            epsilon=sketch.epsilon,
+            delta=sketch.delta,
+            items=items,
+        )
+
+    def flush(self) -> None:
+        """Publish this worker's sketch and candidates for the other workers."""
+
+        if not self._redis:
+            return
+        with self._lock:
+            candidates = np.array(self.topk.candidates(), dtype="<i8")
+            blob = _BLOB_HEADER.pack(time.time(), candidates.size) + candidates.tobytes() + self.sketch.to_bytes()
+        try:
+            pipe = self._redis.pipeline()
+            pipe.hset(self._redis_key, self._origin, blob)
+            pipe.expire(self._redis_key, settings.heavy_hitters_window_seconds * 2)
+            pipe.execute()
+        except RedisError as exc:
+            logger.warning("Heavy-hitter sketch flush failed: %s", exc)
+
+    def _merged(self, now: float) -> tuple[SlidingWindowSketch, set[int]]:
+        merged = self._new_sketch()
+        candidates: set[int] = set()
+        if self._redis:
+            remote, candidates = self._remote_merged(now)
+            merged.merge(remote)
+        with self._lock:
+            merged.merge(self.sketch)
+            candidates.update(self.topk.candidates())
+        return merged, candidates
+
+    def _remote_merged(self, now: float) -> tuple[SlidingWindowSketch, set[int]]:
+        """Other workers' sketches merged, rebuilt at most once per flush interval."""
+
+        with self._remote_lock:
+            cached = self._remote
+            if cached is not None and time.monotonic() - cached[0] < settings.heavy_hitters_flush_seconds:
+                return cached[1], set(cached[2])
+            merged, candidates = self._merge_remote(now)
+            self._remote = (time.monotonic(), merged, candidates)
+            return merged, set(candidates)
+
+    def _merge_remote(self, now: float) -> tuple[SlidingWindowSketch, set[int]]:
+        merged = self._new_sketch()
+        candidates: set[int] = set()
+        for origin, blob in self._remote_blobs().items():
+            if origin == self._origin:
+                continue
+            try:
+                published_at, count = _BLOB_HEADER.unpack_from(blob, 0)
+                if now - published_at > merged.window_seconds:
+                    continue  # worker is gone; its data has aged out anyway
+                offset = _BLOB_HEADER.size
+                candidates.update(np.frombuffer(blob, dtype="<i8", count=count, offset=offset).tolist())
+                merged.merge(SlidingWindowSketch.from_bytes(blob[offset + count * 8 :]))
+            except (ValueError, struct.error) as exc:
+                logger.warning("Ignoring incompatible sketch from %s: %s", origin, exc)
+        return merged, candidates
+
+    def _remote_blobs(self) -> dict[str, bytes]:
+        if not self._redis:
+            return {}
+        try:
+            raw = self._redis.hgetall(self._redis_key)
+        except RedisError as exc:
+            logger.warning("Heavy-hitter sketch read failed: %s", exc)
+            return {}
+        return {key.decode(): value for key, value in raw.items()}
+
+
+@lru_cache
+def get_heavy_hitters(metric: str) -> HeavyHitterTracker:
+    if metric not in METRICS:
+        raise ValueError(f"unknown heavy-hitter metric: {metric}")
+    return HeavyHitterTracker(metric, redis_client=get_redis())
+
+
+def flush_heavy_hitters() -> None:
+    for metric in METRICS:
+        get_heavy_hitters(metric).flush()
@@ -6,17 +6,22 @@ from fastapi import HTTPException, status
 from sqlalchemy import func
 from sqlalchemy.orm import Session
 
+from app.core.cache import TRACK_LIST_TAG, ResponseCache, get_response_cache, track_tag
 from app.models.comment import Comment
+from app.models.play_history import PlayHistory
 from app.models.track import Track
 from app.models.vote import Like
 from app.schemas import CommentCreate
+from app.services.heavy_hitters import get_heavy_hitters
+from app.services.listeners import ListenerStatsService
 
 
 class InteractionService:
     """Encapsulate like/comment interactions."""
 
-    def __init__(self, db: Session) -> None:
+    def __init__(self, db: Session, cache: ResponseCache | None = None) -> None:
         self.db = db
+        self.cache = cache or get_response_cache()
 
     def toggle_like(self, track_id: int, user_id: int, like: bool) -> bool:
         track = self.db.get(Track, track_id)
@@ -33,15 +38,33 @@ class InteractionService:
                 like_row = Like(track_id=track_id, user_id=user_id)
                 self.db.add(like_row)
                 self.db.commit()
+                self._invalidate_cache(track_id)
+                get_heavy_hitters("likes").record(track_id)
             return True
         if existing:
             self.db.delete(existing)
             self.db.commit()
+            self._invalidate_cache(track_id)
         return False
 
     def count_likes(self, track_id: int) -> int:
         return self.db.query(func.count(Like.id)).filter(Like.track_id == track_id).scalar() or 0
 
+    def record_play(self, track_id: int, user_id: int) -> PlayHistory:
+        track = self.db.get(Track, track_id)
+        if not track:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="TRACK_NOT_FOUND")
+
+        play = PlayHistory(track_id=track_id, user_id=user_id, played_at=datetime.utcnow())
+        self.db.add(play)
+        self.db.commit()
+        get_heavy_hitters("plays").record(track_id)
+        ListenerStatsService(self.db).record_play(track_id, owner_user_id=track.owner_user_id, user_id=user_id)
+        # unique_listeners is embedded in the detail payload; lists catch up on TTL
+        # rather than being dropped on every play.
+        self.cache.invalidate_tags(track_tag(track_id))
+        return play
+
     def add_comment(self, payload: CommentCreate, user_id: int) -> Comment:
         track = self.db.get(Track, payload.track_id)
         if not track:
@@ -56,6 +79,7 @@ class InteractionService:
         self.db.add(comment)
         self.db.commit()
         self.db.refresh(comment)
+        self._invalidate_cache(payload.track_id)
         return comment
 
     def list_comments(self, track_id: int, limit: int = 50, offset: int = 0) -> list[Comment]:
@@ -69,3 +93,7 @@ class InteractionService:
             .limit(limit)
             .all()
         )
+
+    def _invalidate_cache(self, track_id: int) -> None:
+        # likes_count is embedded in both detail and list payloads.
+        self.cache.invalidate_tags(track_tag(track_id), TRACK_LIST_TAG)
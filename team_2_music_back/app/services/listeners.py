@@ -0,0 +1,100 @@
+"""Approximate unique-listener counts per track and per owner.
+
+Redis mode uses native HyperLogLogs (PFADD/PFCOUNT). Local-only mode keeps the
+same registers in the ``listener_sketches`` table via the NumPy implementation,
+so ``COUNT(DISTINCT user_id)`` over ``play_history`` is never needed.
+"""
+
+from __future__ import annotations
+
+import logging
+
+from redis import Redis  # type: ignore[import]
+from redis.exceptions import RedisError  # type: ignore[import]
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.core.hyperloglog import HyperLogLog
+from app.core.redis import get_redis
+from app.models.listener_sketch import ListenerSketch
+
+logger = logging.getLogger(__name__)
+
+_INSERT_RETRIES = 3
+
+
+def track_key(track_id: int) -> str:
+    return f"track:{track_id}"
+
+
+def owner_key(owner_user_id: int) -> str:
+    return f"owner:{owner_user_id}"
+
+
+class ListenerStatsService:
+    """Record plays into HyperLogLogs and read back distinct-listener estimates."""
+
+    _REDIS_PREFIX = "hll:"
+
+    def __init__(self, db: Session, redis_client: Redis | None = None) -> None:
+        self.db = db
+        self._redis = redis_client if redis_client is not None else get_redis()
+
+    def record_play(self, track_id: int, owner_user_id: int, user_id: int) -> None:
+        keys = [track_key(track_id), owner_key(owner_user_id)]
+        if self._redis:
+            try:
+                pipe = self._redis.pipeline(transaction=False)
+                for key in keys:
+                    pipe.pfadd(self._REDIS_PREFIX + key, user_id)
+                pipe.execute()
+                return
+            except RedisError as exc:
+                logger.warning("PFADD failed, recording listener locally: %s", exc)
+
+        # FOR UPDATE cannot lock a row that does not exist yet: two first plays of a
+        # track both insert, and the loser retries against the winner's row.
+        for attempt in range(_INSERT_RETRIES):
+            try:
+                self._merge_local(keys, user_id)
+                return
+            except IntegrityError:
+                self.db.rollback()
+                if attempt == _INSERT_RETRIES - 1:
+                    raise
+
+    def _merge_local(self, keys: list[str], user_id: int) -> None:
+        rows = {
+            row.key: row
+            for row in self.db.query(ListenerSketch).filter(ListenerSketch.key.in_(keys)).with_for_update()
+        }
+        for key in keys:
+            row = rows.get(key)
+            hll = HyperLogLog.from_bytes(row.registers) if row else HyperLogLog()
+            hll.add([user_id])
+            if row:
+                row.registers = hll.to_bytes()
+            else:
+                self.db.add(ListenerSketch(key=key, registers=hll.to_bytes()))
+        self.db.commit()
+
+    def count_tracks(self, track_ids: list[int]) -> dict[int, int]:
+        return dict(zip(track_ids, self._count([track_key(t) for t in track_ids])))
+
+    def count_owner(self, owner_user_id: int) -> int:
+        return self._count([owner_key(owner_user_id)])[0]
+
+    def _count(self, keys: list[str]) -> list[int]:
+        if not keys:
+            return []
+        if self._redis:
+            try:
+                pipe = self._redis.pipeline(transaction=False)
+                for key in keys:
+                    pipe.pfcount(self._REDIS_PREFIX + key)
+                return [int(n) for n in pipe.execute()]
+            except RedisError as exc:
+                logger.warning("PFCOUNT failed, reading local sketches: %s", exc)
+
+        blobs = dict(self.db.query(ListenerSketch.key, ListenerSketch.registers).filter(ListenerSketch.key.in_(keys)))
+        return [HyperLogLog.from_bytes(blobs[key]).count() if key in blobs else 0 for key in keys]
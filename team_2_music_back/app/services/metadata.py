@@ -0,0 +1,246 @@
+"""Audio metadata extraction in a process pool.
+
+Mutagen parses only the header regions it needs (ID3v2/ID3v1, the first MPEG
+frames, FLAC metadata blocks, RIFF chunks) through a seekable file object, so
+an upload is never loaded into memory for this: local files are opened from
+the storage path, S3 objects are read with small ranged GETs
+(:class:`StorageReader`). Parsing runs in a ``ProcessPoolExecutor`` of
+``MUSIC_METADATA_WORKERS`` processes (0 = inline) with a
+``MUSIC_METADATA_TIMEOUT_SECONDS`` deadline, so a slow or malformed file
+neither holds the GIL of the API process nor stalls the request.
+"""
+
+from __future__ import annotations
+
+import io
+import logging
+import multiprocessing
+import threading
+from collections.abc import Callable
+from concurrent.futures import CancelledError, ProcessPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass, field
+from functools import lru_cache
+from pathlib import Path
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+_FRONT_COVER = 3  # ID3 / FLAC picture type "Cover (front)"
+_READ_AHEAD = 64 * 1024
+
+# Normalized tag name -> (ID3 frame, Vorbis comment, MP4 atom)
+_TAGS = {
+    "title": ("TIT2", "title", "\xa9nam"),
+    "artist": ("TPE1", "artist", "\xa9ART"),
+    "album": ("TALB", "album", "\xa9alb"),
+    "genre": ("TCON", "genre", "\xa9gen"),
+    "date": ("TDRC", "date", "\xa9day"),
+}
+
+
+@dataclass
+class AudioMetadata:
+    duration_seconds: float | None = None
+    bitrate: int | None = None
+    sample_rate: int | None = None
+    channels: int | None = None
+    tags: dict[str, str] = field(default_factory=dict)
+    cover: tuple[bytes, str] | None = None  # (image bytes, mime)
+
+
+class StorageReader(io.RawIOBase):
+    """Seekable read-only view of a storage object, backed by ranged reads."""
+
+    def __init__(self, fetch: Callable[[str, int, int], tuple[bytes, int]], storage_key: str) -> None:
+        self.fetch = fetch
+        self.storage_key = storage_key
+        self.size: int | None = None
+        self.position = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self.position
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_END:
+            if self.size is None:
+                self.size = self.fetch(self.storage_key, 0, 0)[1]
+            offset += self.size
+        elif whence == io.SEEK_CUR:
+            offset += self.position
+        self.position = max(0, offset)
+        return self.position
+
+    def readinto(self, buffer) -> int:
+        if not len(buffer) or (self.size is not None and self.position >= self.size):
+            return 0
+        data, self.size = self.fetch(self.storage_key, self.position, self.position + len(buffer) - 1)
+        buffer[: len(data)] = data
+        self.position += len(data)
+        return len(data)
+
+
+def _pick_picture(pictures) -> tuple[bytes, str] | None:
+    """Front cover if present, else the first picture with data."""
+
+    usable = [p for p in pictures if getattr(p, "data", None)]
+    if not usable:
+        return None
+    best = next((p for p in usable if getattr(p, "type", None) == _FRONT_COVER), usable[0])
+    return best.data, getattr(best, "mime", None) or "image/jpeg"
+
+
+def _cover(audio) -> tuple[bytes, str] | None:
+    tags = getattr(audio, "tags", None)
+    if tags is not None and hasattr(tags, "getall"):  # ID3 (MP3, WAV, AIFF)
+        found = _pick_picture(tags.getall("APIC"))
+        if found:
+            return found
+    found = _pick_picture(getattr(audio, "pictures", None) or [])  # FLAC
+    if found:
+        return found
+    if tags is not None and "covr" in tags:  # MP4
+        from mutagen.mp4 import MP4Cover
+
+        art = tags["covr"][0]
+        return bytes(art), "image/png" if art.imageformat == MP4Cover.FORMAT_PNG else "image/jpeg"
+    return None
+
+
+def _tags(audio) -> dict[str, str]:
+    tags = getattr(audio, "tags", None)
+    if tags is None:
+        return {}
+    found = {}
+    for name, keys in _TAGS.items():
+        for key in keys:
+            try:
+                value = tags[key] if key in tags else None
+            except (KeyError, ValueError, TypeError):
+                value = None
+            if value is None:
+                continue
+            if hasattr(value, "text"):  # ID3 frame
+                value = value.text
+            if isinstance(value, list):
+                value = value[0] if value else None
+            if value is not None and str(value).strip():
+                found[name] = str(value).strip()
+                break
+    return found
+
+
+def parse_metadata(fileobj) -> AudioMetadata | None:
+    """Parse one seekable file object in a single pass; ``None`` if it is not recognised audio."""
+
+    from mutagen import File as MutagenFile
+    from mutagen import MutagenError
+
+    try:
+        audio = MutagenFile(fileobj)
+    except (MutagenError, OSError, ValueError, EOFError):
+        return None
+    if audio is None:
+        return None
+    info = getattr(audio, "info", None)
+    return AudioMetadata(
+        duration_seconds=getattr(info, "length", None) or None,
+        bitrate=getattr(info, "bitrate", None) or None,
+        sample_rate=getattr(info, "sample_rate", None) or None,
+        channels=getattr(info, "channels", None) or None,
+        tags=_tags(audio),
+        cover=_cover(audio),
+    )
+
+
+def extract_metadata(location: str, is_storage_key: bool = False) -> AudioMetadata | None:
+    """Worker entry point: ``location`` is a local path or a storage key."""
+
+    try:
+        if is_storage_key:
+            from app.core.storage import StorageService
+
+            raw = StorageReader(StorageService().get_range, location)
+            with io.BufferedReader(raw, buffer_size=_READ_AHEAD) as fh:
+                return parse_metadata(fh)
+        with open(location, "rb") as fh:
+            return parse_metadata(fh)
+    except FileNotFoundError:  # e.g. a presigned upload that never arrived
+        return None
+
+
+class MetadataExtractor:
+    def __init__(self, workers: int | None = None, timeout: float | None = None) -> None:
+        self.workers = settings.metadata_workers if workers is None else workers
+        self.timeout = timeout or settings.metadata_timeout_seconds
+        self._pool: ProcessPoolExecutor | None = None
+        self._lock = threading.Lock()
+
+    def _executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._pool is None:
+                # spawn: forking a threaded server process is unsafe
+                self._pool = ProcessPoolExecutor(self.workers, mp_context=multiprocessing.get_context("spawn"))
+            return self._pool
+
+    def _recycle(self, pool: ProcessPoolExecutor | None = None) -> None:
+        """Replace the pool (only if it is still ``pool``) and kill its workers.
+
+        ``shutdown`` alone never stops a worker stuck inside a parse: it would keep
+        its CPU and memory until the file happens to finish. Futures of other
+        uploads still pending on the old pool fail with ``BrokenProcessPool`` or
+        ``CancelledError``; :meth:`extract` resubmits those once to the new pool.
+        """
+
+        with self._lock:
+            if pool is not None and pool is not self._pool:
+                return  # already replaced by a concurrent caller
+            pool, self._pool = self._pool, None
+        if pool is None:
+            return
+        processes = list((getattr(pool, "_processes", None) or {}).values())
+        pool.shutdown(wait=False, cancel_futures=True)
+        for process in processes:
+            process.terminate()
+        for process in processes:
+            process.join(timeout=1)
+            if process.is_alive():
+                process.kill()
+
+    def extract(self, location: str | Path, is_storage_key: bool = False) -> AudioMetadata | None:
+        """Parse metadata; returns ``None`` on unrecognised files, timeouts and worker crashes."""
+
+        if self.workers <= 0:
+            return extract_metadata(str(location), is_storage_key)
+        for attempt in range(2):
+            pool = self._executor()
+            try:
+                return pool.submit(extract_metadata, str(location), is_storage_key).result(timeout=self.timeout)
+            except FutureTimeoutError:
+                logger.warning("Metadata extraction timed out after %.1fs: %s", self.timeout, location)
+                self._recycle(pool)
+            except (BrokenProcessPool, CancelledError):
+                if attempt == 0 and pool is not self._pool:
+                    continue  # another upload's timeout recycled the pool under us
+                logger.warning("Metadata worker crashed on %s", location)
+                self._recycle(pool)
+            except Exception:
+                logger.exception("Metadata extraction failed: %s", location)
+            return None
+        return None
+
+    def shutdown(self) -> None:
+        self._recycle()
+
+
+@lru_cache
+def get_metadata_extractor() -> MetadataExtractor:
+    return MetadataExtractor()
@@ -0,0 +1,253 @@
+"""Playlist service with fractional-index ordering.
+
+Each ``PlaylistTrack`` carries a float ``order_key``. Appending uses
+``last + 1``, prepending ``first - 1`` and a move places the row at the midpoint
+of its new neighbours, so add/move write exactly one row. After ~40 bisections
+of the same gap the midpoint stops being representable; the playlist is then
+renumbered once (``1, 2, 3, ...``) and the operation retried.
+"""
+
+from __future__ import annotations
+
+import base64
+
+from fastapi import HTTPException, status
+from sqlalchemy import and_, func, or_
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session, selectinload
+
+from app.core.config import settings
+from app.models.playlist import Playlist, PlaylistTrack
+from app.models.track import Track
+from app.models.vote import Like
+
+_KEY_STEP = 1.0
+_MIN_GAP = 1e-9
+
+
+def encode_cursor(order_key: float, item_id: int) -> str:
+    return base64.urlsafe_b64encode(f"{order_key!r}:{item_id}".encode()).decode().rstrip("=")
+
+
+def decode_cursor(raw: str | None) -> tuple[float, int] | None:
+    if not raw:
+        return None
+    try:
+        padded = raw + "=" * (-len(raw) % 4)
+        key, item_id = base64.urlsafe_b64decode(padded.encode()).decode().split(":")
+        return float(key), int(item_id)
+    except (ValueError, UnicodeDecodeError):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="INVALID_CURSOR") from None
+
+
+def key_between(before: float | None, after: float | None) -> float | None:
+    """Order key strictly between two neighbours, or ``None`` if the gap is exhausted."""
+
+    if before is None and after is None:
+        return _KEY_STEP
+    if before is None:
+        return after - _KEY_STEP
+    if after is None:
+        return before + _KEY_STEP
+    middle = (before + after) / 2.0
+    if after - before < _MIN_GAP or not before < middle < after:
+        return None
+    return middle
+
+
+class PlaylistService:
+    """Create playlists and manage their ordered tracks."""
+
+    def __init__(self, db: Session) -> None:
+        self.db = db
+
+    def create_playlist(self, *, owner_user_id: int, title: str, description: str | None, is_public: bool) -> Playlist:
+        playlist = Playlist(
+            owner_user_id=owner_user_id, title=title, description=description, is_public=1 if is_public else 0
+        )
+        self.db.add(playlist)
+        self.db.commit()
+        self.db.refresh(playlist)
+        playlist.track_count = 0
+        return playlist
+
+    def list_playlists(self, owner_user_id: int) -> list[Playlist]:
+        playlists = (
+            self.db.query(Playlist)
+            .filter(Playlist.owner_user_id == owner_user_id)
+            .order_by(Playlist.created_at.desc(), Playlist.id.desc())
+            .all()
+        )
+        counts = self._track_counts([p.id for p in playlists])
+        for p in playlists:
+            p.track_count = counts.get(p.id, 0)
+        return playlists
+
+    def get_playlist(self, playlist_id: int, viewer_id: int) -> Playlist:
+        playlist = self.db.get(Playlist, playlist_id)
+        if not playlist or (not playlist.is_public and playlist.owner_user_id != viewer_id):
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="PLAYLIST_NOT_FOUND")
+        playlist.track_count = self._track_counts([playlist_id]).get(playlist_id, 0)
+        return playlist
+
+    def list_tracks(
+        self, playlist_id: int, viewer_id: int, cursor: str | None = None, limit: int = 50
+    ) -> tuple[list[PlaylistTrack], str | None]:
+        """One page of entries in order; track metadata is loaded in one batched query."""
+
+        self.get_playlist(playlist_id, viewer_id)
+        limit = min(max(limit, 1), 200)
+        query = (
+            self.db.query(PlaylistTrack)
+            .options(selectinload(PlaylistTrack.track).selectinload(Track.owner))
+            .filter(PlaylistTrack.playlist_id == playlist_id)
+        )
+        after = decode_cursor(cursor)
+        if after:
+            query = query.filter(
+                or_(
+                    PlaylistTrack.order_key > after[0],
+                    and_(PlaylistTrack.order_key == after[0], PlaylistTrack.id > after[1]),
+                )
+            )
+        entries = query.order_by(PlaylistTrack.order_key, PlaylistTrack.id).limit(limit + 1).all()
+
+        next_cursor = None
+        if len(entries) > limit:
+            entries = entries[:limit]
+            next_cursor = encode_cursor(entries[-1].order_key, entries[-1].id)
+
+        ids = [e.track_id for e in entries]
+        likes = dict(
+            self.db.query(Like.track_id, func.count(Like.id)).filter(Like.track_id.in_(ids)).group_by(Like.track_id).all()
+        )
+        for entry in entries:
+            entry.track.likes_count = likes.get(entry.track_id, 0)
+            entry.track.plays_count = 0
+        return entries, next_cursor
+
+    def add_track(
+        self, playlist_id: int, owner_user_id: int, track_id: int, after_track_id: int | None = None
+    ) -> PlaylistTrack:
+        """Append a track, or insert it right after ``after_track_id``."""
+
+        playlist = self._owned_playlist(playlist_id, owner_user_id)
+        if not self.db.get(Track, track_id):
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="TRACK_NOT_FOUND")
+        if self._track_counts([playlist.id]).get(playlist.id, 0) >= settings.playlist_max_tracks:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="PLAYLIST_FULL")
+
+        if after_track_id is None:
+            order_key = key_between(self._last_key(playlist_id), None)
+        else:
+            order_key = self._key_after(playlist_id, self._entry(playlist_id, after_track_id), exclude_id=None)
+
+        entry = PlaylistTrack(playlist_id=playlist_id, track_id=track_id, order_key=order_key)
+        self.db.add(entry)
+        try:
+            self.db.commit()
+        except IntegrityError:
+            self.db.rollback()
+            raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="TRACK_ALREADY_IN_PLAYLIST") from None
+        self.db.refresh(entry)
+        return entry
+
+    def move_track(
+        self, playlist_id: int, owner_user_id: int, track_id: int, after_track_id: int | None
+    ) -> PlaylistTrack:
+        """Move a track right after ``after_track_id`` (``None`` = to the front); writes one row."""
+
+        self._owned_playlist(playlist_id, owner_user_id)
+        entry = self._entry(playlist_id, track_id)
+        if after_track_id == track_id:
+            return entry
+
+        if after_track_id is None:
+            first = (
+                self.db.query(PlaylistTrack)
+                .filter(PlaylistTrack.playlist_id == playlist_id, PlaylistTrack.id != entry.id)
+                .order_by(PlaylistTrack.order_key, PlaylistTrack.id)
+                .first()
+            )
+            entry.order_key = key_between(None, first.order_key if first else None)
+        else:
+            entry.order_key = self._key_after(playlist_id, self._entry(playlist_id, after_track_id), exclude_id=entry.id)
+        self.db.commit()
+        self.db.refresh(entry)
+        return entry
+
+    def remove_track(self, playlist_id: int, owner_user_id: int, track_id: int) -> None:
+        self._owned_playlist(playlist_id, owner_user_id)
+        deleted = (
+            self.db.query(PlaylistTrack)
+            .filter(PlaylistTrack.playlist_id == playlist_id, PlaylistTrack.track_id == track_id)
+            .delete(synchronize_session=False)
+        )
+        if not deleted:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="PLAYLIST_TRACK_NOT_FOUND")
+        self.db.commit()
+
+    def rebalance(self, playlist_id: int) -> None:
+        """Renumber all keys to evenly spaced integers, keeping the current order."""
+
+        rows = (
+            self.db.query(PlaylistTrack.id)
+            .filter(PlaylistTrack.playlist_id == playlist_id)
+            .order_by(PlaylistTrack.order_key, PlaylistTrack.id)
+            .all()
+        )
+        self.db.bulk_update_mappings(
+            PlaylistTrack, [{"id": row_id, "order_key": (i + 1) * _KEY_STEP} for i, (row_id,) in enumerate(rows)]
+        )
+        self.db.flush()
+        self.db.expire_all()
+
+    def _key_after(self, playlist_id: int, anchor: PlaylistTrack, exclude_id: int | None) -> float:
+        for _ in range(2):
+            query = self.db.query(PlaylistTrack.order_key).filter(
+                PlaylistTrack.playlist_id == playlist_id,
+                or_(
+                    PlaylistTrack.order_key > anchor.order_key,
+                    and_(PlaylistTrack.order_key == anchor.order_key, PlaylistTrack.id > anchor.id),
+                ),
+            )
+            if exclude_id is not None:
+                query = query.filter(PlaylistTrack.id != exclude_id)
+            following = query.order_by(PlaylistTrack.order_key, PlaylistTrack.id).limit(1).scalar()
+            order_key = key_between(anchor.order_key, following)
+            if order_key is not None:
+                return order_key
+            # Gap exhausted (or duplicate keys from concurrent appends): renumber once.
+            self.rebalance(playlist_id)
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="PLAYLIST_REORDER_CONFLICT")
+
+    def _last_key(self, playlist_id: int) -> float | None:
+        return self.db.query(func.max(PlaylistTrack.order_key)).filter(PlaylistTrack.playlist_id == playlist_id).scalar()
+
+    def _entry(self, playlist_id: int, track_id: int) -> PlaylistTrack:
+        entry = (
+            self.db.query(PlaylistTrack)
+            .filter(PlaylistTrack.playlist_id == playlist_id, PlaylistTrack.track_id == track_id)
+            .first()
+        )
+        if not entry:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="PLAYLIST_TRACK_NOT_FOUND")
+        return entry
+
+    def _owned_playlist(self, playlist_id: int, owner_user_id: int) -> Playlist:
+        playlist = self.db.get(Playlist, playlist_id)
+        if not playlist:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="PLAYLIST_NOT_FOUND")
+        if playlist.owner_user_id != owner_user_id:
+            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="FORBIDDEN")
+        return playlist
+
+    def _track_counts(self, playlist_ids: list[int]) -> dict[int, int]:
+        if not playlist_ids:
+            return {}
+        return dict(
+            self.db.query(PlaylistTrack.playlist_id, func.count(PlaylistTrack.id))
+            .filter(PlaylistTrack.playlist_id.in_(playlist_ids))
+            .group_by(PlaylistTrack.playlist_id)
+            .all()
+        )
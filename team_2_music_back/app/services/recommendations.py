@@ -0,0 +1,293 @@
+"""Item-to-item ("listeners also liked") recommendations.
+
+Offline job: build a sparse user x track matrix from likes and play history,
+L2-normalize track columns and compute cosine top-K neighbors in row chunks
+(``chunk @ X``) spread over a process pool. Results are stored per track as
+packed arrays, so ``GET /tracks/{id}/similar`` is a primary-key lookup.
+
+Run with ``python -m app.services.recommendations [--full]``. Incremental runs
+rebuild the matrix but only recompute the rows whose cosine scores can have
+changed: tracks with new interactions since the previous run, plus every track
+sharing a listener with one of them (their similarity to it moved too).
+"""
+
+from __future__ import annotations
+
+import argparse
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+
+from fastapi import HTTPException, status
+from sqlalchemy import delete, func
+from sqlalchemy.orm import Session, selectinload
+
+from app.core.config import settings
+from app.core.lazy import lazy_import
+from app.db.session import SessionLocal
+from app.models.play_history import PlayHistory
+from app.models.ranking import RankingCheckpoint
+from app.models.recommendation import TrackNeighbors
+from app.models.track import Track
+from app.models.vote import Like
+
+np = lazy_import("numpy")
+sparse = lazy_import("scipy.sparse")
+logger = logging.getLogger(__name__)
+
+_LIKES_CHECKPOINT = "recommender:likes"
+_PLAYS_CHECKPOINT = "recommender:plays"
+
+
+@dataclass
+class InteractionMatrix:
+    """User x track matrix plus the id <-> column mappings."""
+
+    matrix: sparse.csr_matrix
+    user_ids: np.ndarray
+    track_ids: np.ndarray
+
+
+def build_interaction_matrix(
+    user_ids: np.ndarray, track_ids: np.ndarray, weights: np.ndarray
+) -> InteractionMatrix:
+    """Assemble a CSR matrix from (user, track, weight) triples; duplicates are summed."""
+
+    users, user_index = np.unique(user_ids, return_inverse=True)
+    tracks, track_index = np.unique(track_ids, return_inverse=True)
+    matrix = sparse.coo_matrix(
+        (weights.astype(np.float32), (user_index, track_index)), shape=(users.size, tracks.size)
+    ).tocsr()
+    matrix.sum_duplicates()
+    return InteractionMatrix(matrix=matrix, user_ids=users, track_ids=tracks)
+
+
+def normalized_item_matrix(matrix: sparse.csr_matrix) -> tuple[sparse.csr_matrix, sparse.csr_matrix]:
+    """Return (items x users, users x items) with unit-length item vectors."""
+
+    norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=0)).ravel())
+    norms[norms == 0] = 1.0
+    users_by_items = (matrix @ sparse.diags((1.0 / norms).astype(np.float32))).tocsr()
+    return users_by_items.T.tocsr(), users_by_items
+
+
+def _top_k_rows(
+    items: sparse.csr_matrix, users_by_items: sparse.csr_matrix, rows: np.ndarray, k: int
+) -> tuple[np.ndarray, np.ndarray]:
+    """Cosine top-K for the given item rows (-1 / 0.0 padded)."""
+
+    similarities = (items[rows] @ users_by_items).tocsr()
+    neighbors = np.full((rows.size, k), -1, dtype=np.int32)
+    scores = np.zeros((rows.size, k), dtype=np.float32)
+    for i, row in enumerate(rows):
+        start, end = similarities.indptr[i], similarities.indptr[i + 1]
+        cols = similarities.indices[start:end]
+        vals = similarities.data[start:end]
+        keep = cols != row
+        cols, vals = cols[keep], vals[keep]
+        if cols.size == 0:
+            continue
+        if cols.size > k:
+            part = np.argpartition(-vals, k - 1)[:k]
+            cols, vals = cols[part], vals[part]
+        order = np.argsort(-vals, kind="stable")
+        neighbors[i, : order.size] = cols[order]
+        scores[i, : order.size] = vals[order]
+    return neighbors, scores
+
+
+_WORKER_STATE: dict[str, sparse.csr_matrix] = {}
+
+
+def _init_worker(items: sparse.csr_matrix, users_by_items: sparse.csr_matrix) -> None:
+    _WORKER_STATE["items"] = items
+    _WORKER_STATE["users_by_items"] = users_by_items
+
+
+def _run_chunk(rows: np.ndarray, k: int) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    neighbors, scores = _top_k_rows(_WORKER_STATE["items"], _WORKER_STATE["users_by_items"], rows, k)
+    return rows, neighbors, scores
+
+
+def compute_neighbors(
+    matrix: sparse.csr_matrix,
+    k: int,
+    rows: np.ndarray | None = None,
+    chunk_size: int = 2048,
+    workers: int = 1,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Top-K cosine neighbors (column indices) for ``rows`` of the item space."""
+
+    items, users_by_items = normalized_item_matrix(matrix)
+    rows = np.arange(items.shape[0], dtype=np.int64) if rows is None else np.asarray(rows, dtype=np.int64)
+    chunks = [rows[i : i + chunk_size] for i in range(0, rows.size, chunk_size)]
+
+    if workers <= 1 or len(chunks) <= 1:
+        results = [(c, *_top_k_rows(items, users_by_items, c, k)) for c in chunks]
+    else:
+        with ProcessPoolExecutor(
+            max_workers=workers, initializer=_init_worker, initargs=(items, users_by_items)
+        ) as pool:
+            results = list(pool.map(_run_chunk, chunks, [k] * len(chunks)))
+
+    if not results:
+        return rows, np.empty((0, k), dtype=np.int32), np.empty((0, k), dtype=np.float32)
+    return (
+        np.concatenate([r[0] for r in results]),
+        np.concatenate([r[1] for r in results]),
+        np.concatenate([r[2] for r in results]),
+    )
+
+
+def affected_rows(matrix: sparse.csr_matrix, touched: np.ndarray) -> np.ndarray:
+    """Item columns co-interacted with ``touched`` (a changed item vector changes those cosines)."""
+
+    if touched.size == 0:
+        return touched
+    users = np.unique(matrix[:, touched].nonzero()[0])
+    return np.union1d(touched, matrix[users].indices).astype(np.int64)
+
+
+class RecommendationService:
+    """Build and serve precomputed item-to-item neighbors."""
+
+    def __init__(self, db: Session) -> None:
+        self.db = db
+
+    def build(self, full: bool = False, workers: int | None = None) -> int:
+        """Recompute neighbors; returns the number of tracks written."""
+
+        last_like = self._checkpoint(_LIKES_CHECKPOINT)
+        last_play = self._checkpoint(_PLAYS_CHECKPOINT)
+        max_like = self.db.query(func.max(Like.id)).scalar() or 0
+        max_play = self.db.query(func.max(PlayHistory.id)).scalar() or 0
+
+        data = self._load_interactions()
+        if data.track_ids.size == 0:
+            return 0
+
+        rows = None
+        if not full and (last_like or last_play):
+            touched = {
+                t
+                for (t,) in self.db.query(Like.track_id).filter(Like.id > last_like, Like.id <= max_like).distinct()
+            } | {
+                t
+                for (t,) in self.db.query(PlayHistory.track_id)
+                .filter(PlayHistory.id > last_play, PlayHistory.id <= max_play)
+                .distinct()
+            }
+            rows = affected_rows(data.matrix, np.flatnonzero(np.isin(data.track_ids, np.fromiter(touched, dtype=np.int64))))
+            if rows.size == 0:
+                return 0
+
+        workers = workers if workers is not None else (settings.recommender_workers or os.cpu_count() or 1)
+        row_idx, neighbors, scores = compute_neighbors(
+            data.matrix,
+            k=settings.recommender_neighbors,
+            rows=rows,
+            chunk_size=settings.recommender_chunk_size,
+            workers=workers,
+        )
+        self._store(data.track_ids, row_idx, neighbors, scores, replace_all=rows is None)
+        self._set_checkpoint(_LIKES_CHECKPOINT, max_like)
+        self._set_checkpoint(_PLAYS_CHECKPOINT, max_play)
+        self.db.commit()
+        return int(row_idx.size)
+
+    def similar(self, track_id: int, limit: int = 20) -> list[Track]:
+        """Return stored neighbors of a track with ``similarity`` attached."""
+
+        row = self.db.get(TrackNeighbors, track_id)
+        if row is None:
+            if self.db.get(Track, track_id) is None:
+                raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="TRACK_NOT_FOUND")
+            return []
+        limit = min(max(limit, 1), settings.recommender_neighbors)
+        ids = np.frombuffer(row.neighbor_ids, dtype="<i4")[:limit].tolist()
+        scores = np.frombuffer(row.scores, dtype="<f4")[:limit].tolist()
+
+        tracks = {t.id: t for t in self.db.query(Track).options(selectinload(Track.owner)).filter(Track.id.in_(ids))}
+        result = []
+        for neighbor_id, score in zip(ids, scores):
+            track = tracks.get(neighbor_id)
+            if track is not None:
+                track.similarity = score
+                result.append(track)
+        return result
+
+    def _load_interactions(self) -> InteractionMatrix:
+        plays = self.db.query(PlayHistory.user_id, PlayHistory.track_id, func.count(PlayHistory.id)).group_by(
+            PlayHistory.user_id, PlayHistory.track_id
+        )
+        likes = self.db.query(Like.user_id, Like.track_id)
+
+        play_rows = np.array(plays.all(), dtype=np.int64).reshape(-1, 3)
+        like_rows = np.array(likes.all(), dtype=np.int64).reshape(-1, 2)
+        return build_interaction_matrix(
+            user_ids=np.concatenate([play_rows[:, 0], like_rows[:, 0]]),
+            track_ids=np.concatenate([play_rows[:, 1], like_rows[:, 1]]),
+            weights=np.concatenate(
+                [
+                    np.log1p(play_rows[:, 2]).astype(np.float32),
+                    np.full(like_rows.shape[0], settings.recommender_like_weight, dtype=np.float32),
+                ]
+            ),
+        )
+
+    def _store(
+        self,
+        track_ids: np.ndarray,
+        row_idx: np.ndarray,
+        neighbors: np.ndarray,
+        scores: np.ndarray,
+        replace_all: bool,
+    ) -> None:
+        owners = track_ids[row_idx].tolist()
+        if replace_all:
+            self.db.execute(delete(TrackNeighbors))
+        else:
+            self.db.execute(delete(TrackNeighbors).where(TrackNeighbors.track_id.in_(owners)))
+
+        records = []
+        for owner, cols, vals in zip(owners, neighbors, scores):
+            valid = cols >= 0
+            records.append(
+                {
+                    "track_id": owner,
+                    "neighbor_ids": track_ids[cols[valid]].astype("<i4").tobytes(),
+                    "scores": vals[valid].astype("<f4").tobytes(),
+                }
+            )
+        if records:
+            self.db.bulk_insert_mappings(TrackNeighbors, records)
+
+    def _checkpoint(self, name: str) -> int:
+        value = self.db.query(RankingCheckpoint.value).filter(RankingCheckpoint.name == name).scalar()
+        return int(value or 0)
+
+    def _set_checkpoint(self, name: str, value: int) -> None:
+        row = self.db.get(RankingCheckpoint, name)
+        if row is None:
+            self.db.add(RankingCheckpoint(name=name, value=value))
+        else:
+            row.value = value
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Rebuild item-to-item track neighbors.")
+    parser.add_argument("--full", action="store_true", help="recompute every track, not only touched ones")
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        written = RecommendationService(db).build(full=args.full, workers=args.workers)
+    finally:
+        db.close()
+    print(f"updated neighbors for {written} tracks")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,49 +1,137 @@
 """Track-related service functions."""
 
+import os
 from datetime import datetime
-from io import BytesIO
+from pathlib import PurePosixPath, PureWindowsPath
 from uuid import uuid4
 
-from sqlalchemy.orm import Session
-from mutagen import File as MutagenFile
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session, selectinload
 
 from app.models.track import Track
 from app.models.upload_session import UploadSession
-from app.schemas import UploadFinalizeRequest, UploadInitiateRequest
+from app.models.user_profile import UserProfile
+from app.models.vote import Like
+from app.schemas import TrackRead, UploadFinalizeRequest, UploadInitiateRequest
+from app.core.config import settings
+from app.core.metrics import UPLOAD_BYTES
+from app.core.sniff import AUDIO_TYPES, IMAGE_TYPES, SNIFF_BYTES, check_media_type
+from app.core.tracing import traced
+from app.core.cache import TRACK_LIST_TAG, ResponseCache, get_response_cache, track_tag
 from app.core.storage import StorageService, PresignedUpload
+from app.services.chunked_uploads import ChunkStore
+from app.services.listeners import ListenerStatsService
+from app.services.metadata import AudioMetadata, get_metadata_extractor
 from fastapi import HTTPException, status
 from fastapi import UploadFile
 
 
+def parse_fields(raw: str | None) -> list[str] | None:
+    """Validate a ``fields=`` parameter against ``TrackRead``; ``id`` is always included."""
+
+    if not raw:
+        return None
+    fields = ["id"] + [f.strip() for f in raw.split(",") if f.strip() and f.strip() != "id"]
+    unknown = [f for f in fields if f not in TrackRead.model_fields]
+    if unknown:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="UNKNOWN_FIELD")
+    return list(dict.fromkeys(fields))
+
+
 class TrackService:
     """Encapsulate track and upload session operations."""
 
-    def __init__(self, db: Session, storage: StorageService) -> None:
+    def __init__(self, db: Session, storage: StorageService, cache: ResponseCache | None = None) -> None:
         self.db = db
         self.storage = storage
+        self.cache = cache or get_response_cache()
         self.max_file_size = 50 * 1024 * 1024  # 50MB for local dev
         self.max_cover_size = 10 * 1024 * 1024  # 10MB for cover image
-        self.allowed_content_types = {"audio/mpeg", "audio/mp3", "audio/wav", "audio/flac"}
-        self.allowed_image_types = {"image/jpeg", "image/png", "image/webp"}
+        self.allowed_content_types = set(AUDIO_TYPES)
+        self.allowed_image_types = set(IMAGE_TYPES)
 
     def list_tracks(self, limit: int = 50, offset: int = 0) -> list[Track]:
         limit = min(max(limit, 1), 100)
         offset = max(offset, 0)
-        tracks = self.db.query(Track).offset(offset).limit(limit).all()
+        tracks = self.db.query(Track).options(selectinload(Track.owner)).offset(offset).limit(limit).all()
+        ids = [t.id for t in tracks]
+        likes = self._like_counts(ids)
+        listeners = ListenerStatsService(self.db).count_tracks(ids)
         # attach counts
         for t in tracks:
-            t.likes_count = len(t.likes) if hasattr(t, "likes") else 0
+            t.likes_count = likes.get(t.id, 0)
             t.plays_count = 0  # not tracked yet
+            t.unique_listeners = listeners.get(t.id, 0)
         return tracks
 
+    def list_track_fields(self, fields: list[str], limit: int = 50, offset: int = 0) -> list[dict]:
+        """List tracks as plain dicts holding only ``fields`` (sparse fieldset).
+
+        Only the needed columns are selected; owner name and counts are fetched
+        only when requested. No ORM or Pydantic objects are built per row.
+        """
+
+        limit = min(max(limit, 1), 100)
+        offset = max(offset, 0)
+        columns = Track.__table__.c
+        query = select(*(columns[f] for f in fields if f in columns))
+        if "owner_display_name" in fields:
+            query = query.add_columns(UserProfile.display_name.label("owner_display_name")).outerjoin(
+                UserProfile, UserProfile.id == Track.owner_user_id
+            )
+        rows = [dict(row) for row in self.db.execute(query.offset(offset).limit(limit)).mappings()]
+
+        ids = [row["id"] for row in rows]
+        if "likes_count" in fields:
+            likes = self._like_counts(ids)
+            for row in rows:
+                row["likes_count"] = likes.get(row["id"], 0)
+        if "plays_count" in fields:
+            for row in rows:
+                row["plays_count"] = 0
+        if "unique_listeners" in fields:
+            listeners = ListenerStatsService(self.db).count_tracks(ids)
+            for row in rows:
+                row["unique_listeners"] = listeners.get(row["id"], 0)
+        return rows
+
     def get_track(self, track_id: int) -> Track:
         track = self.db.get(Track, track_id)
         if not track:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="TRACK_NOT_FOUND")
-        track.likes_count = len(track.likes) if hasattr(track, "likes") else 0
+        track.likes_count = self._like_counts([track_id]).get(track_id, 0)
         track.plays_count = 0
+        track.unique_listeners = ListenerStatsService(self.db).count_tracks([track_id])[track_id]
         return track
 
+    def _like_counts(self, track_ids: list[int]) -> dict[int, int]:
+        if not track_ids:
+            return {}
+        return dict(
+            self.db.query(Like.track_id, func.count(Like.id))
+            .filter(Like.track_id.in_(track_ids))
+            .group_by(Like.track_id)
+            .all()
+        )
+
+    def get_tracks(self, track_ids: list[int]) -> dict[int, Track]:
+        """Load several tracks with one IN query, eager owners and aggregated counts."""
+
+        if not track_ids:
+            return {}
+        tracks = {
+            t.id: t
+            for t in self.db.query(Track).options(selectinload(Track.owner)).filter(Track.id.in_(track_ids)).all()
+        }
+        ids = list(tracks)
+        likes = self._like_counts(ids)
+        listeners = ListenerStatsService(self.db).count_tracks(ids)
+        for track_id, track in tracks.items():
+            track.likes_count = likes.get(track_id, 0)
+            track.plays_count = 0
+            track.unique_listeners = listeners.get(track_id, 0)
+        return tracks
+
     def create_track(
         self,
         *,
@@ -70,6 +158,7 @@ class TrackService:
         self.db.add(track)
         self.db.commit()
         self.db.refresh(track)
+        self._invalidate_cache()
         return track
 
     def upload_direct(
@@ -87,37 +176,39 @@ class TrackService:
     ) -> Track:
         upload_id = uuid4().hex
         storage_key = f"uploads/{owner_user_id}/{upload_id}/{file.filename}"
-        file_bytes = file.file.read()
-
-        if len(file_bytes) > self.max_file_size:
-            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="FILE_TOO_LARGE")
-        if file.content_type and file.content_type not in self.allowed_content_types:
-            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="UNSUPPORTED_MEDIA_TYPE")
+        file_bytes, audio_type = self._read_upload(
+            file, self.max_file_size, self.allowed_content_types, kind="audio", too_large="FILE_TOO_LARGE"
+        )
+        cover = None
+        if cover_file:
+            cover = self._read_upload(
+                cover_file,
+                self.max_cover_size,
+                self.allowed_image_types,
+                kind="cover",
+                too_large="COVER_TOO_LARGE",
+                prefix="COVER_",
+            )
 
-        self.storage.save_file(storage_key=storage_key, file_bytes=file_bytes, content_type=file.content_type)
+        self.storage.save_file(storage_key=storage_key, file_bytes=file_bytes, content_type=audio_type)
+        metadata = self._extract_metadata(storage_key)
 
         cover_storage_key = None
-        if cover_file:
-            cover_bytes = cover_file.file.read()
-            if len(cover_bytes) > self.max_cover_size:
-                raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="COVER_TOO_LARGE")
-            if cover_file.content_type and cover_file.content_type not in self.allowed_image_types:
-                raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="UNSUPPORTED_COVER_TYPE")
+        if cover:
+            cover_bytes, cover_type = cover
             cover_storage_key = f"uploads/{owner_user_id}/{upload_id}/cover_{cover_file.filename}"
-            self.storage.save_file(storage_key=cover_storage_key, file_bytes=cover_bytes, content_type=cover_file.content_type)
-        else:
-            extracted = self._extract_embedded_cover(file_bytes)
-            if extracted:
-                cover_bytes, cover_mime = extracted
-                if len(cover_bytes) <= self.max_cover_size:
-                    # build filename from mime
-                    ext = ".jpg"
-                    if cover_mime == "image/png":
-                        ext = ".png"
-                    elif cover_mime == "image/webp":
-                        ext = ".webp"
-                    cover_storage_key = f"uploads/{owner_user_id}/{upload_id}/cover_extracted{ext}"
-                    self.storage.save_file(storage_key=cover_storage_key, file_bytes=cover_bytes, content_type=cover_mime)
+            self.storage.save_file(storage_key=cover_storage_key, file_bytes=cover_bytes, content_type=cover_type)
+        elif metadata and metadata.cover:
+            cover_bytes, cover_mime = metadata.cover
+            if len(cover_bytes) <= self.max_cover_size:
+                # build filename from mime
+                ext = ".jpg"
+                if cover_mime == "image/png":
+                    ext = ".png"
+                elif cover_mime == "image/webp":
+                    ext = ".webp"
+                cover_storage_key = f"uploads/{owner_user_id}/{upload_id}/cover_extracted{ext}"
+                self.storage.save_file(storage_key=cover_storage_key, file_bytes=cover_bytes, content_type=cover_mime)
 
         track = Track(
             title=title,
@@ -128,23 +219,33 @@ class TrackService:
             tags=tags,
             ai_provider=ai_provider,
             ai_model=ai_model,
+            duration_seconds=_duration(metadata),
             owner_user_id=owner_user_id,
             audio_url=storage_key,
+            audio_content_type=audio_type,
         )
         self.db.add(track)
         self.db.commit()
         self.db.refresh(track)
+        self._invalidate_cache()
         return track
 
     def initiate_upload(self, payload: UploadInitiateRequest, owner_user_id: int) -> PresignedUpload:
+        # Chunked uploads are only bounded by the declared size; hold it to the direct-upload cap.
+        if payload.file_size > self.max_file_size:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="FILE_TOO_LARGE")
         upload_id = uuid4().hex
-        storage_key = f"uploads/{owner_user_id}/{upload_id}/{payload.filename}"
+        filename = _safe_filename(payload.filename)
+        storage_key = f"uploads/{owner_user_id}/{upload_id}/{filename}"
         presigned = self.storage.presign_put(storage_key=storage_key)
+        if self.storage.backend == "local":
+            # The /uploads mount is read-only; local uploads go through the chunk endpoint.
+            presigned.url = f"{settings.api_prefix}/tracks/upload/{upload_id}/chunks"
 
         session = UploadSession(
             upload_id=upload_id,
             owner_user_id=owner_user_id,
-            filename=payload.filename,
+            filename=filename,
             content_type=payload.content_type,
             file_size=payload.file_size,
             storage_key=storage_key,
@@ -173,6 +274,13 @@ class TrackService:
             self.db.commit()
             raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="UPLOAD_EXPIRED")
 
+        chunks = ChunkStore()
+        if self.storage.backend == "local" and chunks.parts(session.upload_id):
+            chunks.assemble(
+                session.upload_id, session.file_size, self.storage.base_path / session.storage_key, self.storage.base_path
+            )
+            UPLOAD_BYTES.labels(kind="assembled").inc(session.file_size)
+        audio_type = self._sniff_stored(session.storage_key, session.content_type)
         session.status = "completed"
 
         track = Track(
@@ -180,21 +288,28 @@ class TrackService:
             description=payload.description,
             cover_url=payload.cover_url,
             status="processing",
+            duration_seconds=_duration(self._extract_metadata(session.storage_key)),
             owner_user_id=owner_user_id,
             audio_url=session.storage_key,
+            audio_content_type=audio_type,
         )
         self.db.add(track)
         self.db.commit()
         self.db.refresh(track)
+        self._invalidate_cache()
         return track
 
     def cleanup_expired_uploads(self, owner_user_id: int) -> None:
         now = datetime.utcnow()
-        self.db.query(UploadSession).filter(
+        expired = self.db.query(UploadSession).filter(
             UploadSession.owner_user_id == owner_user_id,
             UploadSession.status == "initiated",
             UploadSession.expires_at < now,
-        ).delete(synchronize_session=False)
+        )
+        chunks = ChunkStore()
+        for (upload_id,) in expired.with_entities(UploadSession.upload_id):
+            chunks.discard(upload_id)
+        expired.delete(synchronize_session=False)
         self.db.commit()
 
     def update_track(
@@ -231,6 +346,7 @@ class TrackService:
 
         self.db.commit()
         self.db.refresh(track)
+        self._invalidate_cache(track_id)
         return track
 
     def delete_track(self, track_id: int, owner_user_id: int) -> None:
@@ -251,21 +367,20 @@ class TrackService:
 
         self.db.delete(track)
         self.db.commit()
+        self._invalidate_cache(track_id)
 
     def replace_audio(self, track_id: int, owner_user_id: int, file: UploadFile) -> Track:
         track = self.get_track(track_id)
         if track.owner_user_id != owner_user_id:
             raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="FORBIDDEN")
 
-        file_bytes = file.file.read()
-        if len(file_bytes) > self.max_file_size:
-            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="FILE_TOO_LARGE")
-        if file.content_type and file.content_type not in self.allowed_content_types:
-            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="UNSUPPORTED_MEDIA_TYPE")
+        file_bytes, audio_type = self._read_upload(
+            file, self.max_file_size, self.allowed_content_types, kind="audio", too_large="FILE_TOO_LARGE"
+        )
 
         upload_id = uuid4().hex
         storage_key = f"uploads/{owner_user_id}/{upload_id}/{file.filename}"
-        self.storage.save_file(storage_key=storage_key, file_bytes=file_bytes)
+        self.storage.save_file(storage_key=storage_key, file_bytes=file_bytes, content_type=audio_type)
 
         if track.audio_url:
             from pathlib import Path
@@ -278,35 +393,66 @@ class TrackService:
                 pass
 
         track.audio_url = storage_key
+        track.audio_content_type = audio_type
+        track.duration_seconds = _duration(self._extract_metadata(storage_key))
         track.status = "ready"
         self.db.commit()
         self.db.refresh(track)
+        self._invalidate_cache(track_id)
         return track
 
-    def _extract_embedded_cover(self, file_bytes: bytes) -> tuple[bytes, str] | None:
-        """Extract embedded cover art from audio bytes (MP3/FLAC/etc)."""
+    def _invalidate_cache(self, track_id: int | None = None) -> None:
+        """Drop cached detail/list responses affected by a track write."""
+
+        tags = [TRACK_LIST_TAG]
+        if track_id is not None:
+            tags.append(track_tag(track_id))
+        self.cache.invalidate_tags(*tags)
+
+    def _read_upload(
+        self, file: UploadFile, max_size: int, allowed: set[str], *, kind: str, too_large: str, prefix: str = ""
+    ) -> tuple[bytes, str]:
+        """Check size and sniffed type from the head of ``file`` before reading the rest of it."""
+
+        file.file.seek(0, os.SEEK_END)
+        size = file.file.tell()
+        file.file.seek(0)
+        UPLOAD_BYTES.labels(kind=kind).inc(size)
+        if size > max_size:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=too_large)
+        detected = check_media_type(file.file.read(SNIFF_BYTES), file.content_type, allowed, prefix=prefix)
+        file.file.seek(0)
+        return file.file.read(), detected
+
+    def _sniff_stored(self, storage_key: str, declared: str | None) -> str | None:
+        """Sniff an object uploaded out of band; ``None`` if it has not arrived (yet)."""
 
         try:
-            audio = MutagenFile(BytesIO(file_bytes))
-        except Exception:
-            return None
-        if not audio:
+            head, _ = self.storage.get_range(storage_key, 0, SNIFF_BYTES - 1)
+        except FileNotFoundError:
             return None
+        return check_media_type(head, declared, self.allowed_content_types)
+
+    @traced("upload.extract_metadata")
+    def _extract_metadata(self, storage_key: str) -> AudioMetadata | None:
+        """Header-only metadata parse in the extraction process pool."""
+
+        extractor = get_metadata_extractor()
+        if self.storage.backend == "local":
+            return extractor.extract(self.storage.base_path / storage_key)
+        return extractor.extract(storage_key, is_storage_key=True)
+
+
+def _safe_filename(filename: str) -> str:
+    """Reduce a client-supplied name to its last path component (no traversal)."""
+
+    name = PureWindowsPath(PurePosixPath(filename).name).name.strip()
+    if name in ("", ".", ".."):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="INVALID_FILENAME")
+    return name
 
-        # ID3 / MP3: look for APIC frames
-        if getattr(audio, "tags", None):
-            for frame in audio.tags.values():
-                data = getattr(frame, "data", None)
-                mime = getattr(frame, "mime", None)
-                if data and mime:
-                    return data, mime
-
-        # FLAC/others: pictures attribute
-        pictures = getattr(audio, "pictures", [])
-        for pic in pictures:
-            data = getattr(pic, "data", None)
-            mime = getattr(pic, "mime", None)
-            if data and mime:
-                return data, mime
 
+def _duration(metadata: AudioMetadata | None) -> int | None:
+    if metadata is None or metadata.duration_seconds is None:
         return None
+    return round(metadata.duration_seconds)
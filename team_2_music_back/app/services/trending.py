@@ -0,0 +1,292 @@
+"""Time-decayed trending leaderboard.
+
+Scores use forward decay: an event at time ``t`` adds ``w * 2 ** ((t - epoch) / half_life)``.
+Ordering by the accumulated value equals ordering by the classic decayed score
+``sum(w * 2 ** (-(now - t) / half_life))`` at any ``now``, so the background job
+only ever adds the contributions of new events — no full recomputation. The
+epoch is rebased (all scores rescaled once) before the exponent gets large.
+"""
+
+from __future__ import annotations
+
+import logging
+from collections.abc import Sequence
+from datetime import datetime, timedelta
+
+from redis import Redis  # type: ignore[import]
+from sqlalchemy import func, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session, selectinload
+
+from app.core.config import settings
+from app.core.lazy import lazy_import
+from app.core.redis import get_redis
+from app.db.session import SessionLocal
+from app.models.comment import Comment
+from app.models.play_history import PlayHistory
+from app.models.ranking import RankingCheckpoint, TrendingScore
+from app.models.track import Track
+from app.models.vote import Like
+
+np = lazy_import("numpy")
+logger = logging.getLogger(__name__)
+
+ALL_GENRES = "all"
+EPOCH_CHECKPOINT = "trending:epoch"
+_BATCH_SIZE = 5000
+_MAX_EXPONENT = 700.0  # 2**700 ~ 5e210, far below float64 overflow
+
+
+def normalize_genre(genre: str | None) -> str | None:
+    value = (genre or "").strip().lower()
+    return value or None
+
+
+def to_epoch_seconds(values: Sequence[datetime]) -> np.ndarray:
+    """Convert naive UTC datetimes to float seconds in one vectorized pass."""
+
+    return np.array(values, dtype="datetime64[us]").astype(np.int64) / 1_000_000.0
+
+
+def decayed_contributions(timestamps: np.ndarray, weight: float, epoch: float, half_life_seconds: float) -> np.ndarray:
+    """Forward-decayed contribution of each event relative to ``epoch``."""
+
+    return weight * np.exp2((timestamps - epoch) / half_life_seconds)
+
+
+def aggregate_by_track(track_ids: np.ndarray, contributions: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Sum contributions per track id."""
+
+    unique_ids, inverse = np.unique(track_ids, return_inverse=True)
+    return unique_ids, np.bincount(inverse, weights=contributions, minlength=len(unique_ids))
+
+
+class SqlLeaderboard:
+    """Leaderboard kept in the ``trending_scores`` snapshot table."""
+
+    def __init__(self, db: Session) -> None:
+        self.db = db
+
+    def increment(self, track_ids: np.ndarray, deltas: np.ndarray, genres: dict[int, str | None]) -> None:
+        ids = [int(i) for i in track_ids]
+        existing = {row.track_id: row for row in self.db.query(TrendingScore).filter(TrendingScore.track_id.in_(ids))}
+        for track_id, delta in zip(ids, deltas.tolist()):
+            row = existing.get(track_id)
+            if row is None:
+                self.db.add(TrendingScore(track_id=track_id, genre=genres.get(track_id), score=delta))
+            else:
+                row.score += delta
+                row.genre = genres.get(track_id)
+
+    def top(self, genre: str | None, limit: int) -> list[tuple[int, float]]:
+        query = self.db.query(TrendingScore.track_id, TrendingScore.score)
+        if genre:
+            query = query.filter(TrendingScore.genre == genre)
+        return [(row.track_id, row.score) for row in query.order_by(TrendingScore.score.desc()).limit(limit)]
+
+    def rescale(self, factor: float) -> None:
+        self.db.execute(update(TrendingScore).values(score=TrendingScore.score * factor))
+
+
+class RedisLeaderboard:
+    """Leaderboard kept in Redis sorted sets (one per genre plus ``all``)."""
+
+    _KEY_PREFIX = "trending:z:"
+
+    def __init__(self, redis_client: Redis) -> None:
+        self._redis = redis_client
+
+    def _key(self, genre: str | None) -> str:
+        return self._KEY_PREFIX + (genre or ALL_GENRES)
+
+    def increment(self, track_ids: np.ndarray, deltas: np.ndarray, genres: dict[int, str | None]) -> None:
+        pipe = self._redis.pipeline(transaction=False)
+        touched = {self._key(None)}
+        for track_id, delta in zip(track_ids.tolist(), deltas.tolist()):
+            pipe.zincrby(self._key(None), delta, track_id)
+            genre = genres.get(track_id)
+            if genre:
+                pipe.zincrby(self._key(genre), delta, track_id)
+                touched.add(self._key(genre))
+        for key in touched:
+            pipe.zremrangebyrank(key, 0, -(settings.trending_max_tracked + 1))
+        pipe.execute()
+
+    def top(self, genre: str | None, limit: int) -> list[tuple[int, float]]:
+        rows = self._redis.zrevrange(self._key(genre), 0, limit - 1, withscores=True)
+        return [(int(member), float(score)) for member, score in rows]
+
+    def rescale(self, factor: float) -> None:
+        for key in self._redis.scan_iter(match=self._KEY_PREFIX + "*"):
+            self._redis.zunionstore(key, {key: factor})
+
+
+class TrendingService:
+    """Incrementally maintain and serve per-genre trending leaderboards."""
+
+    def __init__(self, db: Session, store: SqlLeaderboard | RedisLeaderboard | None = None) -> None:
+        self.db = db
+        if store is None:
+            redis_client = get_redis()
+            store = RedisLeaderboard(redis_client) if redis_client is not None else SqlLeaderboard(db)
+        self.store = store
+        self.half_life_seconds = settings.trending_half_life_hours * 3600.0
+        self._sources = (
+            ("trending:plays", PlayHistory, PlayHistory.played_at, settings.trending_play_weight),
+            ("trending:likes", Like, Like.created_at, settings.trending_like_weight),
+            ("trending:comments", Comment, Comment.created_at, settings.trending_comment_weight),
+        )
+
+    def refresh(self, now: datetime | None = None) -> int:
+        """Fold events recorded since the last run into the leaderboards."""
+
+        now = now or datetime.utcnow()
+        now_ts = float(to_epoch_seconds([now])[0])
+        epoch = self._current_epoch(now_ts)
+        horizon_ts = float(to_epoch_seconds([now - timedelta(days=settings.trending_window_days)])[0])
+        settled_ts = now_ts - settings.trending_settle_seconds
+
+        processed = 0
+        for name, model, ts_column, weight in self._sources:
+            while True:
+                count = self._consume(name, model, ts_column, weight, epoch, horizon_ts, settled_ts)
+                processed += count
+                if count < _BATCH_SIZE:
+                    break
+        return processed
+
+    def top(self, genre: str | None = None, limit: int = 20, now: datetime | None = None) -> list[Track]:
+        """Return the top tracks for a genre with ``trending_score`` attached."""
+
+        limit = min(max(limit, 1), settings.trending_top_n)
+        entries = self.store.top(normalize_genre(genre), limit)
+        if not entries:
+            return []
+
+        now_ts = float(to_epoch_seconds([now or datetime.utcnow()])[0])
+        scale = 2.0 ** ((self._read_checkpoint(EPOCH_CHECKPOINT, default=now_ts) - now_ts) / self.half_life_seconds)
+
+        ids = [track_id for track_id, _ in entries]
+        tracks = {
+            t.id: t
+            for t in self.db.query(Track).options(selectinload(Track.owner)).filter(Track.id.in_(ids)).all()
+        }
+        likes = dict(
+            self.db.query(Like.track_id, func.count(Like.id)).filter(Like.track_id.in_(ids)).group_by(Like.track_id).all()
+        )
+
+        result = []
+        for track_id, raw_score in entries:
+            track = tracks.get(track_id)
+            if track is None:
+                continue
+            track.likes_count = likes.get(track_id, 0)
+            track.plays_count = 0
+            track.trending_score = raw_score * scale
+            result.append(track)
+        return result
+
+    def _consume(
+        self, name: str, model, ts_column, weight: float, epoch: float, horizon_ts: float, settled_ts: float
+    ) -> int:
+        last_id = self._read_checkpoint(name, default=None)
+        if last_id is None:
+            # Create the watermark up front so claiming a batch is always a plain
+            # UPDATE that rolls back with it (SQLite commits a released SAVEPOINT).
+            self._claim(name, None, 0)
+            self.db.commit()
+            last_id = 0
+        last_id = int(last_id)
+        rows = (
+            self.db.query(model.id, model.track_id, ts_column, Track.genre)
+            .join(Track, Track.id == model.track_id)
+            .filter(model.id > last_id)
+            .order_by(model.id)
+            .limit(_BATCH_SIZE)
+            .all()
+        )
+        if not rows:
+            return 0
+        # Ids are assigned at insert, not commit: a lower id may still be in flight
+        # behind the rows we see. Never move the watermark past a row younger than
+        # the settle window, so such an insert has committed before it is passed.
+        timestamps = to_epoch_seconds([row[2] for row in rows])
+        unsettled = np.flatnonzero(timestamps > settled_ts)
+        if unsettled.size:
+            rows, timestamps = rows[: unsettled[0]], timestamps[: unsettled[0]]
+            if not rows:
+                self.db.rollback()
+                return 0
+        if not self._claim(name, last_id, rows[-1][0]):
+            # Another worker consumed this window first.
+            self.db.rollback()
+            return 0
+
+        track_ids = np.fromiter((row[1] for row in rows), dtype=np.int64, count=len(rows))
+        recent = timestamps >= horizon_ts
+        genres = {row[1]: normalize_genre(row[3]) for row in rows}
+
+        if recent.any():
+            contributions = decayed_contributions(timestamps[recent], weight, epoch, self.half_life_seconds)
+            unique_ids, deltas = aggregate_by_track(track_ids[recent], contributions)
+            # The claimed checkpoint commits only after the scores are written: a
+            # failed Redis write rolls the claim back and the batch is retried.
+            try:
+                self.store.increment(unique_ids, deltas, genres)
+            except Exception as exc:  # noqa: BLE001
+                self.db.rollback()
+                logger.warning("Trending increment for %s failed, will retry: %s", name, exc)
+                return 0
+        self.db.commit()
+        return len(rows)
+
+    def _current_epoch(self, now_ts: float) -> float:
+        epoch = self._read_checkpoint(EPOCH_CHECKPOINT, default=None)
+        if epoch is None:
+            self._claim(EPOCH_CHECKPOINT, None, int(now_ts))
+            self.db.commit()
+            return float(self._read_checkpoint(EPOCH_CHECKPOINT, default=now_ts))
+
+        if (now_ts - epoch) / self.half_life_seconds < _MAX_EXPONENT:
+            return float(epoch)
+
+        new_epoch = int(now_ts)
+        if self._claim(EPOCH_CHECKPOINT, int(epoch), new_epoch):
+            self.store.rescale(2.0 ** ((epoch - new_epoch) / self.half_life_seconds))
+            self.db.commit()
+            return float(new_epoch)
+        self.db.rollback()
+        return float(self._read_checkpoint(EPOCH_CHECKPOINT, default=now_ts))
+
+    def _read_checkpoint(self, name: str, default: float | None) -> float | None:
+        value = self.db.query(RankingCheckpoint.value).filter(RankingCheckpoint.name == name).scalar()
+        return default if value is None else float(value)
+
+    def _claim(self, name: str, expected: int | None, new_value: int) -> bool:
+        """Compare-and-set a checkpoint inside the current transaction."""
+
+        if expected is None or (expected == 0 and self._read_checkpoint(name, default=None) is None):
+            try:
+                with self.db.begin_nested():
+                    self.db.add(RankingCheckpoint(name=name, value=new_value))
+                return True
+            except IntegrityError:
+                return False
+
+        result = self.db.execute(
+            update(RankingCheckpoint)
+            .where(RankingCheckpoint.name == name, RankingCheckpoint.value == expected)
+            .values(value=new_value, updated_at=datetime.utcnow())
+        )
+        return result.rowcount == 1
+
+
+def refresh_trending() -> int:
+    """Run one refresh in a fresh session (used by the background loop)."""
+
+    db = SessionLocal()
+    try:
+        return TrendingService(db).refresh()
+    finally:
+        db.close()
+
@@ -0,0 +1 @@
+"""Benchmark scripts (run manually, not collected by pytest)."""
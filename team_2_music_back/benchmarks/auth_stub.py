@@ -0,0 +1,95 @@
+"""Local stand-in for the external auth server (JWKS + userinfo).
+
+Serves ``/.well-known/jwks.json`` and ``/me`` so the API's real RS256 path
+(``decode_jwt`` + ``_verify_remote_user``) can be exercised without the remote
+service. Tokens are minted with :func:`mint_token` using the same private key.
+
+    python -m benchmarks.auth_stub --private-key key.pem --port 8765
+    python -m benchmarks.auth_stub --private-key key.pem --token-for 42
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+from pathlib import Path
+
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+from jose import jwk, jwt
+from jose.exceptions import JWTError
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+
+from app.core.config import settings
+
+KID = "load-test-key"
+
+
+def generate_private_key(path: Path) -> None:
+    key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    path.write_bytes(
+        key.private_bytes(
+            serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption()
+        )
+    )
+
+
+def _public_pem(private_pem: bytes) -> bytes:
+    private = serialization.load_pem_private_key(private_pem, password=None)
+    return private.public_key().public_bytes(
+        serialization.Encoding.PEM, serialization.PublicFormat.SubjectPublicKeyInfo
+    )
+
+
+def mint_token(private_pem: bytes, user_id: int, ttl: int = 3600) -> str:
+    now = int(time.time())
+    claims = {"sub": str(user_id), "aud": settings.project_name, "iat": now, "exp": now + ttl}
+    return jwt.encode(claims, private_pem.decode(), algorithm="RS256", headers={"kid": KID})
+
+
+def create_stub_app(private_pem: bytes) -> Starlette:
+    public_pem = _public_pem(private_pem).decode()
+    jwks = {"keys": [{**jwk.construct(public_pem, "RS256").to_dict(), "kid": KID, "use": "sig", "alg": "RS256"}]}
+
+    async def jwks_document(request: Request) -> JSONResponse:
+        return JSONResponse(jwks)
+
+    async def userinfo(request: Request) -> JSONResponse:
+        token = request.headers.get("authorization", "").removeprefix("Bearer ").strip()
+        try:
+            claims = jwt.decode(token, public_pem, algorithms=["RS256"], audience=settings.project_name)
+        except JWTError:
+            return JSONResponse({"detail": "invalid token"}, status_code=401)
+        user_id = int(claims["sub"])
+        return JSONResponse({"id": user_id, "nickname": f"load-user-{user_id}", "is_active": True})
+
+    return Starlette(
+        routes=[Route("/.well-known/jwks.json", jwks_document), Route("/me", userinfo)],
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--private-key", type=Path, required=True, help="PEM file (created if missing)")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--token-for", type=int, help="print a token for this user id and exit")
+    args = parser.parse_args()
+
+    if not args.private_key.exists():
+        generate_private_key(args.private_key)
+    private_pem = args.private_key.read_bytes()
+    if args.token_for is not None:
+        print(mint_token(private_pem, args.token_for))
+        return
+
+    import uvicorn
+
+    uvicorn.run(create_stub_app(private_pem), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+"""Compare push (fan-out-on-write) and pull costs for the home feed.
+
+Follower counts are Zipf-distributed, so a few creators own most follow edges.
+Part one models write amplification and read fan-in per threshold; part two
+times real ``FeedService.timeline`` reads on an in-memory SQLite graph:
+    python -m benchmarks.bench_feed --users 20000 --follows 30
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import sessionmaker
+
+from app.core.config import settings
+from app.db.base import Base
+from app.models.follow import Follow
+from app.models.track import Track
+from app.models.user_profile import UserProfile
+from app.services.feed import FeedService, SqlTimelineStore
+
+
+def follow_graph(rng: np.random.Generator, users: int, follows: int, zipf: float) -> tuple[np.ndarray, np.ndarray]:
+    followers = np.repeat(np.arange(users), follows)
+    following = (rng.zipf(zipf, size=followers.size) - 1) % users
+    keep = followers != following
+    edges = np.unique(np.stack([followers[keep], following[keep]], axis=1), axis=0)
+    return edges[:, 0], edges[:, 1]
+
+
+def cost_model(followers: np.ndarray, following: np.ndarray, users: int, thresholds: list[int]) -> list[dict]:
+    counts = np.bincount(following, minlength=users)
+    rows = []
+    for threshold in thresholds:
+        large = counts > threshold
+        pulled_per_reader = np.bincount(followers[large[following]], minlength=users)
+        rows.append(
+            {
+                "threshold": threshold,
+                "large_accounts": int(large.sum()),
+                # one post per creator: timelines written vs. queried at read time
+                "push_writes_per_round": int(counts[~large].sum()),
+                "max_writes_single_post": int(counts[~large].max(initial=0)),
+                "mean_pulled_accounts_per_read": round(float(pulled_per_reader.mean()), 2),
+                "p99_pulled_accounts_per_read": int(np.percentile(pulled_per_reader, 99)),
+            }
+        )
+    return rows
+
+
+def measure_reads(followers: np.ndarray, following: np.ndarray, users: int, posts: int, reads: int, threshold: int) -> dict:
+    engine = create_engine("sqlite:///:memory:")
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine)()
+    counts = np.bincount(following, minlength=users)
+    db.execute(
+        insert(UserProfile),
+        [
+            {"id": i + 1, "auth_user_id": str(i), "display_name": f"u{i}", "follower_count": int(counts[i])}
+            for i in range(users)
+        ],
+    )
+    db.execute(
+        insert(Follow), [{"follower_id": int(a) + 1, "following_id": int(b) + 1} for a, b in zip(followers, following)]
+    )
+    db.commit()
+
+    settings.feed_fanout_threshold = threshold
+    service = FeedService(db, store=SqlTimelineStore(db))
+    rng = np.random.default_rng(1)
+    authors = (rng.zipf(1.3, size=posts) - 1) % users
+    base = datetime(2026, 1, 1)
+
+    start = time.perf_counter()
+    for i, author in enumerate(authors):
+        track = Track(owner_user_id=int(author) + 1, title=f"t{i}", created_at=base + timedelta(seconds=i))
+        db.add(track)
+        db.commit()
+        service.fan_out(track)
+    write_s = time.perf_counter() - start
+
+    latencies = []
+    for reader in rng.integers(1, users + 1, size=reads):
+        start = time.perf_counter()
+        service.timeline(int(reader), limit=20)
+        latencies.append(time.perf_counter() - start)
+    latencies_ms = np.array(latencies) * 1000
+    db.close()
+    return {
+        "threshold": threshold,
+        "posts": posts,
+        "fan_out_ms_per_post": round(write_s * 1000 / posts, 3),
+        "read_p50_ms": round(float(np.percentile(latencies_ms, 50)), 3),
+        "read_p99_ms": round(float(np.percentile(latencies_ms, 99)), 3),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--users", type=int, default=20_000)
+    parser.add_argument("--follows", type=int, default=30, help="mean accounts followed per user")
+    parser.add_argument("--zipf", type=float, default=1.3)
+    parser.add_argument("--posts", type=int, default=500)
+    parser.add_argument("--reads", type=int, default=500)
+    parser.add_argument("--thresholds", type=int, nargs="+", default=[100, 1_000, 10_000, 10**9])
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    followers, following = follow_graph(rng, args.users, args.follows, args.zipf)
+    report = {
+        "users": args.users,
+        "edges": int(followers.size),
+        "max_followers": int(np.bincount(following).max()),
+        "model": cost_model(followers, following, args.users, args.thresholds),
+        "measured": [
+            measure_reads(followers, following, args.users, args.posts, args.reads, t) for t in args.thresholds
+        ],
+    }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
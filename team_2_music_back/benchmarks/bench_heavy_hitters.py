@@ -0,0 +1,108 @@
+"""Compare sketch-based "most played in the last hour" with the exact SQL query.
+
+Usage (from team_2_music_back):
+    python -m benchmarks.bench_heavy_hitters --plays 500000 --tracks 50000
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+from sqlalchemy import create_engine, func, insert, select
+from sqlalchemy.orm import Session
+
+from app.core.sketch import SlidingWindowSketch, TopK
+from app.db.base import Base
+from app.models.play_history import PlayHistory
+from app.models.track import Track
+from app.models.user_profile import UserProfile
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--plays", type=int, default=200_000)
+    parser.add_argument("--tracks", type=int, default=20_000)
+    parser.add_argument("--users", type=int, default=5_000)
+    parser.add_argument("--zipf", type=float, default=1.2)
+    parser.add_argument("--top", type=int, default=10)
+    parser.add_argument("--epsilon", type=float, default=0.0005)
+    parser.add_argument("--delta", type=float, default=0.01)
+    parser.add_argument("--database-url", default="sqlite://")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(42)
+    now = datetime.utcnow()
+    track_ids = (rng.zipf(args.zipf, size=args.plays) % args.tracks + 1).astype(np.int64)
+    user_ids = rng.integers(1, args.users + 1, size=args.plays)
+    offsets = rng.uniform(0, 7200, size=args.plays)  # half the events fall outside the hour
+
+    engine = create_engine(args.database_url)
+    Base.metadata.create_all(engine)
+    with Session(engine) as db:
+        db.execute(insert(UserProfile), [{"id": u, "auth_user_id": str(u), "display_name": f"u{u}"} for u in range(1, args.users + 1)])
+        db.execute(insert(Track), [{"id": t, "owner_user_id": 1, "title": f"t{t}"} for t in range(1, args.tracks + 1)])
+        db.execute(
+            insert(PlayHistory),
+            [
+                {"user_id": int(u), "track_id": int(t), "played_at": now - timedelta(seconds=float(o))}
+                for u, t, o in zip(user_ids, track_ids, offsets)
+            ],
+        )
+        db.commit()
+
+        start = time.perf_counter()
+        exact = db.execute(
+            select(PlayHistory.track_id, func.count(PlayHistory.id).label("plays"))
+            .where(PlayHistory.played_at >= now - timedelta(hours=1))
+            .group_by(PlayHistory.track_id)
+            .order_by(func.count(PlayHistory.id).desc())
+            .limit(args.top)
+        ).all()
+        exact_ms = (time.perf_counter() - start) * 1000
+
+    sketch = SlidingWindowSketch(window_seconds=3600, buckets=12, epsilon=args.epsilon, delta=args.delta)
+    topk = TopK(capacity=args.top * 20)
+    now_ts = now.timestamp()
+    order = np.argsort(-offsets)  # replay oldest first, as a live stream would
+    start = time.perf_counter()
+    for i in order:
+        ts = now_ts - offsets[i]
+        sketch.add([track_ids[i]], ts)
+        topk.offer(int(track_ids[i]), int(sketch.estimate([track_ids[i]], ts)[0]))
+    ingest_us = (time.perf_counter() - start) * 1e6 / args.plays
+
+    start = time.perf_counter()
+    candidates = np.array(topk.candidates(), dtype=np.int64)
+    estimates = sketch.estimate(candidates, now_ts).astype(np.int64)
+    approx = [(int(candidates[i]), int(estimates[i])) for i in np.argsort(-estimates)[: args.top]]
+    query_ms = (time.perf_counter() - start) * 1000
+
+    exact_counts = dict(exact)
+    recall = len(set(exact_counts) & {k for k, _ in approx}) / max(len(exact_counts), 1)
+    errors = [est - exact_counts[k] for k, est in approx if k in exact_counts]
+    total = sketch.total(now_ts)
+    print(
+        json.dumps(
+            {
+                "plays": args.plays,
+                "tracks": args.tracks,
+                "exact_sql_ms": round(exact_ms, 2),
+                "sketch_query_ms": round(query_ms, 3),
+                "sketch_ingest_us_per_event": round(ingest_us, 2),
+                "serialized_bytes": len(sketch.to_bytes()),
+                f"recall_at_{args.top}": recall,
+                "max_overcount_observed": max(errors, default=0),
+                "max_overcount_bound": int(np.ceil(sketch.epsilon * total)),
+                "confidence": 1 - sketch.delta,
+            },
+            indent=2,
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
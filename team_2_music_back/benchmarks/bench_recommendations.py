@@ -0,0 +1,73 @@
+"""Benchmark the item-to-item neighbor build on synthetic interactions.
+
+Track popularity is Zipf-distributed, as in real listening data. Full-scale run:
+    python -m benchmarks.bench_recommendations --users 1000000 --tracks 500000 --per-user 20
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import resource
+import time
+
+import numpy as np
+
+from app.services.recommendations import build_interaction_matrix, compute_neighbors
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--users", type=int, default=100_000)
+    parser.add_argument("--tracks", type=int, default=50_000)
+    parser.add_argument("--per-user", type=int, default=20, help="mean interactions per user")
+    parser.add_argument("--zipf", type=float, default=1.1)
+    parser.add_argument("--k", type=int, default=50)
+    parser.add_argument("--chunk-size", type=int, default=2048)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--sample-rows", type=int, default=0, help="only compute this many rows (extrapolated)")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    n = args.users * args.per_user
+    start = time.perf_counter()
+    users = rng.integers(0, args.users, size=n, dtype=np.int64)
+    tracks = (rng.zipf(args.zipf, size=n) - 1) % args.tracks
+    weights = np.ones(n, dtype=np.float32)
+    data = build_interaction_matrix(users, tracks, weights)
+    build_s = time.perf_counter() - start
+
+    rows = None
+    if args.sample_rows:
+        rows = rng.choice(data.track_ids.size, size=min(args.sample_rows, data.track_ids.size), replace=False)
+
+    start = time.perf_counter()
+    done, neighbors, _ = compute_neighbors(
+        data.matrix, k=args.k, rows=rows, chunk_size=args.chunk_size, workers=args.workers
+    )
+    neighbors_s = time.perf_counter() - start
+    per_row_ms = neighbors_s * 1000 / max(done.size, 1)
+
+    print(
+        json.dumps(
+            {
+                "users": int(data.user_ids.size),
+                "tracks": int(data.track_ids.size),
+                "nnz": int(data.matrix.nnz),
+                "workers": args.workers,
+                "matrix_build_s": round(build_s, 2),
+                "rows_computed": int(done.size),
+                "neighbors_s": round(neighbors_s, 2),
+                "ms_per_track": round(per_row_ms, 3),
+                "estimated_full_build_s": round(per_row_ms * data.track_ids.size / 1000, 1),
+                "stored_bytes_per_track": args.k * 8,
+                "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+            },
+            indent=2,
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""Bytes and CPU per 100-track page: full ``TrackRead`` vs. a sparse fieldset.
+
+Runs both list paths of ``TrackService`` against in-memory SQLite and reports
+the query+serialize and serialize-only cost:
+    python -m benchmarks.bench_serialization --fields id,title,cover_url,owner_display_name
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import time
+
+import orjson
+from pydantic import TypeAdapter
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import sessionmaker
+
+from app.core.storage import StorageService
+from app.db.base import Base
+from app.models.track import Track
+from app.models.user_profile import UserProfile
+from app.schemas import TrackRead
+from app.services.tracks import TrackService, parse_fields
+
+
+def cpu_us(fn, repeat: int) -> float:
+    start = time.process_time()
+    for _ in range(repeat):
+        fn()
+    return (time.process_time() - start) * 1e6 / repeat
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--page", type=int, default=100)
+    parser.add_argument("--description-chars", type=int, default=1500)
+    parser.add_argument("--fields", default="id,title,cover_url,owner_display_name")
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    engine = create_engine("sqlite:///:memory:")
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine)()
+    db.execute(insert(UserProfile), [{"id": i, "auth_user_id": str(i), "display_name": f"artist {i}"} for i in range(1, 21)])
+    db.execute(
+        insert(Track),
+        [
+            {
+                "owner_user_id": i % 20 + 1,
+                "title": f"Track {i}",
+                "description": "lorem ipsum " * (args.description_chars // 12),
+                "cover_url": f"uploads/{i}/cover.jpg",
+                "audio_url": f"uploads/{i}/audio.mp3",
+                "genre": "ambient",
+                "tags": "calm,night",
+            }
+            for i in range(args.page)
+        ],
+    )
+    db.commit()
+
+    service = TrackService(db, storage=StorageService())
+    adapter = TypeAdapter(list[TrackRead])
+    fields = parse_fields(args.fields)
+
+    def full() -> bytes:
+        db.expire_all()
+        return adapter.dump_json(adapter.validate_python(service.list_tracks(limit=args.page), from_attributes=True))
+
+    def sparse() -> bytes:
+        return orjson.dumps(service.list_track_fields(fields, limit=args.page))
+
+    full_tracks = service.list_tracks(limit=args.page)
+    sparse_rows = service.list_track_fields(fields, limit=args.page)
+
+    report = {
+        "page": args.page,
+        "fields": fields,
+        "full": {
+            "bytes": len(full()),
+            "cpu_us_query_and_serialize": round(cpu_us(full, args.repeat)),
+            "cpu_us_serialize_only": round(
+                cpu_us(lambda: adapter.dump_json(adapter.validate_python(full_tracks, from_attributes=True)), args.repeat)
+            ),
+        },
+        "sparse": {
+            "bytes": len(sparse()),
+            "cpu_us_query_and_serialize": round(cpu_us(sparse, args.repeat)),
+            "cpu_us_serialize_only": round(cpu_us(lambda: orjson.dumps(sparse_rows), args.repeat)),
+        },
+    }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""Worker start-up import profile (``python -X importtime``).
+
+Imports ``main`` (which builds the app) in fresh interpreters, takes the median
+per module over ``--runs`` and reports the total, the slowest third-party
+packages and the slowest ``app`` modules (cumulative microseconds), plus which
+heavy optional dependencies got imported at all:
+
+    python -m benchmarks.bench_startup --runs 5 --out benchmarks/startup_profile.json
+    python -m benchmarks.bench_startup --compare benchmarks/startup_profile.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+from collections import defaultdict
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+HEAVY = ("boto3", "botocore", "mutagen", "numpy", "scipy", "redis")
+
+
+def import_profile(target: str = "main") -> dict[str, int]:
+    """Cumulative import time (us) per module for one cold import of ``target``."""
+
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {target}"],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    cumulative: dict[str, int] = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, self_us, cum_us, name = (part.strip() for part in line.replace("import time:", "|", 1).split("|"))
+        cumulative[name] = max(cumulative.get(name, 0), int(cum_us))
+    return cumulative
+
+
+def summarize(runs: list[dict[str, int]], target: str, top: int) -> dict:
+    samples: dict[str, list[int]] = defaultdict(list)
+    for run in runs:
+        for name, us in run.items():
+            samples[name].append(us)
+    median = {name: int(statistics.median(values)) for name, values in samples.items()}
+
+    def slowest(names) -> dict[str, int]:
+        return dict(sorted(((n, median[n]) for n in names), key=lambda item: -item[1])[:top])
+
+    packages = [n for n in median if "." not in n and n != "app" and n != target]
+    app_modules = [n for n in median if n.startswith("app.")]
+    return {
+        "target": target,
+        "runs": len(runs),
+        "total_ms": round(median.get(target, 0) / 1000, 1),
+        "heavy_imported": [name for name in HEAVY if name in median],
+        "packages_us": slowest(packages),
+        "app_modules_us": slowest(app_modules),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--target", default="main")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--out", help="write the summary JSON here")
+    parser.add_argument("--compare", help="previous summary JSON to diff totals against")
+    args = parser.parse_args()
+
+    report = summarize([import_profile(args.target) for _ in range(args.runs)], args.target, args.top)
+    text = json.dumps(report, indent=2)
+    if args.out:
+        Path(args.out).write_text(text + "\n", encoding="utf-8")
+    print(text)
+    if args.compare:
+        baseline = json.loads(Path(args.compare).read_text(encoding="utf-8"))
+        print(f"total_ms: {baseline['total_ms']} -> {report['total_ms']}")
+        print(f"heavy_imported: {baseline['heavy_imported']} -> {report['heavy_imported']}")
+
+
+if __name__ == "__main__":
+    main()
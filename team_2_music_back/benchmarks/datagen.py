@@ -0,0 +1,205 @@
+"""Reproducible synthetic catalog generator.
+
+Fills a database with users, tracks, likes, comments, follows and plays. Track
+ownership, like/play/comment targets and follow targets are Zipf-distributed
+(a few creators and tracks get most of the activity); timestamps are spread
+over ``--days``. Same ``--seed`` and sizes produce the same rows.
+
+    python -m benchmarks.datagen --database-url sqlite:///bench.db --users 1000000 --tracks 200000
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import time
+from dataclasses import asdict, dataclass
+from datetime import datetime, timedelta
+
+import numpy as np
+from sqlalchemy import Engine, create_engine, insert
+
+from app.db.base import Base
+from app.models.comment import Comment
+from app.models.follow import Follow
+from app.models.play_history import PlayHistory
+from app.models.track import Track
+from app.models.user_profile import UserProfile
+from app.models.vote import Like
+
+GENRES = ("pop", "rock", "hip-hop", "ambient", "jazz", "classical", "electronic", "lo-fi")
+_EPOCH = datetime(2026, 1, 1)
+
+
+@dataclass
+class DatasetSpec:
+    users: int = 10_000
+    tracks: int = 5_000
+    likes: int = 100_000
+    comments: int = 20_000
+    follows: int = 50_000
+    plays: int = 300_000
+    zipf: float = 1.2
+    days: int = 90
+    seed: int = 0
+    chunk_size: int = 20_000
+
+
+def _zipf_ids(rng: np.random.Generator, n: int, size: int, a: float) -> np.ndarray:
+    """1-based ids in ``[1, n]``; id rank is shuffled so popularity is not tied to id order."""
+
+    ranks = (rng.zipf(a, size=size) - 1) % n
+    return rng.permutation(n)[ranks] + 1
+
+
+def _seconds(rng: np.random.Generator, size: int, days: int) -> np.ndarray:
+    """Sorted offsets from the epoch; converted to datetimes lazily per row."""
+
+    return np.sort(rng.integers(0, days * 86_400, size=size))
+
+
+def _at(offset: np.integer) -> datetime:
+    return _EPOCH + timedelta(seconds=int(offset))
+
+
+def _unique_pairs(left: np.ndarray, right: np.ndarray, drop_self: bool = False) -> tuple[np.ndarray, np.ndarray]:
+    keep = left != right if drop_self else np.ones(left.size, dtype=bool)
+    pairs = np.unique(np.stack([left[keep], right[keep]], axis=1), axis=0)
+    return pairs[:, 0], pairs[:, 1]
+
+
+def _insert(engine: Engine, model, rows, chunk_size: int) -> int:
+    total = 0
+    with engine.begin() as conn:
+        batch = []
+        for row in rows:
+            batch.append(row)
+            if len(batch) >= chunk_size:
+                conn.execute(insert(model), batch)
+                total += len(batch)
+                batch = []
+        if batch:
+            conn.execute(insert(model), batch)
+            total += len(batch)
+    return total
+
+
+def generate(engine: Engine, spec: DatasetSpec) -> dict[str, int]:
+    """Create tables if needed and insert the dataset; returns rows per table."""
+
+    Base.metadata.create_all(bind=engine)
+    rng = np.random.default_rng(spec.seed)
+    counts: dict[str, int] = {}
+
+    follow_src = rng.integers(1, spec.users + 1, size=spec.follows)
+    follow_dst = _zipf_ids(rng, spec.users, spec.follows, spec.zipf)
+    follow_src, follow_dst = _unique_pairs(follow_src, follow_dst, drop_self=True)
+    follower_counts = np.bincount(follow_dst, minlength=spec.users + 1)
+
+    counts["user_profiles"] = _insert(
+        engine,
+        UserProfile,
+        (
+            {
+                "id": i,
+                "auth_user_id": f"synthetic-{i}",
+                "display_name": f"user {i}",
+                "created_at": _EPOCH,
+                "follower_count": int(follower_counts[i]),
+            }
+            for i in range(1, spec.users + 1)
+        ),
+        spec.chunk_size,
+    )
+
+    owners = _zipf_ids(rng, spec.users, spec.tracks, spec.zipf)
+    genres = rng.integers(0, len(GENRES), size=spec.tracks)
+    durations = rng.integers(60, 420, size=spec.tracks)
+    description_words = rng.integers(0, 120, size=spec.tracks)
+    track_times = _seconds(rng, spec.tracks, spec.days)
+    counts["tracks"] = _insert(
+        engine,
+        Track,
+        (
+            {
+                "id": i + 1,
+                "owner_user_id": int(owners[i]),
+                "title": f"track {i + 1}",
+                "description": " ".join(["lorem"] * int(description_words[i])) or None,
+                "status": "ready",
+                "genre": GENRES[genres[i]],
+                "duration_seconds": int(durations[i]),
+                "audio_url": f"uploads/{owners[i]}/{i + 1}/audio.mp3",
+                "created_at": _at(track_times[i]),
+                "updated_at": _at(track_times[i]),
+            }
+            for i in range(spec.tracks)
+        ),
+        spec.chunk_size,
+    )
+
+    like_users, like_tracks = _unique_pairs(
+        rng.integers(1, spec.users + 1, size=spec.likes), _zipf_ids(rng, spec.tracks, spec.likes, spec.zipf)
+    )
+    like_times = _seconds(rng, like_users.size, spec.days)
+    counts["likes"] = _insert(
+        engine,
+        Like,
+        (
+            {"user_id": int(u), "track_id": int(t), "created_at": _at(ts)}
+            for u, t, ts in zip(like_users, like_tracks, like_times)
+        ),
+        spec.chunk_size,
+    )
+
+    comment_tracks = _zipf_ids(rng, spec.tracks, spec.comments, spec.zipf)
+    comment_users = rng.integers(1, spec.users + 1, size=spec.comments)
+    comment_times = _seconds(rng, spec.comments, spec.days)
+    counts["comments"] = _insert(
+        engine,
+        Comment,
+        (
+            {"user_id": int(u), "track_id": int(t), "body": f"comment {i}", "created_at": _at(ts)}
+            for i, (u, t, ts) in enumerate(zip(comment_users, comment_tracks, comment_times))
+        ),
+        spec.chunk_size,
+    )
+
+    counts["follows"] = _insert(
+        engine,
+        Follow,
+        ({"follower_id": int(a), "following_id": int(b), "created_at": _EPOCH} for a, b in zip(follow_src, follow_dst)),
+        spec.chunk_size,
+    )
+
+    play_tracks = _zipf_ids(rng, spec.tracks, spec.plays, spec.zipf)
+    play_users = rng.integers(1, spec.users + 1, size=spec.plays)
+    play_times = _seconds(rng, spec.plays, spec.days)
+    counts["play_history"] = _insert(
+        engine,
+        PlayHistory,
+        (
+            {"user_id": int(u), "track_id": int(t), "played_at": _at(ts)}
+            for u, t, ts in zip(play_users, play_tracks, play_times)
+        ),
+        spec.chunk_size,
+    )
+    return counts
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", required=True)
+    for name, value in asdict(DatasetSpec()).items():
+        parser.add_argument(f"--{name.replace('_', '-')}", type=type(value), default=value)
+    args = vars(parser.parse_args())
+    database_url = args.pop("database_url")
+    spec = DatasetSpec(**args)
+
+    start = time.perf_counter()
+    counts = generate(create_engine(database_url), spec)
+    print(json.dumps({"spec": asdict(spec), "rows": counts, "seconds": round(time.perf_counter() - start, 1)}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
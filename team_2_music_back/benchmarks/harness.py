@@ -0,0 +1,235 @@
+"""Scale benchmark harness for service methods and HTTP routes.
+
+Run against a database filled by ``benchmarks.datagen``. Each scenario is timed
+for ``--iterations`` calls (latency p50/p95/p99, SQL statements per call), then
+re-run briefly under ``tracemalloc`` for peak memory. Results go to JSON so runs
+can be compared:
+
+    python -m benchmarks.datagen --database-url sqlite:///bench.db
+    python -m benchmarks.harness --database-url sqlite:///bench.db --out run.json
+    python -m benchmarks.harness --database-url sqlite:///bench.db --compare run.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import platform
+import subprocess
+import tempfile
+import time
+import tracemalloc
+from collections.abc import Callable
+from datetime import datetime
+from io import BytesIO
+
+import numpy as np
+from fastapi import UploadFile
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event, func, select
+from sqlalchemy.orm import sessionmaker
+from starlette.datastructures import Headers
+
+from app.api.deps import get_db
+from app.core.cache import get_response_cache
+from app.core.storage import StorageService
+from app.factory import create_app
+from app.models.comment import Comment
+from app.models.track import Track
+from app.models.user_profile import UserProfile
+from app.schemas import CommentCreate
+from app.services.interactions import InteractionService
+from app.services.tracks import TrackService
+
+_FAKE_MP3 = b"ID3" + b"\x00" * 64 * 1024
+
+
+class QueryCounter:
+    """Count SQL statements issued on an engine."""
+
+    def __init__(self, engine) -> None:
+        self.count = 0
+        event.listen(engine, "before_cursor_execute", self._on_execute)
+
+    def _on_execute(self, *args) -> None:
+        self.count += 1
+
+
+def _percentiles(samples: list[float]) -> dict[str, float]:
+    ms = np.array(samples) * 1000
+    return {
+        "p50_ms": round(float(np.percentile(ms, 50)), 3),
+        "p95_ms": round(float(np.percentile(ms, 95)), 3),
+        "p99_ms": round(float(np.percentile(ms, 99)), 3),
+        "mean_ms": round(float(ms.mean()), 3),
+    }
+
+
+def run_scenario(fn: Callable[[int], None], iterations: int, counter: QueryCounter, memory_iterations: int) -> dict:
+    fn(0)  # warm-up: imports, statement cache
+    samples = []
+    queries_before = counter.count
+    for i in range(iterations):
+        start = time.perf_counter()
+        fn(i)
+        samples.append(time.perf_counter() - start)
+    result = _percentiles(samples)
+    result["queries_per_call"] = round((counter.count - queries_before) / iterations, 2)
+
+    tracemalloc.start()
+    for i in range(memory_iterations):
+        fn(iterations + i)
+    result["peak_kib"] = round(tracemalloc.get_traced_memory()[1] / 1024, 1)
+    tracemalloc.stop()
+    return result
+
+
+def build_scenarios(SessionLocal, client: TestClient, storage: StorageService, warm_cache: bool, seed: int) -> dict:
+    rng = np.random.default_rng(seed)
+    with SessionLocal() as db:
+        users = db.query(func.max(UserProfile.id)).scalar() or 1
+        track_count = db.query(func.max(Track.id)).scalar() or 1
+        hot_track = db.execute(
+            select(Comment.track_id).group_by(Comment.track_id).order_by(func.count().desc()).limit(1)
+        ).scalar() or 1
+    track_ids = rng.integers(1, track_count + 1, size=100_000)
+    user_ids = rng.integers(1, users + 1, size=100_000)
+
+    def with_session(body: Callable) -> Callable[[int], None]:
+        def call(i: int) -> None:
+            db = SessionLocal()
+            try:
+                body(db, i)
+            finally:
+                db.close()
+
+        return call
+
+    def http_get(path: Callable[[int], str]) -> Callable[[int], None]:
+        def call(i: int) -> None:
+            if not warm_cache:
+                get_response_cache().clear()
+            resp = client.get(path(i))
+            assert resp.status_code == 200, resp.text
+
+        return call
+
+    def http_like(i: int) -> None:
+        track_id, user_id = int(track_ids[i]), int(user_ids[i])
+        headers = {"X-User-Id": str(user_id)}
+        client.post(f"/api/interactions/tracks/{track_id}/like", headers=headers)
+        client.delete(f"/api/interactions/tracks/{track_id}/like", headers=headers)
+
+    def upload(db, i: int) -> None:
+        file = UploadFile(
+            file=BytesIO(_FAKE_MP3), filename=f"bench-{i}.mp3", headers=Headers({"content-type": "audio/mpeg"})
+        )
+        TrackService(db, storage=storage).upload_direct(
+            file=file, cover_file=None, title=f"bench {i}", description=None, owner_user_id=int(user_ids[i])
+        )
+
+    return {
+        "service.list_tracks": with_session(
+            lambda db, i: TrackService(db, storage=storage).list_tracks(limit=50, offset=int(track_ids[i]) % 1000)
+        ),
+        "service.list_comments": with_session(lambda db, i: InteractionService(db).list_comments(hot_track, limit=50)),
+        "service.toggle_like": with_session(
+            lambda db, i: InteractionService(db).toggle_like(int(track_ids[i]), int(user_ids[i]), like=i % 2 == 0)
+        ),
+        "service.add_comment": with_session(
+            lambda db, i: InteractionService(db).add_comment(
+                CommentCreate(track_id=int(track_ids[i]), body="bench"), user_id=int(user_ids[i])
+            )
+        ),
+        "service.upload_direct": with_session(upload),
+        "http.list_tracks": http_get(lambda i: f"/api/tracks?limit=50&offset={int(track_ids[i]) % 1000}"),
+        "http.list_tracks_sparse": http_get(
+            lambda i: f"/api/tracks?limit=50&offset={int(track_ids[i]) % 1000}&fields=title,cover_url,owner_display_name"
+        ),
+        "http.get_track": http_get(lambda i: f"/api/tracks/{int(track_ids[i])}"),
+        "http.batch_tracks": http_get(
+            lambda i: "/api/tracks/batch?ids=" + ",".join(str(int(t)) for t in track_ids[i : i + 20])
+        ),
+        "http.list_comments": http_get(lambda i: f"/api/interactions/tracks/{hot_track}/comments"),
+        "http.like_unlike": http_like,
+    }
+
+
+def _git_revision() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(current: dict, baseline: dict) -> list[str]:
+    lines = [f"{'scenario':28} {'p50 ms':>16} {'p95 ms':>16} {'queries':>12}"]
+    for name, now in current["scenarios"].items():
+        before = baseline["scenarios"].get(name)
+        if before is None:
+            continue
+        lines.append(
+            f"{name:28} {before['p50_ms']:>7.2f}->{now['p50_ms']:<7.2f} {before['p95_ms']:>7.2f}->{now['p95_ms']:<7.2f}"
+            f" {before['queries_per_call']:>5}->{now['queries_per_call']:<5}"
+        )
+    return lines
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", required=True)
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--memory-iterations", type=int, default=20)
+    parser.add_argument("--scenarios", nargs="*", help="subset of scenario names (default: all)")
+    parser.add_argument("--warm-cache", action="store_true", help="keep the response cache between HTTP calls")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--out", help="write results JSON here")
+    parser.add_argument("--compare", help="baseline results JSON to diff against")
+    args = parser.parse_args()
+
+    engine = create_engine(args.database_url)
+    SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False)
+    counter = QueryCounter(engine)
+
+    def override_get_db():
+        session = SessionLocal()
+        try:
+            yield session
+        finally:
+            session.close()
+
+    app = create_app()
+    app.dependency_overrides[get_db] = override_get_db
+    client = TestClient(app)
+
+    with tempfile.TemporaryDirectory() as storage_dir:
+        scenarios = build_scenarios(SessionLocal, client, StorageService(base_path=storage_dir), args.warm_cache, args.seed)
+        selected = args.scenarios or list(scenarios)
+        results = {}
+        for name in selected:
+            results[name] = run_scenario(scenarios[name], args.iterations, counter, args.memory_iterations)
+            print(f"{name:28} p50={results[name]['p50_ms']}ms p99={results[name]['p99_ms']}ms", flush=True)
+
+    report = {
+        "meta": {
+            "timestamp": datetime.utcnow().isoformat(timespec="seconds") + "Z",
+            "git_revision": _git_revision(),
+            "python": platform.python_version(),
+            "dialect": engine.dialect.name,
+            "iterations": args.iterations,
+            "warm_cache": args.warm_cache,
+        },
+        "scenarios": results,
+    }
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as fh:
+            json.dump(report, fh, indent=2)
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as fh:
+            print("\n".join(compare(report, json.load(fh))))
+
+
+if __name__ == "__main__":
+    main()
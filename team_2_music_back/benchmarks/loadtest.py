@@ -0,0 +1,304 @@
+"""Asyncio HTTP load generator with real JWT authentication.
+
+Replays a weighted mix of browse, stream (Range requests), like, comment and
+upload traffic from ``--concurrency`` virtual users for ``--duration`` seconds
+and reports throughput plus a latency histogram per route.
+
+By default it starts the auth stand-in (``benchmarks.auth_stub``) and the API
+(``uvicorn main:app``) as subprocesses wired to each other, with header auth
+disabled and rate limiting off, so every request goes through JWKS
+verification and the userinfo call. Use ``--base-url`` to target an already
+running server instead; ``429`` responses are then reported as ``throttled``
+and left out of the throughput and latency figures.
+
+    python -m benchmarks.datagen --database-url sqlite:///bench.db
+    python -m benchmarks.loadtest --database-url sqlite:///bench.db --concurrency 50 --duration 60
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from pathlib import Path
+
+import httpx
+import numpy as np
+
+from benchmarks.auth_stub import generate_private_key, mint_token
+
+HISTOGRAM_EDGES_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000)
+DEFAULT_MIX = {"browse": 50, "stream": 20, "like": 15, "comment": 10, "upload": 5}
+_AUDIO = b"ID3" + b"\x00" * 256 * 1024
+
+
+@dataclass
+class RouteStats:
+    latencies: list[float] = field(default_factory=list)
+    statuses: Counter = field(default_factory=Counter)
+    errors: int = 0
+    throttled: int = 0
+
+    def summary(self, duration: float) -> dict:
+        ms = np.array(self.latencies) * 1000 if self.latencies else np.zeros(1)
+        buckets = np.histogram(ms, bins=(0, *HISTOGRAM_EDGES_MS, np.inf))[0]
+        labels = [f"<={edge}ms" for edge in HISTOGRAM_EDGES_MS] + [f">{HISTOGRAM_EDGES_MS[-1]}ms"]
+        return {
+            "requests": len(self.latencies),
+            "rps": round(len(self.latencies) / duration, 1),
+            "errors": self.errors,
+            "throttled": self.throttled,
+            "statuses": {str(k): v for k, v in sorted(self.statuses.items())},
+            "p50_ms": round(float(np.percentile(ms, 50)), 2),
+            "p95_ms": round(float(np.percentile(ms, 95)), 2),
+            "p99_ms": round(float(np.percentile(ms, 99)), 2),
+            "max_ms": round(float(ms.max()), 2),
+            "histogram": {label: int(n) for label, n in zip(labels, buckets) if n},
+        }
+
+
+@dataclass
+class LoadState:
+    tokens: list[str]
+    track_ids: list[int] = field(default_factory=list)
+    streamable_ids: list[int] = field(default_factory=list)
+    stats: dict[str, RouteStats] = field(default_factory=dict)
+
+    def record(self, route: str, status: int | None, seconds: float) -> None:
+        stats = self.stats.setdefault(route, RouteStats())
+        if status == 429:
+            # Rejected before routing: counted, but kept out of throughput and latency.
+            stats.throttled += 1
+            return
+        stats.latencies.append(seconds)
+        if status is None:
+            stats.errors += 1
+        else:
+            stats.statuses[status] += 1
+            if status >= 500:
+                stats.errors += 1
+
+
+async def _call(client: httpx.AsyncClient, state: LoadState, route: str, method: str, url: str, **kwargs):
+    start = time.perf_counter()
+    try:
+        response = await client.request(method, url, **kwargs)
+    except httpx.HTTPError:
+        state.record(route, None, time.perf_counter() - start)
+        return None
+    state.record(route, response.status_code, time.perf_counter() - start)
+    return response
+
+
+def _auth(rng: random.Random, state: LoadState) -> dict[str, str]:
+    return {"Authorization": f"Bearer {rng.choice(state.tokens)}"}
+
+
+async def browse(client, state: LoadState, rng: random.Random) -> None:
+    choice = rng.random()
+    if choice < 0.4 or not state.track_ids:
+        offset = rng.randrange(0, 500)
+        await _call(client, state, "GET /api/tracks", "GET", f"/api/tracks?limit=20&offset={offset}")
+    elif choice < 0.8:
+        track_id = rng.choice(state.track_ids)
+        await _call(client, state, "GET /api/tracks/{id}", "GET", f"/api/tracks/{track_id}")
+    else:
+        await _call(client, state, "GET /api/tracks/trending", "GET", "/api/tracks/trending?limit=20")
+
+
+async def stream(client, state: LoadState, rng: random.Random) -> None:
+    if not state.streamable_ids:
+        return await browse(client, state, rng)
+    start = rng.randrange(0, len(_AUDIO) - 65536)
+    await _call(
+        client,
+        state,
+        "GET /api/tracks/{id}/stream",
+        "GET",
+        f"/api/tracks/{rng.choice(state.streamable_ids)}/stream",
+        headers={"Range": f"bytes={start}-{start + 65535}"},
+    )
+
+
+async def like(client, state: LoadState, rng: random.Random) -> None:
+    if not state.track_ids:
+        return await browse(client, state, rng)
+    track_id = rng.choice(state.track_ids)
+    method = "POST" if rng.random() < 0.6 else "DELETE"
+    await _call(
+        client,
+        state,
+        f"{method} /api/interactions/tracks/{{id}}/like",
+        method,
+        f"/api/interactions/tracks/{track_id}/like",
+        headers=_auth(rng, state),
+    )
+
+
+async def comment(client, state: LoadState, rng: random.Random) -> None:
+    if not state.track_ids:
+        return await browse(client, state, rng)
+    track_id = rng.choice(state.track_ids)
+    await _call(
+        client,
+        state,
+        "POST /api/interactions/tracks/{id}/comments",
+        "POST",
+        f"/api/interactions/tracks/{track_id}/comments",
+        json={"body": "load test comment"},
+        headers=_auth(rng, state),
+    )
+
+
+async def upload(client, state: LoadState, rng: random.Random) -> None:
+    response = await _call(
+        client,
+        state,
+        "POST /api/tracks/upload/direct",
+        "POST",
+        "/api/tracks/upload/direct",
+        files={"file": (f"load-{rng.randrange(1 << 30)}.mp3", _AUDIO, "audio/mpeg")},
+        data={"title": "load test upload"},
+        headers=_auth(rng, state),
+    )
+    if response is not None and response.status_code == 201:
+        track_id = response.json()["id"]
+        state.track_ids.append(track_id)
+        state.streamable_ids.append(track_id)
+
+
+ACTIONS = {"browse": browse, "stream": stream, "like": like, "comment": comment, "upload": upload}
+
+
+async def virtual_user(client, state: LoadState, mix: dict[str, int], deadline: float, seed: int) -> None:
+    rng = random.Random(seed)
+    names = list(mix)
+    weights = [mix[name] for name in names]
+    while time.perf_counter() < deadline:
+        await ACTIONS[rng.choices(names, weights)[0]](client, state, rng)
+
+
+async def run_load(
+    base_url: str, state: LoadState, concurrency: int, duration: float, mix: dict[str, int], seed: int, warmup_uploads: int
+) -> float:
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=30) as client:
+        listing = await client.get("/api/tracks?limit=100")
+        state.track_ids.extend(t["id"] for t in listing.json())
+        setup_rng = random.Random(seed)
+        for _ in range(warmup_uploads):
+            await upload(client, state, setup_rng)
+        state.stats.clear()
+
+        start = time.perf_counter()
+        deadline = start + duration
+        await asyncio.gather(*(virtual_user(client, state, mix, deadline, seed + i) for i in range(concurrency)))
+        return time.perf_counter() - start
+
+
+def _wait_until_up(url: str, timeout: float = 30.0) -> None:
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            if httpx.get(url, timeout=1).status_code < 500:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError(f"server at {url} did not start")
+
+
+def _start_servers(args, workdir: Path, key_path: Path) -> list[subprocess.Popen]:
+    stub_url = f"http://127.0.0.1:{args.auth_port}"
+    env = {
+        **os.environ,
+        "MUSIC_DATABASE_URL": args.database_url,
+        "MUSIC_JWKS_URL": f"{stub_url}/.well-known/jwks.json",
+        "MUSIC_AUTH_USERINFO_URL": f"{stub_url}/me",
+        "MUSIC_ALLOW_HEADER_AUTH": "false",
+        "MUSIC_LOCAL_STORAGE_PATH": str(workdir / "storage"),
+        # Every virtual user shares 127.0.0.1, so the per-IP buckets would turn the
+        # write routes into a 429 benchmark.
+        "MUSIC_RATE_LIMIT_ENABLED": "false",
+    }
+    stub = subprocess.Popen(
+        [sys.executable, "-m", "benchmarks.auth_stub", "--private-key", str(key_path), "--port", str(args.auth_port)],
+        env=env,
+    )
+    _wait_until_up(f"{stub_url}/.well-known/jwks.json")
+    api = subprocess.Popen(
+        [
+            sys.executable, "-m", "uvicorn", "main:app",
+            "--host", "127.0.0.1", "--port", str(args.port),
+            "--workers", str(args.workers), "--log-level", "warning", "--no-access-log",
+        ],
+        env=env,
+    )
+    _wait_until_up(f"http://127.0.0.1:{args.port}/api/health")
+    return [stub, api]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", help="database for the locally started API")
+    parser.add_argument("--base-url", help="target an already running API (tokens must match its JWKS)")
+    parser.add_argument("--private-key", type=Path, help="PEM used to sign tokens (generated if omitted)")
+    parser.add_argument("--port", type=int, default=8011)
+    parser.add_argument("--auth-port", type=int, default=8765)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--duration", type=float, default=30)
+    parser.add_argument("--users", type=int, default=1000, help="distinct user ids to mint tokens for")
+    parser.add_argument("--mix", type=json.loads, default=DEFAULT_MIX, help='e.g. \'{"browse": 80, "like": 20}\'')
+    parser.add_argument("--warmup-uploads", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", help="write the JSON report here")
+    args = parser.parse_args()
+    if not args.base_url and not args.database_url:
+        parser.error("either --database-url or --base-url is required")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        workdir = Path(tmp)
+        key_path = args.private_key or workdir / "auth-key.pem"
+        if not key_path.exists():
+            generate_private_key(key_path)
+        private_pem = key_path.read_bytes()
+        state = LoadState(tokens=[mint_token(private_pem, user_id) for user_id in range(1, args.users + 1)])
+
+        servers = [] if args.base_url else _start_servers(args, workdir, key_path)
+        base_url = args.base_url or f"http://127.0.0.1:{args.port}"
+        try:
+            elapsed = asyncio.run(
+                run_load(base_url, state, args.concurrency, args.duration, args.mix, args.seed, args.warmup_uploads)
+            )
+        finally:
+            for proc in reversed(servers):
+                proc.terminate()
+                proc.wait(timeout=10)
+
+    routes = {route: stats.summary(elapsed) for route, stats in sorted(state.stats.items())}
+    total = sum(r["requests"] for r in routes.values())
+    report = {
+        "concurrency": args.concurrency,
+        "duration_s": round(elapsed, 1),
+        "total_requests": total,
+        "total_rps": round(total / elapsed, 1),
+        "mix": args.mix,
+        "routes": routes,
+    }
+    text = json.dumps(report, indent=2)
+    if args.out:
+        Path(args.out).write_text(text, encoding="utf-8")
+    print(text)
+
+
+if __name__ == "__main__":
+    main()
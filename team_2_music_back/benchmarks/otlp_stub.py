@@ -0,0 +1,76 @@
+"""Local OTLP/HTTP stand-in for trace collection.
+
+Accepts ``POST /v1/traces`` (OTLP JSON, as sent by ``app.core.tracing``),
+optionally appends every span to ``--out`` as JSON lines, and serves
+``GET /summary`` with per-span-name latency percentiles, so upload and
+stream latency can be attributed to stages during a load test.
+
+    python -m benchmarks.otlp_stub --port 4318 --out spans.jsonl
+    MUSIC_TRACING_EXPORTER=otlp uvicorn main:app
+    python -m benchmarks.loadtest --base-url http://127.0.0.1:8000 ...
+    curl http://127.0.0.1:4318/summary
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+from collections import defaultdict
+from pathlib import Path
+
+import numpy as np
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+
+
+def create_stub_app(out: Path | None = None) -> Starlette:
+    durations: dict[str, list[float]] = defaultdict(list)
+
+    async def receive_traces(request: Request) -> JSONResponse:
+        body = await request.json()
+        rows = []
+        for resource in body.get("resourceSpans", []):
+            for scope in resource.get("scopeSpans", []):
+                for item in scope.get("spans", []):
+                    ms = (int(item["endTimeUnixNano"]) - int(item["startTimeUnixNano"])) / 1e6
+                    durations[item["name"]].append(ms)
+                    rows.append(json.dumps({**item, "duration_ms": ms}))
+        if out and rows:
+            with out.open("a", encoding="utf-8") as fh:
+                fh.write("\n".join(rows) + "\n")
+        return JSONResponse({})
+
+    async def summary(request: Request) -> JSONResponse:
+        report = {}
+        for name, values in sorted(durations.items()):
+            ms = np.array(values)
+            report[name] = {
+                "count": int(ms.size),
+                "p50_ms": round(float(np.percentile(ms, 50)), 3),
+                "p95_ms": round(float(np.percentile(ms, 95)), 3),
+                "p99_ms": round(float(np.percentile(ms, 99)), 3),
+                "total_ms": round(float(ms.sum()), 1),
+            }
+        return JSONResponse(report)
+
+    return Starlette(
+        routes=[Route("/v1/traces", receive_traces, methods=["POST"]), Route("/summary", summary)],
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=4318)
+    parser.add_argument("--out", type=Path, help="append received spans here as JSON lines")
+    args = parser.parse_args()
+
+    import uvicorn
+
+    uvicorn.run(create_stub_app(args.out), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+"""add trending score snapshot and ranking checkpoints
+
+Revision ID: a3c1d2e4f5b6
+Revises: 7b9d7c0c9f9a
+Create Date: 2026-10-19
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "a3c1d2e4f5b6"
+down_revision = "7b9d7c0c9f9a"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "trending_scores",
+        sa.Column("track_id", sa.Integer(), nullable=False),
+        sa.Column("genre", sa.String(length=100), nullable=True),
+        sa.Column("score", sa.Float(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(["track_id"], ["tracks.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("track_id"),
+    )
+    op.create_index("ix_trending_scores_genre_score", "trending_scores", ["genre", "score"], unique=False)
+    op.create_index(op.f("ix_trending_scores_score"), "trending_scores", ["score"], unique=False)
+    op.create_table(
+        "ranking_checkpoints",
+        sa.Column("name", sa.String(length=64), nullable=False),
+        sa.Column("value", sa.Integer(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint("name"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("ranking_checkpoints")
+    op.drop_index(op.f("ix_trending_scores_score"), table_name="trending_scores")
+    op.drop_index("ix_trending_scores_genre_score", table_name="trending_scores")
+    op.drop_table("trending_scores")
@@ -0,0 +1,30 @@
+"""add listener sketches for unique-listener counts
+
+Revision ID: b7e2f9a1c3d4
+Revises: a3c1d2e4f5b6
+Create Date: 2026-10-19
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "b7e2f9a1c3d4"
+down_revision = "a3c1d2e4f5b6"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "listener_sketches",
+        sa.Column("key", sa.String(length=64), nullable=False),
+        sa.Column("registers", sa.LargeBinary(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint("key"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("listener_sketches")
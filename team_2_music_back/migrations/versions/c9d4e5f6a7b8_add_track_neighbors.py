@@ -0,0 +1,32 @@
+"""add precomputed track neighbors
+
+Revision ID: c9d4e5f6a7b8
+Revises: b7e2f9a1c3d4
+Create Date: 2026-10-19
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "c9d4e5f6a7b8"
+down_revision = "b7e2f9a1c3d4"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "track_neighbors",
+        sa.Column("track_id", sa.Integer(), nullable=False),
+        sa.Column("neighbor_ids", sa.LargeBinary(), nullable=False),
+        sa.Column("scores", sa.LargeBinary(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(["track_id"], ["tracks.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("track_id"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("track_neighbors")
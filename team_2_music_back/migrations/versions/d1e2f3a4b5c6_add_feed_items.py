@@ -0,0 +1,49 @@
+"""add feed items and follower counts
+
+Revision ID: d1e2f3a4b5c6
+Revises: c9d4e5f6a7b8
+Create Date: 2026-10-19
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "d1e2f3a4b5c6"
+down_revision = "c9d4e5f6a7b8"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "user_profiles",
+        sa.Column("follower_count", sa.Integer(), nullable=False, server_default="0"),
+    )
+    op.create_index("ix_tracks_owner_created", "tracks", ["owner_user_id", "created_at"], unique=False)
+    op.create_table(
+        "feed_items",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("track_id", sa.Integer(), nullable=False),
+        sa.Column("author_id", sa.Integer(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(["user_id"], ["user_profiles.id"]),
+        sa.ForeignKeyConstraint(["author_id"], ["user_profiles.id"]),
+        sa.ForeignKeyConstraint(["track_id"], ["tracks.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("user_id", "track_id", name="uq_feed_item_user_track"),
+    )
+    op.create_index("ix_feed_items_user_created", "feed_items", ["user_id", "created_at", "track_id"], unique=False)
+    op.execute(
+        "UPDATE user_profiles SET follower_count = "
+        "(SELECT COUNT(*) FROM follows WHERE follows.following_id = user_profiles.id)"
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_feed_items_user_created", table_name="feed_items")
+    op.drop_table("feed_items")
+    op.drop_index("ix_tracks_owner_created", table_name="tracks")
+    op.drop_column("user_profiles", "follower_count")
@@ -0,0 +1,34 @@
+"""add fractional order keys to playlist tracks
+
+Revision ID: e4f5a6b7c8d9
+Revises: d1e2f3a4b5c6
+Create Date: 2026-10-19
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "e4f5a6b7c8d9"
+down_revision = "d1e2f3a4b5c6"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("playlist_tracks", sa.Column("order_key", sa.Float(), server_default="0", nullable=False))
+    op.add_column(
+        "playlist_tracks", sa.Column("added_at", sa.DateTime(), server_default=sa.func.now(), nullable=False)
+    )
+    # Seed keys from the legacy integer positions (insertion order when unset).
+    op.execute("UPDATE playlist_tracks SET order_key = COALESCE(position, id)")
+    op.create_index(
+        "ix_playlist_tracks_playlist_order", "playlist_tracks", ["playlist_id", "order_key", "id"], unique=False
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_playlist_tracks_playlist_order", table_name="playlist_tracks")
+    op.drop_column("playlist_tracks", "added_at")
+    op.drop_column("playlist_tracks", "order_key")
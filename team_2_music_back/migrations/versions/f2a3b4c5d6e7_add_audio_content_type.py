@@ -0,0 +1,24 @@
+"""add sniffed audio content type to tracks
+
+Revision ID: f2a3b4c5d6e7
+Revises: e4f5a6b7c8d9
+Create Date: 2026-10-19
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "f2a3b4c5d6e7"
+down_revision = "e4f5a6b7c8d9"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("tracks", sa.Column("audio_content_type", sa.String(length=100), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column("tracks", "audio_content_type")
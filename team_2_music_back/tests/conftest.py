@@ -0,0 +1,102 @@
+"""Shared pytest fixtures."""
+
+from collections import Counter
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from typing import Any
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.api.deps import get_db
+from app.core.cache import get_response_cache
+from app.core.config import settings as _settings
+from app.core.query_audit import fingerprint
+from app.db.base import Base
+from app.factory import create_app
+
+
+class QueryBudget:
+    """Counts statements on every engine; use as ``with query_budget(3): ...``."""
+
+    def __init__(self) -> None:
+        self.statements: list[str] = []
+
+    def _on_execute(self, conn, cursor, statement, parameters, context, executemany) -> None:
+        self.statements.append(statement)
+
+    @contextmanager
+    def __call__(self, max_queries: int) -> Iterator["QueryBudget"]:
+        self.statements = []
+        event.listen(Engine, "before_cursor_execute", self._on_execute)
+        try:
+            yield self
+        finally:
+            event.remove(Engine, "before_cursor_execute", self._on_execute)
+        if len(self.statements) > max_queries:
+            shapes = Counter(fingerprint(s) for s in self.statements).most_common()
+            listing = "\n".join(f"  {n}x {fp}" for fp, n in shapes)
+            pytest.fail(f"{len(self.statements)} SQL statements (budget {max_queries}):\n{listing}")
+
+    @property
+    def count(self) -> int:
+        return len(self.statements)
+
+
+@pytest.fixture
+def query_budget() -> QueryBudget:
+    return QueryBudget()
+
+
+class AppClient(TestClient):
+    """TestClient for an app on a private in-memory database; ``session_factory`` opens sessions on it."""
+
+    session_factory: sessionmaker
+
+
+@pytest.fixture
+def make_client(monkeypatch) -> Callable[..., AppClient]:
+    """Build an app on a fresh in-memory SQLite database.
+
+    ``make_client(UserProfile(...), Track(...), settings={"name": value},
+    on_engine=instrument_engine)`` inserts the rows (pass new instances each
+    call), applies the setting overrides for the test and runs ``on_engine``
+    before the schema is used. The response cache starts empty.
+    """
+
+    def factory(
+        *rows: Any, settings: dict[str, Any] | None = None, on_engine: Callable[[Engine], None] | None = None
+    ) -> AppClient:
+        for name, value in (settings or {}).items():
+            monkeypatch.setattr(_settings, name, value)
+
+        engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+        Base.metadata.create_all(bind=engine)
+        if on_engine is not None:
+            on_engine(engine)
+        TestingSessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False)
+
+        db = TestingSessionLocal()
+        db.add_all(rows)
+        db.commit()
+        db.close()
+
+        def override_get_db():
+            session = TestingSessionLocal()
+            try:
+                yield session
+            finally:
+                session.close()
+
+        get_response_cache().clear()
+        app = create_app()
+        app.dependency_overrides[get_db] = override_get_db
+        client = AppClient(app)
+        client.session_factory = TestingSessionLocal
+        return client
+
+    return factory
@@ -0,0 +1,108 @@
+"""Tests for admission control and per-user upload quotas."""
+
+import asyncio
+
+from fastapi.testclient import TestClient
+from redis.exceptions import RedisError
+
+from app.api import deps
+from app.core.admission import Gate, UploadQuota, classify
+from app.core.config import settings
+from app.factory import create_app
+
+
+def test_classify_routes():
+    assert classify("POST", "/api/tracks/upload/direct") == "upload"
+    assert classify("POST", "/api/tracks/7/upload/replace") == "upload"
+    assert classify("GET", "/api/tracks/7/stream") == "stream"
+    assert classify("GET", "/api/tracks") == "read"
+    assert classify("GET", "/api/health") is None
+    assert classify("POST", "/api/interactions/tracks/7/like") is None
+
+
+def test_gate_times_out_then_fails_fast_until_drained():
+    async def scenario() -> list:
+        gate = Gate("upload", limit=1, queue_timeout=0.05, target_delay=0.01, max_queue=10)
+        results = [await gate.acquire()]  # holds the only slot
+        results.append(await gate.acquire())  # waits 50ms, then gives up
+        results.append(await gate.acquire())  # smoothed delay now above target: no queueing
+        gate.release()
+        results.append(await gate.acquire())  # free slot: admitted immediately
+        return results
+
+    assert asyncio.run(scenario()) == [None, "timeout", "overloaded", None]
+
+
+def test_saturated_class_returns_503_with_retry_after(monkeypatch):
+    monkeypatch.setattr(settings, "admission_upload_limit", 0)
+    monkeypatch.setattr(settings, "admission_queue_timeout_seconds", 0.01)
+    client = TestClient(create_app())
+
+    resp = client.post("/api/tracks/upload/direct", headers={"X-User-Id": "1"})
+    assert resp.status_code == 503
+    assert resp.json()["code"] == "SERVER_BUSY"
+    assert int(resp.headers["retry-after"]) >= 1
+
+    assert client.get("/api/health").status_code == 200
+    assert 'admission_shed_total{reason="timeout",route_class="upload"}' in client.get("/metrics").text
+
+
+def test_upload_quota_limits_concurrent_uploads_per_user(monkeypatch):
+    quota = UploadQuota(limit=1)
+    monkeypatch.setattr(quota, "redis", None)
+
+    assert quota.acquire(1) == UploadQuota.LOCAL
+    assert quota.acquire(1) is None
+    assert quota.acquire(2)
+    quota.release(1, UploadQuota.LOCAL)
+    assert quota.acquire(1)
+
+    monkeypatch.setattr(deps, "get_upload_quota", lambda: quota)
+    client = TestClient(create_app())
+    resp = client.post(
+        "/api/tracks/upload/direct",
+        files={"file": ("song.mp3", b"ID3", "audio/mpeg")},
+        data={"title": "busy"},
+        headers={"X-User-Id": "1"},
+    )
+    assert resp.status_code == 429
+    assert resp.headers["retry-after"] == "5"
+
+
+class FlakyRedis:
+    """Counts ``DECR`` calls; pipelines fail while ``down`` is set."""
+
+    def __init__(self) -> None:
+        self.down = True
+        self.decrs = 0
+
+    def pipeline(self):
+        if self.down:
+            raise RedisError("connection refused")
+        return self
+
+    def incr(self, key):
+        return self
+
+    def expire(self, key, seconds):
+        return self
+
+    def execute(self):
+        return [1]
+
+    def decr(self, key):
+        self.decrs += 1
+
+
+def test_upload_slot_is_released_on_the_backend_that_granted_it():
+    redis = FlakyRedis()
+    quota = UploadQuota(limit=1, redis_client=redis)
+
+    assert quota.acquire(1) == UploadQuota.LOCAL  # Redis is down
+    redis.down = False
+    assert quota.acquire(2) == UploadQuota.REDIS
+
+    quota.release(1, UploadQuota.LOCAL)
+    assert redis.decrs == 0 and quota._local == {}
+    quota.release(2, UploadQuota.REDIS)
+    assert redis.decrs == 1
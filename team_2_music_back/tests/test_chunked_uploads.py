@@ -0,0 +1,114 @@
+"""Tests for resumable chunked uploads (local storage)."""
+
+import pytest
+from fastapi import HTTPException
+
+from app.models.user_profile import UserProfile
+from app.services.chunked_uploads import ChunkStore, merge_ranges
+
+AUDIO = b"fLaC" + bytes(range(256)) * 40  # 10244 bytes
+HEADERS = {"X-User-Id": "1"}
+
+
+def uploader_client(make_client, tmp_path):
+    (tmp_path / "storage").mkdir()
+    return make_client(
+        UserProfile(id=1, auth_user_id="1", display_name="uploader"),
+        settings={"local_storage_path": str(tmp_path / "storage"), "upload_chunk_dir": str(tmp_path / "chunks")},
+    )
+
+
+def test_merge_ranges():
+    assert merge_ranges([(6, 4), (0, 4), (2, 2)]) == [(0, 4), (6, 10)]
+    assert merge_ranges([(0, 4), (4, 4), (3, 10)]) == [(0, 13)]
+    assert merge_ranges([]) == []
+
+
+def test_out_of_order_chunks_resume_and_assemble(make_client, tmp_path):
+    client = uploader_client(make_client, tmp_path)
+    init = client.post(
+        "/api/tracks/upload/initiate",
+        json={"filename": "song.flac", "content_type": "audio/flac", "file_size": len(AUDIO)},
+        headers=HEADERS,
+    ).json()
+    upload_id = init["upload_id"]
+    chunk_url = init["presigned_url"]
+    assert chunk_url == f"/api/tracks/upload/{upload_id}/chunks"
+
+    # Second half first, then an overlapping retry of the middle; the head is still missing.
+    assert client.put(f"{chunk_url}?offset=6000", content=AUDIO[6000:], headers=HEADERS).status_code == 200
+    progress = client.put(f"{chunk_url}?offset=3000", content=AUDIO[3000:7000], headers=HEADERS).json()
+    assert progress["ranges"] == [[3000, len(AUDIO)]] and not progress["complete"]
+
+    finalize = {"upload_id": upload_id, "title": "Resumed"}
+    early = client.post("/api/tracks/upload/finalize", json=finalize, headers=HEADERS)
+    assert early.status_code == 409 and early.json()["code"] == "UPLOAD_INCOMPLETE"
+
+    client.put(f"{chunk_url}?offset=0", content=AUDIO[:3000], headers=HEADERS)
+    assert client.get(chunk_url, headers=HEADERS).json()["complete"]
+
+    track = client.post("/api/tracks/upload/finalize", json=finalize, headers=HEADERS).json()
+    assert (tmp_path / "storage" / track["audio_url"]).read_bytes() == AUDIO
+    assert track["audio_content_type"] == "audio/flac"
+    assert not (tmp_path / "chunks" / upload_id).exists()
+
+
+def test_chunk_outside_declared_size_is_rejected(make_client, tmp_path):
+    client = uploader_client(make_client, tmp_path)
+    init = client.post(
+        "/api/tracks/upload/initiate",
+        json={"filename": "song.mp3", "content_type": "audio/mpeg", "file_size": 100},
+        headers=HEADERS,
+    ).json()
+    chunk_url = init["presigned_url"]
+
+    assert client.put(f"{chunk_url}?offset=90", content=b"x" * 20, headers=HEADERS).json()["code"] == "CHUNK_OUT_OF_RANGE"
+    assert client.put(f"{chunk_url}?offset=100", content=b"x", headers=HEADERS).status_code == 400
+    assert client.get(chunk_url, headers=HEADERS).json()["ranges"] == []
+    assert client.get(chunk_url, headers={"X-User-Id": "2"}).json()["code"] == "UPLOAD_NOT_FOUND"
+
+
+def test_first_chunk_with_wrong_signature_is_rejected_before_writing(make_client, tmp_path):
+    client = uploader_client(make_client, tmp_path)
+    init = client.post(
+        "/api/tracks/upload/initiate",
+        json={"filename": "song.mp3", "content_type": "audio/mpeg", "file_size": 10000},
+        headers=HEADERS,
+    ).json()
+
+    resp = client.put(f"{init['presigned_url']}?offset=0", content=b"MZ\x90\x00" + b"\x00" * 9996, headers=HEADERS)
+
+    assert resp.json()["code"] == "UNSUPPORTED_MEDIA_TYPE"
+    assert not list((tmp_path / "chunks").rglob("*.part"))
+
+
+def test_declared_size_over_the_upload_cap_is_rejected(make_client, tmp_path):
+    client = uploader_client(make_client, tmp_path)
+
+    resp = client.post(
+        "/api/tracks/upload/initiate",
+        json={"filename": "huge.mp3", "content_type": "audio/mpeg", "file_size": 10**12},
+        headers=HEADERS,
+    )
+
+    assert resp.status_code == 400 and resp.json()["code"] == "FILE_TOO_LARGE"
+
+
+def test_client_filename_cannot_escape_the_storage_root(make_client, tmp_path):
+    client = uploader_client(make_client, tmp_path)
+
+    def initiate(filename):
+        return client.post(
+            "/api/tracks/upload/initiate",
+            json={"filename": filename, "content_type": "audio/mpeg", "file_size": 100},
+            headers=HEADERS,
+        )
+
+    assert initiate("../../../../x.mp3").json()["storage_key"].endswith("/x.mp3")
+    assert initiate("..\\..\\x.mp3").json()["storage_key"].endswith("/x.mp3")
+    assert initiate("..").json()["code"] == "INVALID_FILENAME"
+    assert initiate("uploads/..").json()["code"] == "INVALID_FILENAME"
+
+    with pytest.raises(HTTPException) as exc:
+        ChunkStore(tmp_path / "chunks").assemble("u", 1, tmp_path / "storage" / ".." / "x", tmp_path / "storage")
+    assert exc.value.detail == "INVALID_FILENAME"
@@ -0,0 +1,137 @@
+"""Tests for the S3 read-through disk cache."""
+
+import threading
+import time
+
+from app.api import responses
+from app.core.disk_cache import DiskCache
+from app.models.track import Track
+from app.models.user_profile import UserProfile
+
+OBJECT = bytes(range(10))
+
+
+class FakeS3:
+    def __init__(self, delay: float = 0.0) -> None:
+        self.delay = delay
+        self.calls: list[tuple[int, int]] = []
+
+    def __call__(self, key: str, start: int, end: int) -> tuple[bytes, int]:
+        if key != "track.mp3":
+            raise FileNotFoundError(key)
+        self.calls.append((start, end))
+        time.sleep(self.delay)
+        return OBJECT[start : end + 1], len(OBJECT)
+
+
+def test_range_read_fetches_only_touched_blocks(tmp_path):
+    s3 = FakeS3()
+    cache = DiskCache(tmp_path, max_bytes=1024, block_size=4, fetch=s3)
+
+    assert b"".join(cache.iter_range("track.mp3", 5, 8)) == OBJECT[5:9]
+    assert s3.calls == [(4, 7), (8, 11)]
+
+    assert cache.object_size("track.mp3") == 10
+    assert b"".join(cache.iter_range("track.mp3", 0, 9)) == OBJECT
+    assert s3.calls == [(4, 7), (8, 11), (0, 3)]
+
+    # A new process re-indexes the blocks already on disk.
+    reloaded = DiskCache(tmp_path, max_bytes=1024, block_size=4, fetch=s3)
+    assert reloaded.size_bytes == 10 and b"".join(reloaded.iter_range("track.mp3", 0, 9)) == OBJECT
+    assert len(s3.calls) == 3
+
+
+def test_concurrent_misses_share_one_fetch(tmp_path):
+    s3 = FakeS3(delay=0.05)
+    cache = DiskCache(tmp_path, max_bytes=1024, block_size=4, fetch=s3)
+    results = []
+
+    threads = [threading.Thread(target=lambda: results.append(cache.object_size("track.mp3"))) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert results == [10] * 8
+    assert s3.calls == [(0, 3)]
+
+
+def test_background_eviction_drops_least_recently_used_blocks(tmp_path):
+    cache = DiskCache(tmp_path, max_bytes=8, block_size=4, fetch=FakeS3())
+    list(cache.iter_range("track.mp3", 0, 7))  # blocks 0 and 1
+    list(cache.iter_range("track.mp3", 0, 0))  # touch block 0 again
+    list(cache.iter_range("track.mp3", 8, 9))  # block 2 crosses the bound
+
+    deadline = time.monotonic() + 2
+    while cache.size_bytes > 8 and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+    remaining = sorted(path.name for path in tmp_path.rglob("*.blk"))
+    assert cache.size_bytes <= 8
+    assert "1.blk" not in remaining and "0.blk" in remaining
+
+
+def test_stream_proxies_through_cache_with_ranges(make_client, monkeypatch, tmp_path):
+    cache = DiskCache(tmp_path, max_bytes=1024, block_size=4, fetch=FakeS3())
+    monkeypatch.setattr(responses, "get_disk_cache", lambda: cache)
+    client = make_client(
+        UserProfile(id=1, auth_user_id="1", display_name="owner"),
+        Track(id=1, owner_user_id=1, title="Cached", audio_url="track.mp3"),
+        Track(id=2, owner_user_id=1, title="Gone", audio_url="missing.mp3"),
+        settings={"aws_region": "us-east-1", "storage_presigned_redirects": False},
+    )
+
+    full = client.get("/api/tracks/1/stream", follow_redirects=False)
+    assert full.status_code == 200
+    assert full.content == OBJECT and full.headers["accept-ranges"] == "bytes"
+
+    partial = client.get("/api/tracks/1/stream", headers={"Range": "bytes=3-5"})
+    assert partial.status_code == 206
+    assert partial.content == OBJECT[3:6]
+    assert partial.headers["content-range"] == "bytes 3-5/10"
+
+    suffix = client.get("/api/tracks/1/stream", headers={"Range": "bytes=-2"})
+    assert suffix.content == OBJECT[8:]
+
+    unsatisfiable = client.get("/api/tracks/1/stream", headers={"Range": "bytes=10-"})
+    assert unsatisfiable.status_code == 416
+    assert unsatisfiable.headers["content-range"] == "bytes */10"
+
+    assert client.get("/api/tracks/2/stream").json()["code"] == "AUDIO_NOT_FOUND"
+    assert 'cache_requests_total{cache="disk",result="hit"}' in client.get("/metrics").text
+
+
+def test_evicting_last_block_drops_object_size(tmp_path):
+    s3 = FakeS3()
+    cache = DiskCache(tmp_path, max_bytes=1024, block_size=4, fetch=s3)
+    assert cache.object_size("track.mp3") == 10
+    list(cache.iter_range("track.mp3", 4, 7))
+    (size_file,) = tmp_path.rglob("size")
+
+    cache.max_bytes = 5  # low watermark: 4 bytes
+    cache.evict()  # leaves block 1
+    assert size_file.exists()
+    cache.max_bytes = 0
+    cache.evict()
+
+    assert not size_file.exists() and cache._sizes == {} and cache._blocks == {}
+    cache.max_bytes = 1024
+    assert cache.object_size("track.mp3") == 10
+    assert size_file.exists()
+
+
+def test_object_size_survives_eviction_right_after_the_fetch(tmp_path):
+    s3 = FakeS3()
+    cache = DiskCache(tmp_path, max_bytes=1024, block_size=4, fetch=s3)
+    fetch_block = cache._block
+
+    def block_then_evict(key, index):
+        data = fetch_block(key, index)
+        cache.max_bytes = 0
+        cache.evict()
+        return data
+
+    cache._block = block_then_evict
+
+    assert cache.object_size("track.mp3") == 10
+    assert s3.calls == [(0, 3), (0, 0)]
@@ -0,0 +1,90 @@
+"""Tests for the follow-graph home feed."""
+
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.db.base import Base
+from app.models.feed import FeedItem
+from app.models.follow import Follow
+from app.models.track import Track
+from app.models.user_profile import UserProfile
+from app.services.feed import FeedService, SqlTimelineStore
+
+
+def setup_inmemory_db() -> Session:
+    engine = create_engine("sqlite:///:memory:")
+    Base.metadata.create_all(bind=engine)
+    TestingSessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False)
+    return TestingSessionLocal()
+
+
+def test_feed_merges_pushed_and_pulled_tracks_with_stable_cursor(monkeypatch):
+    monkeypatch.setattr("app.services.feed.settings.feed_fanout_threshold", 1)
+    db = setup_inmemory_db()
+    for user_id in (1, 2, 3, 4):
+        db.add(UserProfile(id=user_id, auth_user_id=str(user_id), display_name=f"user-{user_id}"))
+    db.commit()
+
+    service = FeedService(db, store=SqlTimelineStore(db))
+    service.follow(follower_id=2, following_id=1)
+    service.follow(follower_id=2, following_id=3)
+    service.follow(follower_id=4, following_id=3)  # user 3 now exceeds the threshold
+
+    base = datetime(2026, 1, 1)
+    for i, owner in enumerate([1, 3, 1, 3, 1]):
+        track = Track(id=i + 1, owner_user_id=owner, title=f"t{i}", created_at=base + timedelta(minutes=i))
+        db.add(track)
+        db.commit()
+        service.fan_out(track)
+
+    # Only the small account was pushed; the large one is pulled at read time.
+    assert db.query(FeedItem).filter(FeedItem.user_id == 2).count() == 3
+
+    seen, cursor = [], None
+    while True:
+        items, cursor = service.timeline(2, cursor=cursor, limit=2)
+        seen.extend(t.id for t in items)
+        if cursor is None:
+            break
+    assert seen == [5, 4, 3, 2, 1]
+
+    service.unfollow(follower_id=2, following_id=1)
+    items, _ = service.timeline(2, limit=10)
+    assert [t.id for t in items] == [4, 2]
+    assert db.get(UserProfile, 1).follower_count == 0
+
+
+def test_sql_push_skips_existing_rows_and_trims_to_cap(monkeypatch):
+    monkeypatch.setattr("app.services.feed.settings.feed_timeline_cap", 3)
+    db = setup_inmemory_db()
+    for user_id in (1, 2, 3):
+        db.add(UserProfile(id=user_id, auth_user_id=str(user_id), display_name=f"user-{user_id}"))
+    base = datetime(2026, 1, 1)
+    tracks = [Track(id=i, owner_user_id=1, title=f"t{i}", created_at=base + timedelta(minutes=i)) for i in range(1, 6)]
+    db.add_all(tracks)
+    db.commit()
+
+    store = SqlTimelineStore(db)
+    store.backfill(2, tracks[:1])  # user 2 already holds track 1
+    store.push([2, 3], tracks[0])
+    for track in tracks[1:]:
+        store.push([2, 3], track)
+
+    for user_id in (2, 3):
+        assert [track_id for _, track_id in store.page(user_id, None, 10)] == [5, 4, 3]
+
+
+def test_created_track_reaches_followers_after_the_response(make_client):
+    client = make_client(
+        UserProfile(id=1, auth_user_id="1", display_name="creator", follower_count=1),
+        UserProfile(id=2, auth_user_id="2", display_name="fan"),
+        Follow(follower_id=2, following_id=1),
+    )
+
+    created = client.post("/api/tracks", json={"title": "New"}, headers={"X-User-Id": "1"})
+    assert created.status_code == 201
+
+    with client.session_factory() as db:
+        assert [(row.user_id, row.track_id) for row in db.query(FeedItem)] == [(2, created.json()["id"])]
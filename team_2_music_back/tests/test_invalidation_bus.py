@@ -0,0 +1,168 @@
+"""Tests for cross-worker cache invalidation."""
+
+import asyncio
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.api import deps
+from app.core.cache import ResponseCache, track_tag
+from app.core.invalidation import InvalidationMessage, LocalInvalidationBus
+from app.core.jwt import JWKSClient
+from app.db.base import Base
+from app.models.track import Track
+from app.models.user_profile import UserProfile
+
+
+def test_invalidation_reaches_peer_workers():
+    peers: list[LocalInvalidationBus] = []
+    worker_a = ResponseCache(max_entries=10, ttl=60, bus=LocalInvalidationBus(peers))
+    bus_b = LocalInvalidationBus(peers)
+    worker_b = ResponseCache(max_entries=10, ttl=60, bus=bus_b)
+
+    for cache in (worker_a, worker_b):
+        cache.set("tracks:detail:1", b"{}", tags=["track:1"])
+        cache.set("tracks:detail:2", b"{}", tags=["track:2"])
+
+    worker_a.invalidate_tags("track:1")
+
+    assert worker_a.get("tracks:detail:1") is None
+    assert worker_b.get("tracks:detail:1") is None
+    assert worker_b.get("tracks:detail:2") is not None
+    assert bus_b.stats.count == 1
+
+
+class FakeRedis:
+    """Just enough of the redis-py surface for ResponseCache's shared tier."""
+
+    def __init__(self) -> None:
+        self.values: dict[str, bytes] = {}
+        self.sets: dict[str, set[bytes]] = {}
+
+    def pipeline(self, transaction: bool = True) -> "FakePipeline":
+        return FakePipeline(self)
+
+    def delete(self, *names: str) -> None:
+        for name in names:
+            self.values.pop(name, None)
+            self.sets.pop(name, None)
+
+
+class FakePipeline:
+    def __init__(self, redis: FakeRedis) -> None:
+        self.redis = redis
+        self.replies: list = []
+
+    def get(self, name: str) -> "FakePipeline":
+        self.replies.append(self.redis.values.get(name))
+        return self
+
+    def ttl(self, name: str) -> "FakePipeline":
+        self.replies.append(60 if name in self.redis.values else -2)
+        return self
+
+    def set(self, name: str, value: bytes, ex: int) -> "FakePipeline":
+        self.redis.values[name] = value
+        return self
+
+    def sadd(self, name: str, member: str) -> "FakePipeline":
+        self.redis.sets.setdefault(name, set()).add(member.encode())
+        return self
+
+    def expire(self, name: str, seconds: int) -> "FakePipeline":
+        return self
+
+    def smembers(self, name: str) -> "FakePipeline":
+        self.replies.append(set(self.redis.sets.get(name, set())))
+        return self
+
+    def delete(self, name: str) -> "FakePipeline":
+        self.redis.delete(name)
+        self.replies.append(1)
+        return self
+
+    def execute(self) -> list:
+        return self.replies
+
+
+def test_entries_promoted_from_redis_keep_their_tags():
+    redis, peers = FakeRedis(), []
+    worker_a = ResponseCache(max_entries=10, ttl=60, redis_client=redis, bus=LocalInvalidationBus(peers))
+    worker_b = ResponseCache(max_entries=10, ttl=60, redis_client=redis, bus=LocalInvalidationBus(peers))
+    worker_a.set("tracks:detail:1", b"{}", tags=["track:1", "tracks"])
+
+    promoted = worker_b.get("tracks:detail:1")  # Redis hit, copied into worker B's LRU
+    assert promoted is not None and promoted.tags == {"track:1", "tracks"}
+
+    # Drop the shared copy behind the cache's back so only the bus can clear worker B.
+    redis.values.clear()
+    worker_a.invalidate_tags("track:1")
+
+    assert worker_b.get("tracks:detail:1") is None
+
+
+def test_tag_invalidation_clears_shared_entries_and_tag_sets():
+    redis = FakeRedis()
+    cache = ResponseCache(max_entries=10, ttl=60, redis_client=redis)
+    cache.set("tracks:detail:1", b"{}", tags=["track:1"])
+    cache.set("tracks:detail:2", b"{}", tags=["track:2"])
+
+    cache.invalidate_tags("track:1")
+
+    assert set(redis.values) == {"cache:resp:tracks:detail:2"}
+    assert set(redis.sets) == {"cache:tag:track:2"}
+
+
+def test_key_invalidation_and_other_cache_names_are_isolated():
+    bus = LocalInvalidationBus()
+    seen: list[tuple[list[str], list[str]]] = []
+    bus.register("jwks", lambda keys, tags: seen.append((keys, tags)))
+    cache = ResponseCache(max_entries=10, ttl=60, bus=bus)
+    cache.set("k", b"v")
+
+    cache.invalidate_keys("k")
+
+    assert cache.get("k") is None
+    assert seen == []
+
+
+def test_message_round_trips_through_json():
+    message = InvalidationMessage(cache="response", keys=["a"], tags=["t"], origin="w1", sent_at=1.5)
+    assert InvalidationMessage.from_json(message.to_json()) == message
+
+
+def test_jwks_refresh_drops_peer_copies_and_is_rate_limited():
+    peers: list[LocalInvalidationBus] = []
+    client_a = JWKSClient(bus=LocalInvalidationBus(peers))
+    client_b = JWKSClient(bus=LocalInvalidationBus(peers))
+    for client in (client_a, client_b):
+        client._write_local_cache({"keys": [{"kid": "old"}]})
+
+    async def fetch() -> dict:
+        return {"keys": [{"kid": "new"}]}
+
+    client_a.get_jwks = fetch
+    assert asyncio.run(client_a.refresh()) == {"keys": [{"kid": "new"}]}
+    assert client_b._read_from_local_cache() is None
+    assert asyncio.run(client_a.refresh()) is None
+
+
+def test_profile_rename_invalidates_owned_tracks_on_peers(monkeypatch):
+    engine = create_engine("sqlite:///:memory:")
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine)()
+    db.add(UserProfile(id=1, auth_user_id="1", display_name="old name"))
+    db.add(Track(id=1, owner_user_id=1, title="a"))
+    db.commit()
+
+    peers: list[LocalInvalidationBus] = []
+    worker_a = ResponseCache(max_entries=10, ttl=60, bus=LocalInvalidationBus(peers))
+    worker_b = ResponseCache(max_entries=10, ttl=60, bus=LocalInvalidationBus(peers))
+    worker_b.set("tracks:detail:1", b"{}", tags=[track_tag(1)])
+    monkeypatch.setattr(deps, "get_response_cache", lambda: worker_a)
+
+    deps._ensure_local_user_profile(db, {"id": 1, "nickname": "old name"})
+    assert worker_b.get("tracks:detail:1") is not None
+
+    deps._ensure_local_user_profile(db, {"id": 1, "nickname": "new name"})
+    assert worker_b.get("tracks:detail:1") is None
@@ -0,0 +1,82 @@
+"""Tests for HyperLogLog unique-listener counts."""
+
+import numpy as np
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.core.cache import ResponseCache, track_tag
+from app.core.hyperloglog import HyperLogLog
+from app.db.base import Base
+from app.models.listener_sketch import ListenerSketch
+from app.models.track import Track
+from app.models.user_profile import UserProfile
+from app.services.interactions import InteractionService
+from app.services.listeners import ListenerStatsService
+
+
+def setup_inmemory_db() -> Session:
+    engine = create_engine("sqlite:///:memory:")
+    Base.metadata.create_all(bind=engine)
+    TestingSessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False)
+    return TestingSessionLocal()
+
+
+def test_hyperloglog_error_and_merge():
+    left, right = HyperLogLog(), HyperLogLog()
+    left.add(np.arange(0, 60_000))
+    right.add(np.arange(40_000, 100_000))
+    left.merge(HyperLogLog.from_bytes(right.to_bytes()))
+
+    assert abs(left.count() - 100_000) / 100_000 < 0.03
+
+
+def test_recorded_plays_update_track_and_owner_counts():
+    db = setup_inmemory_db()
+    for user_id in (1, 2, 3):
+        db.add(UserProfile(id=user_id, auth_user_id=str(user_id), display_name=f"user-{user_id}"))
+    db.add(Track(id=1, owner_user_id=1, title="a"))
+    db.add(Track(id=2, owner_user_id=1, title="b"))
+    db.commit()
+
+    service = InteractionService(db)
+    for track_id, user_id in [(1, 2), (1, 2), (1, 3), (2, 3)]:
+        service.record_play(track_id=track_id, user_id=user_id)
+
+    stats = ListenerStatsService(db, redis_client=None)
+    assert stats.count_tracks([1, 2]) == {1: 2, 2: 1}
+    assert stats.count_owner(1) == 2
+
+
+def test_concurrent_first_play_retries_instead_of_failing(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'listeners.db'}")
+    Base.metadata.create_all(bind=engine)
+    make_session = sessionmaker(bind=engine, autoflush=False, autocommit=False)
+    db = make_session()
+
+    def other_worker_inserts_first(session, flush_context, instances):
+        rival = make_session()
+        hll = HyperLogLog()
+        hll.add([7])
+        rival.add(ListenerSketch(key="track:1", registers=hll.to_bytes()))
+        rival.commit()
+        rival.close()
+
+    event.listen(db, "before_flush", other_worker_inserts_first, once=True)
+    stats = ListenerStatsService(db, redis_client=None)
+    stats.record_play(track_id=1, owner_user_id=1, user_id=8)
+
+    assert stats.count_tracks([1]) == {1: 2}
+    assert stats.count_owner(1) == 1
+
+
+def test_recorded_play_invalidates_cached_track_detail():
+    db = setup_inmemory_db()
+    db.add(UserProfile(id=1, auth_user_id="1", display_name="user-1"))
+    db.add(Track(id=1, owner_user_id=1, title="a"))
+    db.commit()
+    cache = ResponseCache(max_entries=10, ttl=60)
+    cache.set("tracks:detail:1", b"{}", tags=[track_tag(1)])
+
+    InteractionService(db, cache=cache).record_play(track_id=1, user_id=1)
+
+    assert cache.get("tracks:detail:1") is None
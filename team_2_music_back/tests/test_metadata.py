@@ -0,0 +1,138 @@
+"""Tests for process-pool audio metadata extraction."""
+
+import os
+import struct
+from io import BytesIO
+
+from mutagen.flac import FLAC, Picture
+from mutagen.id3 import APIC, ID3, TIT2, TPE1
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.core.storage import StorageService
+from app.db.base import Base
+from app.models.user_profile import UserProfile
+from app.services import tracks
+from app.services.metadata import MetadataExtractor, StorageReader, extract_metadata, parse_metadata
+
+# 100 MPEG-1 Layer III frames, 128 kbps, 44.1 kHz (417 bytes each): ~2.6s of "audio".
+MP3_FRAMES = (b"\xff\xfb\x90\x00" + b"\x00" * 413) * 100
+
+
+def write_mp3(path) -> None:
+    path.write_bytes(MP3_FRAMES)
+    tags = ID3()
+    tags.add(TIT2(encoding=3, text="Night Drive"))
+    tags.add(TPE1(encoding=3, text="Stitch"))
+    tags.add(APIC(encoding=3, mime="image/png", type=0, desc="other", data=b"not the cover"))
+    tags.add(APIC(encoding=3, mime="image/jpeg", type=3, desc="front", data=b"front cover"))
+    tags.save(path)
+
+
+def write_flac(path) -> None:
+    # STREAMINFO only: 44.1 kHz, stereo, 16-bit, 3 seconds of samples.
+    packed = (44100 << 44) | (1 << 41) | (15 << 36) | (44100 * 3)
+    streaminfo = struct.pack(">HH", 4096, 4096) + b"\x00" * 6 + packed.to_bytes(8, "big") + b"\x00" * 16
+    path.write_bytes(b"fLaC" + bytes([0x80]) + len(streaminfo).to_bytes(3, "big") + streaminfo)
+
+    audio = FLAC(path)
+    for picture_type, data in ((4, b"back cover"), (3, b"front cover")):
+        picture = Picture()
+        picture.type, picture.mime, picture.data = picture_type, "image/png", data
+        audio.add_picture(picture)
+    audio["title"] = "Lossless"
+    audio.save()
+
+
+def test_mp3_returns_front_cover_tags_and_duration(tmp_path):
+    path = tmp_path / "song.mp3"
+    write_mp3(path)
+
+    meta = extract_metadata(str(path))
+
+    assert meta.cover == (b"front cover", "image/jpeg")
+    assert meta.tags == {"title": "Night Drive", "artist": "Stitch"}
+    assert round(meta.duration_seconds) == 3
+    assert meta.bitrate == 128000 and meta.sample_rate == 44100
+
+
+def test_flac_front_cover_and_streaminfo(tmp_path):
+    path = tmp_path / "song.flac"
+    write_flac(path)
+
+    meta = extract_metadata(str(path))
+
+    assert meta.cover == (b"front cover", "image/png")
+    assert meta.tags["title"] == "Lossless"
+    assert meta.duration_seconds == 3.0 and meta.sample_rate == 44100 and meta.channels == 2
+
+
+def test_storage_reader_fetches_header_regions_only(tmp_path):
+    path = tmp_path / "song.mp3"
+    write_mp3(path)
+    blob = path.read_bytes() + b"\x00" * 5_000_000  # a long tail the parser should never read
+    fetched = []
+
+    def fetch(key, start, end):
+        fetched.append(min(end, len(blob) - 1) - start + 1)
+        return blob[start : end + 1], len(blob)
+
+    meta = parse_metadata(StorageReader(fetch, "song.mp3"))
+
+    assert meta.cover == (b"front cover", "image/jpeg")
+    assert sum(fetched) < 200_000
+
+
+def test_process_pool_extraction_and_unrecognised_files(tmp_path):
+    path = tmp_path / "song.flac"
+    write_flac(path)
+    junk = tmp_path / "junk.mp3"
+    junk.write_bytes(b"<html>definitely not audio</html>")
+    extractor = MetadataExtractor(workers=1, timeout=30)
+    try:
+        assert extractor.extract(path).tags["title"] == "Lossless"
+        assert extractor.extract(junk) is None
+        assert extractor.extract(tmp_path / "missing.mp3") is None
+    finally:
+        extractor.shutdown()
+
+
+def test_timed_out_worker_is_killed_and_pool_replaced(tmp_path):
+    path = tmp_path / "song.flac"
+    write_flac(path)
+    stuck = tmp_path / "stuck.mp3"
+    os.mkfifo(stuck)  # opening it blocks forever: a parse that never returns
+    extractor = MetadataExtractor(workers=1, timeout=30)
+    try:
+        assert extractor.extract(path) is not None  # warm up: spawning a worker is slow
+        workers = list(extractor._pool._processes.values())
+
+        extractor.timeout = 1
+        assert extractor.extract(stuck) is None
+        extractor.timeout = 30
+
+        for process in workers:
+            process.join(timeout=5)
+            assert not process.is_alive()
+        assert extractor.extract(path).tags["title"] == "Lossless"
+    finally:
+        extractor.shutdown()
+
+
+def test_direct_upload_fills_duration_and_extracted_cover(monkeypatch, tmp_path):
+    engine = create_engine("sqlite:///:memory:")
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine)()
+    db.add(UserProfile(id=1, auth_user_id="1", display_name="tester"))
+    db.commit()
+    monkeypatch.setattr(tracks, "get_metadata_extractor", lambda: MetadataExtractor(workers=0))
+
+    source = tmp_path / "source.mp3"
+    write_mp3(source)
+    upload = type("Upload", (), {"filename": "song.mp3", "content_type": "audio/mpeg", "file": BytesIO(source.read_bytes())})
+    service = tracks.TrackService(db=db, storage=StorageService(bucket="test-bucket", base_path=str(tmp_path / "storage")))
+
+    track = service.upload_direct(file=upload, cover_file=None, title="t", description=None, owner_user_id=1)
+
+    assert track.duration_seconds == 3
+    assert (tmp_path / "storage" / track.cover_url).read_bytes() == b"front cover"
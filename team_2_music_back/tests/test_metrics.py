@@ -0,0 +1,31 @@
+"""Tests for the Prometheus middleware and /metrics endpoint."""
+
+from app.core.query_audit import instrument_engine
+from app.models.track import Track
+from app.models.user_profile import UserProfile
+
+
+def seed_rows() -> list:
+    return [UserProfile(id=1, auth_user_id="1", display_name="tester"), Track(id=1, owner_user_id=1, title="Hello")]
+
+
+def _sample(body: str, prefix: str) -> float:
+    for line in body.splitlines():
+        if line.startswith(prefix):
+            return float(line.rsplit(" ", 1)[1])
+    raise AssertionError(f"{prefix} not found")
+
+
+def test_metrics_use_route_templates_and_count_queries(make_client):
+    client = make_client(*seed_rows(), on_engine=instrument_engine)
+
+    assert client.get("/api/tracks/1").status_code == 200
+    assert client.get("/api/tracks/999").status_code == 404
+
+    body = client.get("/metrics").text
+    route = 'route="/api/tracks/{track_id}"'
+    assert _sample(body, f'http_requests_total{{method="GET",{route},status="200"}}') >= 1
+    assert _sample(body, f'http_requests_total{{method="GET",{route},status="404"}}') >= 1
+    assert "/api/tracks/999" not in body
+    assert _sample(body, f"db_queries_per_request_sum{{{route}}}") > 0
+    assert 'cache_requests_total{cache="response",result="miss"}' in body
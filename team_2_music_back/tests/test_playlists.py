@@ -0,0 +1,56 @@
+"""Tests for playlist ordering with fractional keys."""
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.db.base import Base
+from app.models.playlist import PlaylistTrack
+from app.models.track import Track
+from app.models.user_profile import UserProfile
+from app.services.playlists import PlaylistService
+
+
+def setup_inmemory_db() -> Session:
+    engine = create_engine("sqlite:///:memory:")
+    Base.metadata.create_all(bind=engine)
+    TestingSessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False)
+    return TestingSessionLocal()
+
+
+def _order(service: PlaylistService, playlist_id: int) -> list[int]:
+    ids, cursor = [], None
+    while True:
+        entries, cursor = service.list_tracks(playlist_id, viewer_id=1, cursor=cursor, limit=2)
+        ids.extend(e.track_id for e in entries)
+        if cursor is None:
+            return ids
+
+
+def test_reorder_writes_one_row_and_rebalances_when_gap_exhausted():
+    db = setup_inmemory_db()
+    db.add(UserProfile(id=1, auth_user_id="1", display_name="owner"))
+    for track_id in range(1, 6):
+        db.add(Track(id=track_id, owner_user_id=1, title=f"t{track_id}"))
+    db.commit()
+
+    service = PlaylistService(db)
+    playlist = service.create_playlist(owner_user_id=1, title="mix", description=None, is_public=False)
+    for track_id in (1, 2, 3, 4):
+        service.add_track(playlist.id, owner_user_id=1, track_id=track_id)
+    service.add_track(playlist.id, owner_user_id=1, track_id=5, after_track_id=1)
+    assert _order(service, playlist.id) == [1, 5, 2, 3, 4]
+
+    before = {e.track_id: e.order_key for e in db.query(PlaylistTrack)}
+    service.move_track(playlist.id, owner_user_id=1, track_id=4, after_track_id=None)
+    after = {e.track_id: e.order_key for e in db.query(PlaylistTrack)}
+    assert [t for t in before if before[t] != after[t]] == [4]
+    assert _order(service, playlist.id) == [4, 1, 5, 2, 3]
+
+    # Repeatedly squeezing into the same gap eventually forces a renumbering.
+    for _ in range(60):
+        service.move_track(playlist.id, owner_user_id=1, track_id=3, after_track_id=4)
+        service.move_track(playlist.id, owner_user_id=1, track_id=1, after_track_id=4)
+    assert _order(service, playlist.id) == [4, 1, 3, 5, 2]
+
+    service.remove_track(playlist.id, owner_user_id=1, track_id=5)
+    assert _order(service, playlist.id) == [4, 1, 3, 2]
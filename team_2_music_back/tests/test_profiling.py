@@ -0,0 +1,58 @@
+"""Tests for the sampling request profiler."""
+
+from collections import Counter
+
+import anyio
+
+from app.core.profiling import ProfileStore, sign_token, verify_token
+from app.models.track import Track
+from app.models.user_profile import UserProfile
+
+
+def test_tokens_expire_and_must_match_secret():
+    token = sign_token("s3cret", ttl=60, now=1000)
+
+    assert verify_token(token, "s3cret", now=1030)
+    assert not verify_token(token, "s3cret", now=1061)
+    assert not verify_token(token, "other", now=1030)
+    assert not verify_token("garbage", "s3cret", now=1030)
+
+
+def test_store_keeps_newest_files(tmp_path):
+    store = ProfileStore(tmp_path, max_files=2)
+    for _ in range(3):
+        store.write("GET", "/api/tracks/{track_id}", 0.012, Counter({"a;b": 2, "a": 1}))
+
+    profiles = store.list()
+    assert len(profiles) == 2
+    assert profiles[0].route == "api-tracks-track-id"
+    assert profiles[0].samples == 3
+    assert store.path_for("../../etc/passwd") is None
+
+
+def test_signed_request_is_profiled_and_listed(make_client, tmp_path):
+    # FileResponse imports anyio's file helpers lazily. Importing them here keeps
+    # that compile out of a sampled request: CPython < 3.11.8 can raise a spurious
+    # "AST constructor recursion depth mismatch" when threads compile concurrently.
+    anyio.open_file
+    client = make_client(
+        UserProfile(id=1, auth_user_id="1", display_name="tester"),
+        Track(id=1, owner_user_id=1, title="Hello"),
+        settings={"profiling_secret": "s3cret", "profiling_interval_ms": 0.2, "profiling_dir": str(tmp_path)},
+    )
+    token = sign_token("s3cret")
+
+    assert client.get("/api/tracks/1").status_code == 200
+    assert list(tmp_path.iterdir()) == []
+
+    assert client.get("/api/tracks/1", headers={"X-Profile": token}).status_code == 200
+    assert client.get("/api/admin/profiles").status_code == 403
+
+    listing = client.get("/api/admin/profiles", headers={"X-Profile": token})
+    assert listing.status_code == 200
+    [profile] = listing.json()
+    assert profile["route"] == "api-tracks-track-id"
+    assert profile["samples"] > 0
+
+    body = client.get(f"/api/admin/profiles/{profile['name']}", headers={"X-Profile": token}).text
+    assert all(line.rsplit(" ", 1)[1].isdigit() for line in body.splitlines())
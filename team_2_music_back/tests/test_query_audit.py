@@ -0,0 +1,48 @@
+"""Tests for per-request SQL auditing and query budgets."""
+
+import logging
+
+from app.core.query_audit import fingerprint, instrument_engine
+from app.models.track import Track
+from app.models.user_profile import UserProfile
+from app.models.vote import Like
+
+
+def seed_rows(tracks: int = 30) -> list:
+    rows = [UserProfile(id=user_id, auth_user_id=str(user_id), display_name=f"user {user_id}") for user_id in range(1, 6)]
+    for track_id in range(1, tracks + 1):
+        rows.append(Track(id=track_id, owner_user_id=track_id % 5 + 1, title=f"track {track_id}"))
+        rows.append(Like(user_id=track_id % 5 + 1, track_id=track_id))
+    return rows
+
+
+def test_fingerprint_ignores_literals_and_in_list_length():
+    assert fingerprint("SELECT * FROM t WHERE id IN (?, ?, ?)") == fingerprint("SELECT * FROM t WHERE id IN (?)")
+    assert fingerprint("SELECT * FROM t WHERE name = 'a' AND n = 3") == fingerprint(
+        "SELECT * FROM t WHERE name = 'bb'  AND n = 42"
+    )
+
+
+def test_track_endpoints_stay_within_query_budget(make_client, query_budget):
+    client = make_client(*seed_rows(), on_engine=instrument_engine)
+
+    with query_budget(4):
+        assert client.get("/api/tracks?limit=30").status_code == 200
+    with query_budget(4):
+        assert client.get("/api/tracks/7").status_code == 200
+    with query_budget(2):
+        assert client.get("/api/tracks?limit=30&fields=title,owner_display_name,likes_count").status_code == 200
+
+
+def test_debug_header_and_repeat_warning(make_client, caplog):
+    client = make_client(
+        *seed_rows(tracks=1),
+        settings={"query_debug_header": True, "query_repeat_warn": 1},
+        on_engine=instrument_engine,
+    )
+
+    with caplog.at_level(logging.WARNING, logger="app.core.query_audit"):
+        resp = client.get("/api/tracks/1")
+
+    assert resp.headers["x-db-queries"].startswith("count=")
+    assert "/api/tracks/{track_id} ran" in caplog.text
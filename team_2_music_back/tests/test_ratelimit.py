@@ -0,0 +1,104 @@
+"""Tests for token-bucket rate limiting."""
+
+import ipaddress
+import time
+
+import pytest
+
+from app.core import ratelimit
+from app.core.ratelimit import MemoryBuckets, client_ip, parse_rate
+from app.models.track import Track
+from app.models.user_profile import UserProfile
+
+
+def test_parse_rate():
+    assert parse_rate("10/min") == (10, 10 / 60)
+    assert parse_rate("5/30s") == (5, 5 / 30)
+    with pytest.raises(ValueError):
+        parse_rate("ten per minute")
+
+
+def test_memory_buckets_refill_over_time(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(time, "monotonic", lambda: now[0])
+    buckets = MemoryBuckets()
+    spec = [("user:1", 2, 1.0)]
+
+    assert buckets.take(spec) == (True, 0)
+    assert buckets.take(spec) == (True, 0)
+    allowed, wait = buckets.take(spec)
+    assert not allowed and wait == pytest.approx(1.0)
+
+    now[0] += 1.0
+    assert buckets.take(spec)[0]
+
+
+def test_all_buckets_must_allow_and_none_are_debited_on_reject():
+    buckets = MemoryBuckets()
+    assert buckets.take([("ip", 10, 0.001), ("user", 1, 0.001)])[0]
+    assert not buckets.take([("ip", 10, 0.001), ("user", 1, 0.001)])[0]
+    # The rejected call did not spend from the IP bucket: 9 tokens remain.
+    assert all(buckets.take([("ip", 10, 0.001)])[0] for _ in range(9))
+    assert not buckets.take([("ip", 10, 0.001)])[0]
+
+
+def test_check_costs_well_under_a_millisecond():
+    buckets = MemoryBuckets()
+    spec = [("ip:1.2.3.4", 1_000_000, 1.0), ("user:abc", 1_000_000, 1.0)]
+    start = time.perf_counter()
+    for _ in range(10_000):
+        buckets.take(spec)
+    assert (time.perf_counter() - start) / 10_000 < 0.001
+
+
+def test_spammy_user_is_rejected_before_auth_and_db(make_client):
+    ratelimit.get_rate_limiter.cache_clear()
+    client = make_client(
+        *(UserProfile(id=user_id, auth_user_id=str(user_id), display_name=f"user {user_id}") for user_id in (1, 2, 3)),
+        Track(id=1, owner_user_id=1, title="Hello"),
+        settings={
+            "rate_limit_rules": {"POST /interactions/tracks/{track_id}/like": "2/min"},
+            "rate_limit_ip_multiplier": 2.0,
+        },
+    )
+
+    codes = [client.post("/api/interactions/tracks/1/like", headers={"X-User-Id": "2"}).status_code for _ in range(3)]
+    assert 429 not in codes[:2] and codes[2] == 429
+
+    rejected = client.post("/api/interactions/tracks/1/like", headers={"X-User-Id": "2"})
+    assert rejected.json()["code"] == "RATE_LIMITED"
+    assert int(rejected.headers["retry-after"]) >= 1
+
+    # Another user from the same IP still has budget, until the IP bucket (2x) runs dry.
+    assert client.post("/api/interactions/tracks/1/like", headers={"X-User-Id": "3"}).status_code != 429
+    assert client.get("/api/tracks/1").status_code == 200
+
+
+def test_forwarded_for_is_only_believed_from_trusted_proxies():
+    proxies = [ipaddress.ip_network("10.0.0.0/8")]
+
+    def scope(peer: str, forwarded: str) -> dict:
+        return {"client": (peer, 1234), "headers": [(b"x-forwarded-for", forwarded.encode())]}
+
+    # Direct clients cannot pick their bucket by sending the header.
+    assert client_ip(scope("203.0.113.9", "1.1.1.1"), proxies) == "203.0.113.9"
+    assert client_ip(scope("203.0.113.9", "1.1.1.1"), []) == "203.0.113.9"
+    # Behind the proxies, spoofed hops left of the first untrusted address are ignored.
+    assert client_ip(scope("10.0.0.2", "1.1.1.1, 198.51.100.7, 10.0.0.1"), proxies) == "198.51.100.7"
+    assert client_ip(scope("10.0.0.2", "10.0.0.1"), proxies) == "10.0.0.2"
+
+
+def test_ip_bucket_can_be_disabled(make_client):
+    ratelimit.get_rate_limiter.cache_clear()
+    client = make_client(
+        *(UserProfile(id=user_id, auth_user_id=str(user_id), display_name=f"user {user_id}") for user_id in (1, 2, 3)),
+        Track(id=1, owner_user_id=1, title="Hello"),
+        settings={
+            "rate_limit_rules": {"POST /interactions/tracks/{track_id}/like": "1/min"},
+            "rate_limit_ip_multiplier": 0,
+        },
+    )
+
+    for user_id in ("1", "2", "3"):
+        assert client.post("/api/interactions/tracks/1/like", headers={"X-User-Id": user_id}).status_code != 429
+    assert client.post("/api/interactions/tracks/1/like", headers={"X-User-Id": "1"}).status_code == 429
@@ -0,0 +1,80 @@
+"""Tests for item-to-item recommendations."""
+
+import numpy as np
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.db.base import Base
+from app.models.play_history import PlayHistory
+from app.models.track import Track
+from app.models.user_profile import UserProfile
+from app.models.vote import Like
+from app.services.recommendations import RecommendationService, build_interaction_matrix, compute_neighbors
+
+
+def setup_inmemory_db() -> Session:
+    engine = create_engine("sqlite:///:memory:")
+    Base.metadata.create_all(bind=engine)
+    TestingSessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False)
+    return TestingSessionLocal()
+
+
+def test_chunked_neighbors_match_dense_cosine():
+    rng = np.random.default_rng(3)
+    users = rng.integers(0, 200, size=3000)
+    tracks = rng.integers(0, 120, size=3000)
+    data = build_interaction_matrix(users, tracks, np.ones(3000))
+
+    rows, neighbors, scores = compute_neighbors(data.matrix, k=5, chunk_size=16, workers=1)
+
+    dense = data.matrix.toarray()
+    unit = dense / np.linalg.norm(dense, axis=0)
+    cosine = unit.T @ unit
+    np.fill_diagonal(cosine, -1)
+    for row, found in zip(rows, scores):
+        np.testing.assert_allclose(found, np.sort(cosine[row])[::-1][:5], rtol=1e-5)
+
+
+def test_build_and_serve_similar_tracks():
+    db = setup_inmemory_db()
+    for user_id in range(1, 5):
+        db.add(UserProfile(id=user_id, auth_user_id=str(user_id), display_name=f"user-{user_id}"))
+    for track_id in range(1, 5):
+        db.add(Track(id=track_id, owner_user_id=1, title=f"t{track_id}"))
+    # Users 1-3 like tracks 1 and 2 together; track 3 shares one listener; track 4 none.
+    for user_id in (1, 2, 3):
+        db.add(Like(user_id=user_id, track_id=1))
+        db.add(Like(user_id=user_id, track_id=2))
+    db.add(PlayHistory(user_id=3, track_id=3))
+    db.add(PlayHistory(user_id=4, track_id=4))
+    db.commit()
+
+    service = RecommendationService(db)
+    assert service.build(full=True, workers=1) == 4
+
+    similar = service.similar(1)
+    assert [t.id for t in similar] == [2, 3]
+    assert similar[0].similarity > similar[1].similarity
+
+    assert service.build(workers=1) == 0  # nothing new since the last run
+    db.add(PlayHistory(user_id=4, track_id=1))
+    db.commit()
+    # Track 1 changed, and so did its similarity to every track sharing a listener.
+    assert service.build(workers=1) == 4
+    assert 4 in [t.id for t in service.similar(1)]
+    assert 1 in [t.id for t in service.similar(4)]
+
+
+def test_similar_for_missing_track_is_404():
+    db = setup_inmemory_db()
+    db.add(UserProfile(id=1, auth_user_id="1", display_name="user-1"))
+    db.add(Track(id=1, owner_user_id=1, title="lonely"))
+    db.commit()
+    service = RecommendationService(db)
+
+    assert service.similar(1) == []
+    with pytest.raises(HTTPException) as exc:
+        service.similar(999)
+    assert exc.value.status_code == 404 and exc.value.detail == "TRACK_NOT_FOUND"
@@ -0,0 +1,139 @@
+"""Tests for the response cache and ETag handling."""
+
+import threading
+import time
+
+from app.core.cache import ResponseCache, etag_matches, get_response_cache
+from app.models.track import Track
+from app.models.user_profile import UserProfile
+
+
+def seed_rows() -> list:
+    return [UserProfile(id=1, auth_user_id="1", display_name="tester"), Track(id=1, owner_user_id=1, title="Hello")]
+
+
+def test_lru_evicts_oldest_and_invalidates_by_tag():
+    cache = ResponseCache(max_entries=2, ttl=60)
+    cache.set("a", b"1", tags=["t1"])
+    cache.set("b", b"2", tags=["t2"])
+    cache.get("a")
+    cache.set("c", b"3", tags=["t1"])
+
+    assert cache.get("b") is None
+    assert cache.get("a") is not None
+
+    cache.invalidate_tags("t1")
+    assert cache.get("a") is None
+    assert cache.get("c") is None
+
+
+def test_concurrent_misses_are_coalesced():
+    cache = ResponseCache(max_entries=10, ttl=60)
+    calls = []
+
+    def loader() -> bytes:
+        calls.append(1)
+        time.sleep(0.05)
+        return b"payload"
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get_or_load("k", loader))) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert len(calls) == 1
+    assert {r.body for r in results} == {b"payload"}
+
+
+def test_load_that_races_an_invalidation_is_not_cached():
+    cache = ResponseCache(max_entries=10, ttl=60)
+    version = ["old"]
+    loading, release = threading.Event(), threading.Event()
+
+    def slow_loader() -> bytes:
+        body = version[0].encode()
+        loading.set()
+        release.wait()
+        return body
+
+    leader = []
+    thread = threading.Thread(target=lambda: leader.append(cache.get_or_load("k", slow_loader, tags=["t"])))
+    thread.start()
+    loading.wait()
+    waiter = []
+    waiting = threading.Thread(target=lambda: waiter.append(cache.get_or_load("k", lambda: version[0].encode(), tags=["t"])))
+    waiting.start()
+
+    # A write lands after the leader read the old row but before it stored it.
+    version[0] = "new"
+    cache.invalidate_tags("t")
+    release.set()
+    thread.join()
+    waiting.join()
+
+    assert leader[0].body == b"old"
+    assert waiter[0].body == b"new"
+    assert cache.get("k").body == b"new"
+
+    since = cache.snapshot()
+    cache.invalidate_keys("k")
+    cache.set("k", b"older", since=since)
+    assert cache.get("k") is None
+
+
+def test_etag_matching_handles_lists_and_weak_tags():
+    assert etag_matches('"x", W/"abc"', '"abc"')
+    assert etag_matches("*", '"abc"')
+    assert not etag_matches('"other"', '"abc"')
+    assert not etag_matches(None, '"abc"')
+
+
+def test_track_detail_returns_304_and_is_invalidated_by_update(make_client):
+    client = make_client(*seed_rows())
+
+    first = client.get("/api/tracks/1")
+    assert first.status_code == 200
+    etag = first.headers["etag"]
+
+    not_modified = client.get("/api/tracks/1", headers={"If-None-Match": etag})
+    assert not_modified.status_code == 304
+
+    resp = client.patch("/api/tracks/1", json={"title": "Renamed"}, headers={"X-User-Id": "1"})
+    assert resp.status_code == 200
+
+    refreshed = client.get("/api/tracks/1", headers={"If-None-Match": etag})
+    assert refreshed.status_code == 200
+    assert refreshed.json()["title"] == "Renamed"
+    assert refreshed.headers["etag"] != etag
+
+
+def test_track_batch_preserves_order_and_shares_detail_cache(make_client):
+    client = make_client(*seed_rows())
+    db = client.session_factory()
+    db.add(Track(id=2, owner_user_id=1, title="World"))
+    db.commit()
+    db.close()
+
+    client.get("/api/tracks/1")  # warms tracks:detail:1
+    hits = get_response_cache().hits
+
+    resp = client.get("/api/tracks/batch", params={"ids": "2,99,1,2"})
+    assert resp.status_code == 200
+    body = resp.json()
+    assert [item["id"] for item in body["items"]] == [2, 1]
+    assert body["missing"] == [99]
+    assert get_response_cache().hits == hits + 1
+
+    assert client.get("/api/tracks/batch", params={"ids": "1,x"}).status_code == 400
+
+
+def test_track_list_sparse_fields_narrow_the_payload(make_client):
+    client = make_client(*seed_rows())
+
+    resp = client.get("/api/tracks", params={"fields": "title,owner_display_name,likes_count"})
+    assert resp.status_code == 200
+    assert resp.json() == [{"id": 1, "title": "Hello", "owner_display_name": "tester", "likes_count": 0}]
+
+    assert client.get("/api/tracks", params={"fields": "title,password"}).status_code == 400
@@ -0,0 +1,67 @@
+"""Tests for batch-signed media URLs in track responses."""
+
+import time
+
+from app.core import storage
+from app.core.storage import URLSigner
+from app.models.track import Track
+from app.models.user_profile import UserProfile
+
+
+class FakeS3Client:
+    def __init__(self) -> None:
+        self.signed = 0
+
+    def generate_presigned_url(self, operation, Params, ExpiresIn):
+        self.signed += 1
+        return f"https://bucket.example/{Params['Key']}?sig={self.signed}&exp={ExpiresIn}"
+
+
+class FakeStorage:
+    backend = "s3"
+    bucket = "bucket"
+
+    def __init__(self) -> None:
+        self.s3_client = FakeS3Client()
+
+
+def test_signatures_are_reused_until_close_to_expiry(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(time, "time", lambda: now[0])
+    fake = FakeStorage()
+    signer = URLSigner(storage=fake, ttl=900, min_remaining=360)
+
+    first = signer.sign_many(["a.mp3", "b.jpg", "a.mp3"])
+    assert fake.s3_client.signed == 2
+    assert signer.sign_many(["a.mp3", "b.jpg"]) == first
+    assert fake.s3_client.signed == 2
+
+    # 540s later only 360s of validity remain: not enough to outlive a cached response.
+    now[0] += 541
+    assert signer.sign_many(["a.mp3"])["a.mp3"] != first["a.mp3"]
+    assert fake.s3_client.signed == 3
+
+
+def test_list_and_detail_embed_signed_urls_on_request(make_client):
+    storage.get_url_signer.cache_clear()
+    client = make_client(
+        UserProfile(id=1, auth_user_id="1", display_name="tester"),
+        Track(id=1, owner_user_id=1, title="Local", audio_url="uploads/1/a/song.mp3", cover_url="uploads/1/a/cover.png"),
+        Track(id=2, owner_user_id=1, title="External", cover_url="https://img.example/c.jpg"),
+    )
+
+    plain = client.get("/api/tracks").json()
+    assert "audio_signed_url" not in plain[0]
+
+    items = {item["id"]: item for item in client.get("/api/tracks?signed=true").json()}
+    assert items[1]["audio_signed_url"] == "/uploads/uploads/1/a/song.mp3"
+    assert items[1]["cover_signed_url"] == "/uploads/uploads/1/a/cover.png"
+    assert items[2]["audio_signed_url"] is None
+    assert items[2]["cover_signed_url"] == "https://img.example/c.jpg"
+
+    sparse = client.get("/api/tracks?signed=true&fields=id,cover_url").json()
+    assert set(sparse[0]) == {"id", "cover_url", "cover_signed_url"}
+
+    detail = client.get("/api/tracks/1?signed=true").json()
+    assert detail["cover_signed_url"] == "/uploads/uploads/1/a/cover.png"
+    assert "cover_signed_url" not in client.get("/api/tracks/1").json()
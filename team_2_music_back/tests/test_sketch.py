@@ -0,0 +1,118 @@
+"""Tests for Count-Min Sketch heavy-hitter tracking."""
+
+import numpy as np
+
+from app.core.config import settings
+from app.core.sketch import CountMinSketch, SlidingWindowSketch, TopK
+from app.services.heavy_hitters import HeavyHitterTracker
+
+
+def zipf_stream(n: int, keys: int, seed: int = 7) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    return (rng.zipf(1.3, size=n) % keys).astype(np.int64)
+
+
+def test_estimates_never_undercount_and_respect_error_bound():
+    stream = zipf_stream(50_000, 5_000)
+    sketch = CountMinSketch.from_error_bounds(epsilon=0.001, delta=0.01)
+    sketch.add(stream)
+
+    keys, true_counts = np.unique(stream, return_counts=True)
+    estimates = sketch.estimate(keys).astype(np.int64)
+
+    assert (estimates >= true_counts).all()
+    over = estimates - true_counts
+    assert (over <= sketch.epsilon * sketch.total).mean() >= 0.99
+
+
+def test_sliding_window_drops_old_buckets():
+    sketch = SlidingWindowSketch(window_seconds=60, buckets=6, epsilon=0.01, delta=0.01)
+    sketch.add([1, 1, 2], ts=0)
+    sketch.add([1], ts=55)
+
+    assert sketch.estimate([1], now=55)[0] == 3
+    assert sketch.estimate([1], now=100)[0] == 1
+    assert sketch.total(now=200) == 0
+
+
+def test_merge_and_serialization_round_trip():
+    worker_a = SlidingWindowSketch(window_seconds=60, buckets=6, epsilon=0.01, delta=0.01)
+    worker_b = SlidingWindowSketch(window_seconds=60, buckets=6, epsilon=0.01, delta=0.01)
+    worker_a.add([7, 7], ts=10)
+    worker_b.add([7, 8], ts=20)
+
+    restored = SlidingWindowSketch.from_bytes(worker_b.to_bytes())
+    worker_a.merge(restored)
+
+    assert worker_a.estimate([7, 8], now=20).tolist() == [3, 1]
+    assert worker_a.total(now=20) == 4
+
+
+def test_topk_keeps_heaviest_keys():
+    stream = zipf_stream(20_000, 2_000, seed=11)
+    sketch = CountMinSketch.from_error_bounds(epsilon=0.001, delta=0.01)
+    topk = TopK(capacity=20)
+    for key in stream.tolist():
+        sketch.add([key])
+        topk.offer(key, int(sketch.estimate([key])[0]))
+
+    keys, counts = np.unique(stream, return_counts=True)
+    exact_top = set(keys[np.argsort(-counts)[:10]].tolist())
+    assert exact_top <= set(topk.candidates())
+
+
+def test_topk_candidates_age_out_of_the_window(monkeypatch):
+    monkeypatch.setattr(settings, "heavy_hitters_capacity", 5)
+    tracker = HeavyHitterTracker("plays")
+    for track_id in range(1, 6):
+        for _ in range(100):
+            tracker.record(track_id, ts=0.0)
+
+    for _ in range(50):
+        tracker.record(99, ts=3 * 3600.0)
+
+    assert 99 in tracker.topk.candidates()
+    assert tracker.top(limit=5, now=3 * 3600.0).items == [(99, 50)]
+
+
+class SketchHash:
+    """In-memory stand-in for the Redis hash the workers publish sketches to."""
+
+    def __init__(self) -> None:
+        self.fields: dict[bytes, bytes] = {}
+        self.reads = 0
+
+    def pipeline(self) -> "SketchHash":
+        return self
+
+    def hset(self, name: str, key: str, value: bytes) -> None:
+        self.fields[key.encode()] = value
+
+    def expire(self, name: str, seconds: int) -> None:
+        pass
+
+    def execute(self) -> None:
+        pass
+
+    def hgetall(self, name: str) -> dict[bytes, bytes]:
+        self.reads += 1
+        return dict(self.fields)
+
+
+def test_remote_sketches_are_merged_once_per_flush_interval(monkeypatch):
+    monkeypatch.setattr(settings, "heavy_hitters_flush_seconds", 60)
+    redis = SketchHash()
+    worker_a, worker_b = HeavyHitterTracker("plays", redis), HeavyHitterTracker("plays", redis)
+    for _ in range(3):
+        worker_a.record(7, ts=100.0)
+    worker_a.flush()
+    worker_b.record(8, ts=100.0)
+
+    assert worker_b.top(limit=5, now=100.0).items == [(7, 3), (8, 1)]
+    worker_b.record(8, ts=100.0)
+    assert worker_b.top(limit=5, now=100.0).items == [(7, 3), (8, 2)]  # local counts stay live
+    assert redis.reads == 1
+
+    monkeypatch.setattr(settings, "heavy_hitters_flush_seconds", 0)
+    worker_b.top(limit=5, now=100.0)
+    assert redis.reads == 2
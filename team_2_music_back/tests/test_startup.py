@@ -0,0 +1,23 @@
+"""Start-up cost guard: app import stays under budget and skips heavy optional deps."""
+
+import os
+import subprocess
+import sys
+
+from benchmarks.bench_startup import ROOT, import_profile
+
+# Generous for shared CI runners; tighten locally with IMPORT_TIME_BUDGET_MS.
+BUDGET_MS = int(os.environ.get("IMPORT_TIME_BUDGET_MS", "4000"))
+
+
+def test_app_import_does_not_load_heavy_dependencies():
+    code = "import sys, main; print(','.join(m for m in ('boto3', 'mutagen', 'numpy', 'scipy') if m in sys.modules))"
+    proc = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, check=True)
+
+    assert proc.stdout.strip() == ""
+
+
+def test_app_import_time_within_budget():
+    best_ms = min(import_profile("main")["main"] for _ in range(2)) / 1000
+
+    assert best_ms < BUDGET_MS, f"importing main took {best_ms:.0f}ms (budget {BUDGET_MS}ms)"
@@ -0,0 +1,80 @@
+"""Tests for request tracing and traceparent propagation."""
+
+import asyncio
+import json
+
+import httpx
+
+from app.core import tracing
+from app.models.user_profile import UserProfile
+
+MP3_FRAMES = (b"\xff\xfb\x90\x00" + b"\x00" * 413) * 3
+
+
+def instrument(engine) -> None:
+    tracing.instrument_engine(engine)
+    tracing.instrument_sessions()
+
+
+def test_upload_trace_continues_incoming_traceparent(make_client, tmp_path):
+    tracing.get_export_queue.cache_clear()
+    client = make_client(
+        UserProfile(id=1, auth_user_id="1", display_name="tester"),
+        settings={
+            "tracing_exporter": "json",
+            "tracing_dir": str(tmp_path / "traces"),
+            "local_storage_path": str(tmp_path / "storage"),
+        },
+        on_engine=instrument,
+    )
+    trace_id = "4bf92f3577b34da6a3ce929d0e0e4736"
+
+    resp = client.post(
+        "/api/tracks/upload/direct",
+        files={"file": ("song.mp3", b"ID3\x04" + b"\x00" * 6 + MP3_FRAMES, "audio/mpeg")},
+        data={"title": "Traced"},
+        headers={"X-User-Id": "1", "traceparent": f"00-{trace_id}-00f067aa0ba902b7-01"},
+    )
+    assert resp.status_code == 201
+    assert resp.headers["traceparent"].startswith(f"00-{trace_id}-")
+
+    tracing.get_export_queue().flush()
+    tracing.get_export_queue.cache_clear()
+    [line] = (tmp_path / "traces").glob("traces-*.jsonl")
+    [trace] = [json.loads(row) for row in line.read_text().splitlines()]
+    spans = {s["name"]: s for s in trace["spans"]}
+
+    assert trace["trace_id"] == trace_id
+    root = spans["POST /api/tracks/upload/direct"]
+    assert root["parent_id"] == "00f067aa0ba902b7"
+    assert root["attributes"]["http.status_code"] == 201
+    for name in ("storage.save_file", "upload.extract_metadata", "db.commit", "feed.fan_out", "db.query"):
+        assert name in spans
+    assert spans["storage.save_file"]["parent_id"] == root["span_id"]
+
+
+def test_httpx_hook_injects_current_span():
+    seen = {}
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        seen["traceparent"] = request.headers.get("traceparent")
+        return httpx.Response(200)
+
+    async def call() -> None:
+        async with httpx.AsyncClient(
+            transport=httpx.MockTransport(handler), event_hooks=tracing.HTTPX_EVENT_HOOKS
+        ) as client:
+            await client.get("http://auth.test/me")
+            with tracing.span("auth.userinfo") as child:
+                await client.get("http://auth.test/me")
+                return child
+
+    root = tracing.Span(tracing.Trace("a" * 32), "root", "b" * 16, None, 0)
+    token = tracing._current.set(root)
+    try:
+        child = asyncio.run(call())
+    finally:
+        tracing._current.reset(token)
+
+    assert seen["traceparent"] == child.traceparent
+    assert child.parent_id == root.span_id
@@ -7,8 +7,11 @@ from sqlalchemy.orm import Session, sessionmaker
 
 from app.core.storage import StorageService
 from app.db.base import Base
+from app.models.play_history import PlayHistory
+from app.models.track import Track
 from app.models.user_profile import UserProfile
 from app.schemas import UploadFinalizeRequest, UploadInitiateRequest
+from app.services.interactions import InteractionService
 from app.services.tracks import TrackService
 
 
@@ -44,3 +47,16 @@ def test_initiate_and_finalize_upload_creates_track():
 
     assert track.title == "Hello"
     assert track.audio_url == presigned.storage_key
+
+
+def test_delete_track_with_recorded_plays():
+    db = setup_inmemory_db()
+    seed_user(db)
+    db.add(Track(id=1, owner_user_id=1, title="played"))
+    db.commit()
+    InteractionService(db).record_play(track_id=1, user_id=1)
+
+    TrackService(db=db, storage=StorageService(bucket="test-bucket")).delete_track(1, owner_user_id=1)
+
+    assert db.query(Track).count() == 0
+    assert db.query(PlayHistory).count() == 0
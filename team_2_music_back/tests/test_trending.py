@@ -0,0 +1,109 @@
+"""Tests for the trending leaderboard."""
+
+from datetime import datetime, timedelta
+
+import numpy as np
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.db.base import Base
+from app.models.play_history import PlayHistory
+from app.models.track import Track
+from app.models.user_profile import UserProfile
+from app.models.vote import Like
+from app.services.trending import SqlLeaderboard, TrendingService, decayed_contributions
+
+
+def setup_inmemory_db() -> Session:
+    engine = create_engine("sqlite:///:memory:")
+    Base.metadata.create_all(bind=engine)
+    TestingSessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False)
+    return TestingSessionLocal()
+
+
+def seed(db: Session) -> None:
+    for user_id in (1, 2, 3):
+        db.add(UserProfile(id=user_id, auth_user_id=str(user_id), display_name=f"user-{user_id}"))
+    db.add(Track(id=1, owner_user_id=1, title="Old hit", genre="Pop"))
+    db.add(Track(id=2, owner_user_id=1, title="Fresh", genre="pop"))
+    db.add(Track(id=3, owner_user_id=2, title="Jazzy", genre="Jazz"))
+    db.commit()
+
+
+def test_forward_decay_matches_classic_decay_ordering():
+    epoch, half_life, now = 0.0, 3600.0, 7200.0
+    stamps = np.array([0.0, 3600.0, 7200.0])
+    forward = decayed_contributions(stamps, 1.0, epoch, half_life)
+    classic = 2.0 ** (-(now - stamps) / half_life)
+    np.testing.assert_allclose(forward * 2.0 ** ((epoch - now) / half_life), classic)
+
+
+def test_refresh_is_incremental_and_ranks_recent_events_higher():
+    db = setup_inmemory_db()
+    seed(db)
+    now = datetime.utcnow()
+    for user_id in (1, 2, 3):
+        db.add(PlayHistory(user_id=user_id, track_id=1, played_at=now - timedelta(days=4)))
+    db.add(PlayHistory(user_id=1, track_id=2, played_at=now - timedelta(minutes=5)))
+    db.add(Like(user_id=2, track_id=2, created_at=now - timedelta(minutes=1)))
+    db.add(PlayHistory(user_id=1, track_id=3, played_at=now - timedelta(days=30)))
+    db.commit()
+
+    service = TrendingService(db, store=SqlLeaderboard(db))
+    assert service.refresh(now=now) == 6
+    assert service.refresh(now=now) == 0
+
+    top = service.top(limit=10, now=now)
+    assert [t.id for t in top] == [2, 1]  # track 3 is outside the window
+    assert top[0].trending_score > top[1].trending_score
+    assert top[0].likes_count == 1
+
+    before = top[1].trending_score
+    db.add(PlayHistory(user_id=2, track_id=1, played_at=now))
+    db.commit()
+    assert service.refresh(now=now) == 0  # not settled yet
+    assert service.refresh(now=now + timedelta(minutes=1)) == 1
+    assert service.top(genre="POP", limit=10, now=now)[1].trending_score > before
+    assert [t.id for t in service.top(genre="jazz", now=now)] == []
+
+
+def test_late_committed_lower_id_is_not_skipped():
+    db = setup_inmemory_db()
+    seed(db)
+    now = datetime.utcnow()
+    service = TrendingService(db, store=SqlLeaderboard(db))
+    db.add(PlayHistory(id=10, user_id=1, track_id=1, played_at=now - timedelta(minutes=5)))
+    db.add(PlayHistory(id=12, user_id=1, track_id=2, played_at=now - timedelta(seconds=5)))
+    db.commit()
+    assert service.refresh(now=now) == 1  # id 12 is too young to pass
+
+    # id 11 was inserted before id 12 but its transaction committed only now.
+    db.add(PlayHistory(id=11, user_id=2, track_id=3, played_at=now - timedelta(seconds=6)))
+    db.commit()
+    assert service.refresh(now=now + timedelta(minutes=1)) == 2
+    assert {t.id for t in service.top(limit=10, now=now)} == {1, 2, 3}
+
+
+class FlakyStore(SqlLeaderboard):
+    def __init__(self, db: Session) -> None:
+        super().__init__(db)
+        self.failures = 1
+
+    def increment(self, track_ids, deltas, genres) -> None:
+        if self.failures:
+            self.failures -= 1
+            raise ConnectionError("redis down")
+        super().increment(track_ids, deltas, genres)
+
+
+def test_failed_increment_does_not_advance_the_checkpoint():
+    db = setup_inmemory_db()
+    seed(db)
+    now = datetime.utcnow()
+    db.add(PlayHistory(user_id=1, track_id=2, played_at=now - timedelta(minutes=5)))
+    db.commit()
+    service = TrendingService(db, store=FlakyStore(db))
+
+    assert service.refresh(now=now) == 0
+    assert service.refresh(now=now) == 1
+    assert [t.id for t in service.top(limit=10, now=now)] == [2]
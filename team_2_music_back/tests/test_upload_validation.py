@@ -5,6 +5,9 @@ from sqlalchemy.orm import Session, sessionmaker
 from fastapi import HTTPException
 from io import BytesIO
 
+import pytest
+
+from app.core.sniff import sniff
 from app.core.storage import StorageService
 from app.db.base import Base
 from app.models.user_profile import UserProfile
@@ -40,7 +43,7 @@ def test_rejects_large_file():
     big_content = b"x" * (51 * 1024 * 1024)
     upload = DummyUploadFile(filename="big.mp3", content=big_content, content_type="audio/mpeg")
     try:
-        service.upload_direct(file=upload, title="t", description=None, cover_url=None, owner_user_id=1)
+        service.upload_direct(file=upload, cover_file=None, title="t", description=None, owner_user_id=1)
         assert False, "Expected HTTPException for large file"
     except HTTPException as exc:
         assert exc.detail == "FILE_TOO_LARGE"
@@ -53,7 +56,58 @@ def test_rejects_unsupported_type():
 
     upload = DummyUploadFile(filename="song.txt", content=b"hello", content_type="text/plain")
     try:
-        service.upload_direct(file=upload, title="t", description=None, cover_url=None, owner_user_id=1)
+        service.upload_direct(file=upload, cover_file=None, title="t", description=None, owner_user_id=1)
         assert False, "Expected HTTPException for unsupported type"
     except HTTPException as exc:
         assert exc.detail == "UNSUPPORTED_MEDIA_TYPE"
+
+
+MP3_HEAD = (b"\xff\xfb\x90\x00" + b"\x00" * 413) * 4
+
+
+def test_sniff_recognises_signatures():
+    assert sniff(MP3_HEAD) == "audio/mpeg"
+    assert sniff(b"ID3\x04\x00\x00\x00\x00\x00\x00" + MP3_HEAD) == "audio/mpeg"
+    assert sniff(b"ID3\x03\x00\x00\x00\x00\x7f\x7f" + b"\x00" * 64) == "audio/mpeg"  # tag beyond window
+    assert sniff(b"ID3\x04\x00\x00\x00\x00\x00\x04" + b"\x00" * 4 + b"fLaC") == "audio/flac"
+    assert sniff(b"fLaC\x00\x00\x00\x22") == "audio/flac"
+    assert sniff(b"RIFF\x24\x00\x00\x00WAVEfmt ") == "audio/wav"
+    assert sniff(b"RIFF\x24\x00\x00\x00WEBPVP8 ") == "image/webp"
+    assert sniff(b"\xff\xd8\xff\xe0\x00\x10JFIF") == "image/jpeg"
+    assert sniff(b"\x89PNG\r\n\x1a\n\x00\x00") == "image/png"
+    # ADTS AAC (layer 00) and a lone sync word followed by garbage are not MP3.
+    assert sniff(b"\xff\xf1\x50\x80" + b"\x00" * 64) is None
+    assert sniff(b"\xff\xfb\x90\x00" + b"\x00" * 413 + b"<html>") is None
+    assert sniff(b"<html></html>") is None
+    # An ID3 prefix alone proves nothing: the header must be valid and audio must follow.
+    assert sniff(b"ID3" + b"\x00" * 7 + b"<html></html>") is None
+    assert sniff(b"ID3\xff\xff\xff\xff\xff\xff\xff MZ") is None
+    assert sniff(b"ID3\x04\x00\x00\x00\x00\x00\x00" + b"\x00" * 64) is None
+    assert sniff(b"ID3\x04\x00\x01\x00\x00\x00\x00" + MP3_HEAD) is None  # reserved flag bit
+
+
+def test_missing_content_type_uses_sniffed_type_and_mismatch_is_rejected(tmp_path):
+    db = setup_inmemory_db()
+    seed_user(db)
+    service = TrackService(db=db, storage=StorageService(bucket="test-bucket", base_path=str(tmp_path)))
+
+    disguised = DummyUploadFile(filename="song.mp3", content=b"#!/bin/sh\nrm -rf /\n", content_type=None)
+    with pytest.raises(HTTPException) as exc:
+        service.upload_direct(file=disguised, cover_file=None, title="t", description=None, owner_user_id=1)
+    assert exc.value.detail == "UNSUPPORTED_MEDIA_TYPE"
+
+    flac_as_mp3 = DummyUploadFile(filename="song.mp3", content=b"fLaC" + b"\x00" * 64, content_type="audio/mpeg")
+    with pytest.raises(HTTPException) as exc:
+        service.upload_direct(file=flac_as_mp3, cover_file=None, title="t", description=None, owner_user_id=1)
+    assert exc.value.detail == "CONTENT_TYPE_MISMATCH"
+
+    unlabeled = DummyUploadFile(filename="song", content=MP3_HEAD, content_type=None)
+    png_cover = DummyUploadFile(filename="c.png", content=b"\x89PNG\r\n\x1a\n" + b"\x00" * 16, content_type="image/png")
+    track = service.upload_direct(file=unlabeled, cover_file=png_cover, title="t", description=None, owner_user_id=1)
+    assert track.audio_content_type == "audio/mpeg"
+
+    audio = DummyUploadFile(filename="song.mp3", content=MP3_HEAD, content_type="audio/mp3")
+    jpeg_as_png = DummyUploadFile(filename="c.png", content=b"\xff\xd8\xff\xe0" + b"\x00" * 16, content_type="image/png")
+    with pytest.raises(HTTPException) as exc:
+        service.upload_direct(file=audio, cover_file=jpeg_as_png, title="t", description=None, owner_user_id=1)
+    assert exc.value.detail == "COVER_CONTENT_TYPE_MISMATCH"